@@ -0,0 +1,99 @@
+# portfolio_risk_app/benchmarks/risk_metrics_benchmark.py
+"""
+Risk Metrics Benchmark
+Compares batch risk metrics for many candidate weightings with looping
+the single-portfolio functions, and closed-form re-scoring of one
+weighting with historical VaR.
+
+Run from the app directory:
+    python -m benchmarks.risk_metrics_benchmark
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from utils.risk_metrics import (
+    ParametricRisk, calculate_batch_risk_metrics, calculate_portfolio_returns,
+    calculate_var, calculate_cvar, calculate_volatility, calculate_max_drawdown
+)
+
+
+def random_prices(n_assets: int, n_days: int = 252, seed: int = 0) -> pd.DataFrame:
+    """Random-walk price history for n_assets."""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.015, (n_days, n_assets))
+    dates = pd.bdate_range('2024-01-01', periods=n_days)
+    return pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=dates,
+                        columns=[f"S{i}" for i in range(n_assets)])
+
+
+def loop_metrics(prices: pd.DataFrame, weight_matrix: np.ndarray) -> pd.DataFrame:
+    """Current approach: one pass of the single-portfolio functions per weighting."""
+    rows = []
+    for weights in weight_matrix:
+        returns = calculate_portfolio_returns(prices, weights)
+        rows.append({
+            'var': calculate_var(returns),
+            'cvar': calculate_cvar(returns),
+            'volatility': calculate_volatility(returns),
+            'max_drawdown': calculate_max_drawdown(returns)
+        })
+    return pd.DataFrame(rows)
+
+
+def run(n_assets: int = 20, portfolio_counts=(10, 100, 500)) -> None:
+    """Print timings for the loop and batch versions."""
+    prices = random_prices(n_assets)
+    rng = np.random.default_rng(1)
+    
+    print(f"{n_assets} assets, {len(prices)} days")
+    print(f"{'portfolios':>10} {'loop s':>9} {'batch s':>9} {'speedup':>8} {'max diff':>9}")
+    
+    for k in portfolio_counts:
+        weight_matrix = rng.dirichlet(np.ones(n_assets), size=k)
+        
+        start = time.perf_counter()
+        looped = loop_metrics(prices, weight_matrix)
+        loop_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        batch = calculate_batch_risk_metrics(prices, weight_matrix)
+        batch_time = time.perf_counter() - start
+        
+        max_diff = np.abs(looped.values - batch[looped.columns].values).max()
+        print(f"{k:>10} {loop_time:>9.3f} {batch_time:>9.4f} "
+              f"{loop_time / batch_time:>7.0f}x {max_diff:>9.1e}")
+
+
+def run_rescoring(n_assets: int = 20, n_edits: int = 1000) -> None:
+    """Print per-edit timings for re-scoring a what-if weighting."""
+    prices = random_prices(n_assets)
+    weight_matrix = np.random.default_rng(2).dirichlet(np.ones(n_assets), size=n_edits)
+    
+    start = time.perf_counter()
+    for weights in weight_matrix:
+        calculate_var(calculate_portfolio_returns(prices, weights))
+    historical_time = (time.perf_counter() - start) / n_edits
+    
+    scorer = ParametricRisk(prices)
+    timings = {}
+    for method in ('gaussian', 'cornish_fisher'):
+        start = time.perf_counter()
+        for weights in weight_matrix:
+            scorer.score(weights, method)
+        timings[method] = (time.perf_counter() - start) / n_edits
+    
+    start = time.perf_counter()
+    for weights in weight_matrix:
+        scorer.marginal_var(weights)
+    timings['component'] = (time.perf_counter() - start) / n_edits
+    
+    print(f"\nRe-scoring one weighting ({n_assets} assets), microseconds per edit")
+    print(f"{'historical':>14} {historical_time * 1e6:>9.1f}")
+    for name, seconds in timings.items():
+        print(f"{name:>14} {seconds * 1e6:>9.1f}")
+
+
+if __name__ == '__main__':
+    run()
+    run_rescoring()
@@ -0,0 +1,65 @@
+# portfolio_risk_app/benchmarks/variance_reduction_benchmark.py
+"""
+Variance Reduction Benchmark
+Paths each variance-reduction method needs to reach a target VaR/CVaR standard error.
+
+Run from the app directory:
+    python -m benchmarks.variance_reduction_benchmark
+"""
+
+import numpy as np
+from benchmarks.simulation_benchmark import random_moments
+from utils.simulation_engine import NormalModel
+from utils.variance_reduction import METHODS, estimate_tail_risk
+
+
+def paths_to_target(model, weights: np.ndarray, current_value: float,
+                    method: str, confidence_level: float, target_error: float,
+                    horizon_days: int = 30, pilot_paths: int = 4096,
+                    max_paths: int = 2 ** 21) -> dict:
+    """
+    Find the path count at which the CVaR standard error is within target_error of CVaR.
+    
+    Standard errors shrink like 1 / sqrt(paths), so each run predicts the
+    count that meets the target from its own error (plus 10% headroom);
+    the prediction is re-run until it is met. This resolves the count far
+    more finely than doubling, whose steps hid real differences between
+    methods.
+    """
+    n_paths = pilot_paths
+    while True:
+        result = estimate_tail_risk(model, weights, current_value,
+                                    horizon_days=horizon_days,
+                                    n_simulations=n_paths,
+                                    confidence_level=confidence_level,
+                                    method=method)
+        target = target_error * abs(result['cvar'])
+        if result['cvar_se'] <= target or n_paths >= max_paths:
+            return result
+        
+        predicted = int(np.ceil(1.1 * n_paths * (result['cvar_se'] / target) ** 2))
+        n_paths = min(max(predicted, n_paths + n_paths // 10), max_paths)
+
+
+def run(n_assets: int = 20, confidence_levels=(0.95, 0.99), target_error: float = 0.01) -> None:
+    """Print paths requested and simulated, and achieved errors, per method and confidence level."""
+    mean, cov = random_moments(n_assets)
+    model = NormalModel(mean, cov)
+    weights = np.full(n_assets, 1 / n_assets)
+    current_value = 100000.0
+    
+    print(f"{n_assets} assets, 30-day horizon, target CVaR standard error {target_error:.0%}")
+    print(f"{'method':>16} {'conf':>5} {'requested':>9} {'simulated':>9} "
+          f"{'VaR':>9} {'VaR se':>8} {'CVaR':>9} {'CVaR se':>8}")
+    
+    for confidence_level in confidence_levels:
+        for method in METHODS:
+            result = paths_to_target(model, weights, current_value, method,
+                                     confidence_level, target_error)
+            print(f"{method:>16} {confidence_level:>5.3f} {result['n_requested']:>9} {result['n_paths']:>9} "
+                  f"{result['var']:>9.0f} {result['var_se']:>8.1f} "
+                  f"{result['cvar']:>9.0f} {result['cvar_se']:>8.1f}")
+
+
+if __name__ == '__main__':
+    run()
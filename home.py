@@ -9,9 +9,15 @@ import pandas as pd
 import json
 import os
 from utils.portfolio import Portfolio
-from utils.data_loader import validate_symbol, get_current_prices
+from utils.data_loader import validate_symbol, validate_symbols, get_quote_snapshot, fetch_price_history
+from utils.alignment import align_prices
+from utils.incremental_risk import IncrementalRiskModel
+from utils.prefetch import prefetch_symbols, get_prefetch_status, FETCHING, READY, FAILED
 from assets.styles import format_currency
 
+# Columns required in an imported holdings CSV
+HOLDINGS_COLUMNS = ['symbol', 'shares', 'buy_price']
+
 # Page configuration
 st.set_page_config(
     page_title="Portfolio Risk Analysis",
@@ -90,12 +96,66 @@ with col1:
                 with st.spinner(f"Validating {symbol}..."):
                     if validate_symbol(symbol):
                         st.session_state.portfolio.add_holding(symbol, shares, buy_price)
+                        prefetch_symbols([symbol])
                         st.success(f"✅ Added {shares} shares of {symbol} at {format_currency(buy_price)}")
                         st.rerun()
                     else:
                         st.error(f"❌ Invalid symbol: {symbol}. Please check and try again.")
             else:
                 st.warning("Please enter a stock symbol.")
+    
+    with st.expander("📂 Import Holdings"):
+        uploaded = st.file_uploader(
+            "Holdings CSV",
+            type=["csv"],
+            help="Columns: symbol, shares, buy_price"
+        )
+        
+        if uploaded is not None and st.button("Import Holdings", use_container_width=True):
+            try:
+                holdings_df = pd.read_csv(uploaded)
+                holdings_df.columns = [str(c).strip().lower() for c in holdings_df.columns]
+                
+                missing_columns = [c for c in HOLDINGS_COLUMNS if c not in holdings_df.columns]
+                if missing_columns:
+                    raise ValueError(f"missing column(s): {', '.join(missing_columns)}")
+                
+                # Coerce every row before adding any, so a bad row cannot
+                # leave the portfolio half imported
+                holdings_df = holdings_df[HOLDINGS_COLUMNS].copy()
+                for col in ['shares', 'buy_price']:
+                    holdings_df[col] = pd.to_numeric(holdings_df[col], errors='coerce')
+                valid_rows = holdings_df.dropna().copy()
+                valid_rows['symbol'] = valid_rows['symbol'].astype(str).str.upper().str.strip()
+                valid_rows = valid_rows[(valid_rows['symbol'] != '') & (valid_rows['shares'] > 0)
+                                        & (valid_rows['buy_price'] > 0)]
+                skipped_rows = len(holdings_df) - len(valid_rows)
+                
+                # Validate every symbol in one pass
+                with st.spinner(f"Validating {len(valid_rows)} symbols..."):
+                    validity = validate_symbols(valid_rows['symbol'].tolist())
+                
+                invalid = [s for s, valid in validity.items() if not valid]
+                for row in valid_rows.itertuples(index=False):
+                    if validity.get(row.symbol):
+                        st.session_state.portfolio.add_holding(
+                            row.symbol, float(row.shares), float(row.buy_price)
+                        )
+                prefetch_symbols([s for s, valid in validity.items() if valid])
+                
+                warnings = []
+                if skipped_rows:
+                    warnings.append(f"Skipped {skipped_rows} row(s) with missing or invalid values")
+                if invalid:
+                    warnings.append(f"Skipped invalid symbols: {', '.join(invalid)}")
+                if warnings:
+                    st.session_state.import_warning = ". ".join(warnings)
+                st.rerun()
+            except (KeyError, ValueError) as e:
+                st.error(f"❌ Could not read holdings file: {str(e)}")
+    
+    if 'import_warning' in st.session_state:
+        st.warning(st.session_state.pop('import_warning'))
 
 with col2:
     st.markdown("### Current Portfolio")
@@ -103,11 +163,28 @@ with col2:
     if st.session_state.portfolio.is_empty():
         st.info("📭 Your portfolio is empty. Add stocks to begin analysis.")
     else:
-        # Get current prices
         symbols = st.session_state.portfolio.get_symbols()
         
+        # Background downloads. Holdings that reached the session some other
+        # way (e.g. a portfolio restored with Portfolio.from_dict) or whose
+        # warm data has expired are prefetched here as well
+        prefetch_symbols(symbols)
+        prefetch_status = get_prefetch_status(symbols)
+        
+        # History of the holdings whose prefetch finished, reloaded only when
+        # that set changes or one of them was fetched again (which is when a
+        # new bar can appear); it backs both the quotes and the quick risk
+        ready = [s for s in dict.fromkeys(symbols) if prefetch_status.get(s, {}).get('state') == READY]
+        history_key = tuple(sorted((s, prefetch_status[s]['time']) for s in ready))
+        if st.session_state.get('ready_history_key') != history_key:
+            st.session_state.ready_history = fetch_price_history(ready).prices if ready else pd.DataFrame()
+            st.session_state.ready_history_key = history_key
+        ready_history = st.session_state.ready_history
+        
+        # Get current prices, quoting from the loaded history where its last
+        # bar is current
         with st.spinner("Fetching current prices..."):
-            current_prices = get_current_prices(symbols)
+            current_prices = get_quote_snapshot(symbols, prices=ready_history)
         
         # Display portfolio table
         allocation_df = st.session_state.portfolio.get_allocation_table(current_prices)
@@ -127,6 +204,14 @@ with col2:
         
         st.dataframe(display_df, use_container_width=True, hide_index=True)
         
+        # Background download status
+        fetching = [s for s, info in prefetch_status.items() if info['state'] == FETCHING]
+        failed = [s for s, info in prefetch_status.items() if info['state'] == FAILED]
+        if fetching:
+            st.caption(f"⏳ Still fetching price history: {', '.join(fetching)}")
+        if failed:
+            st.caption(f"⚠️ Price history download failed: {', '.join(failed)}")
+        
         # Portfolio summary
         st.markdown("---")
         
@@ -150,6 +235,40 @@ with col2:
                 delta=f"{total_gain_loss_pct:+.1f}%"
             )
         
+        # Quick 1-day risk for holdings whose history has arrived. The model
+        # is kept in session state and synced incrementally, so adding or
+        # removing a holding (or a new daily bar) updates its statistics
+        # instead of recomputing them. It is only synced when the ready
+        # history above was reloaded; other reruns reuse the model as is.
+        if ready and st.session_state.get('risk_model_key') != history_key:
+            history, _ = align_prices(ready_history)
+            if len(history) > 2:
+                risk_model = st.session_state.get('risk_model')
+                if risk_model is None or risk_model.n_obs < 2:
+                    risk_model = IncrementalRiskModel.from_prices(history)
+                else:
+                    risk_model.sync(history)
+                st.session_state.risk_model = risk_model
+                st.session_state.risk_model_key = history_key
+        
+        risk_model = st.session_state.get('risk_model')
+        if ready and risk_model is not None and risk_model.n_obs >= 2:
+            holding_weights = pd.Series(
+                st.session_state.portfolio.calculate_weights(current_prices), index=symbols
+            )
+            covered_value = total_current * holding_weights[holding_weights.index.isin(risk_model.symbols)].sum()
+            quick_risk = risk_model.score(holding_weights)
+            
+            col_r1, col_r2 = st.columns(2)
+            with col_r1:
+                st.metric("1-Day VaR (95%)", format_currency(-quick_risk['var'] * covered_value))
+            with col_r2:
+                st.metric("1-Day CVaR (95%)", format_currency(-quick_risk['cvar'] * covered_value))
+            st.caption(
+                f"Parametric estimate from {risk_model.n_obs} days of returns, covering "
+                f"{len(risk_model.symbols)} of {len(set(symbols))} holdings"
+            )
+        
         # Remove stock section
         st.markdown("---")
         with st.expander("🗑️ Remove Stock"):
@@ -8,9 +8,13 @@ import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
 from utils.portfolio import Portfolio
-from utils.data_loader import fetch_multiple_stocks, get_current_prices
-from utils.risk_metrics import calculate_portfolio_returns, portfolio_value_at_risk, portfolio_cvar
-from utils.simulation import simulate_portfolio_outcomes, calculate_simulation_statistics
+from utils.data_loader import fetch_multiple_stocks, get_quote_snapshot, calculate_data_quality_score
+from utils.prefetch import get_prefetch_status, wait_for_prefetch, mark_ready, FETCHING, FAILED
+from utils.risk_metrics import (
+    calculate_portfolio_returns, calculate_risk_timeseries,
+    calculate_risk_surface, get_surface_value, risk_surface_table
+)
+from utils.simulation import simulate_portfolio_adaptive, calculate_simulation_statistics
 from utils.explain import explain_var, assess_risk_level, explain_simulation_outcomes
 from assets.styles import format_currency, get_risk_color, get_risk_emoji
 
@@ -66,13 +70,25 @@ st.markdown('<div class="sub-title">How much your portfolio could lose in the ne
 # Fetch data
 symbols = portfolio.get_symbols()
 
+# Let background downloads started in the builder finish first
+prefetch_status = get_prefetch_status(symbols)
+if any(info['state'] == FETCHING for info in prefetch_status.values()):
+    with st.spinner("Still fetching price history in the background..."):
+        wait_for_prefetch(symbols, timeout=60)
+    prefetch_status = get_prefetch_status(symbols)
+
+failed = [s for s, info in prefetch_status.items() if info['state'] == FAILED]
+if failed:
+    st.warning(f"⚠️ Background download failed for: {', '.join(failed)}. Retrying now.")
+
 with st.spinner("Fetching market data and calculating risk..."):
     try:
         # Get historical prices
         prices = fetch_multiple_stocks(symbols, period="1y")
+        mark_ready(list(prices.columns))
         
-        # Get current prices
-        current_prices = get_current_prices(symbols)
+        # Get current prices (reusing the last loaded bar where it is current)
+        current_prices = get_quote_snapshot(symbols, prices=prices)
         
         # Calculate portfolio metrics
         portfolio_value = portfolio.calculate_current_value(current_prices)
@@ -81,15 +97,18 @@ with st.spinner("Fetching market data and calculating risk..."):
         # Calculate historical portfolio returns
         portfolio_returns = calculate_portfolio_returns(prices, weights)
         
-        # Calculate VaR and CVaR
-        var_amount = portfolio_value_at_risk(portfolio_value, portfolio_returns, confidence_level=0.95)
-        cvar_amount = portfolio_cvar(portfolio_value, portfolio_returns, confidence_level=0.95)
+        # Calculate VaR and CVaR across confidence levels and horizons, using
+        # overlapping multi-day windows; the headline figures are 30-day 95%
+        risk_surface = calculate_risk_surface(portfolio_returns, portfolio_value)
+        var_amount = get_surface_value(risk_surface, 'var', 0.95, 30)
+        cvar_amount = get_surface_value(risk_surface, 'cvar', 0.95, 30)
         
-        # Run Monte Carlo simulation
-        simulated_values = simulate_portfolio_outcomes(
-            prices, weights, portfolio_value, 
-            horizon_days=30, n_simulations=10000
+        # Run Monte Carlo simulation until the simulated VaR/CVaR are within 2%
+        simulation = simulate_portfolio_adaptive(
+            prices, weights, portfolio_value,
+            horizon_days=30, confidence_level=0.95, tolerance=0.02
         )
+        simulated_values = simulation['values']
         
         # Calculate simulation statistics
         sim_stats = calculate_simulation_statistics(simulated_values, portfolio_value)
@@ -102,6 +121,16 @@ with st.spinner("Fetching market data and calculating risk..."):
         st.error(f"Error analyzing portfolio: {str(e)}")
         st.stop()
 
+# Data coverage after aligning exchange calendars
+alignment = prices.attrs.get('alignment')
+if alignment:
+    quality_score = calculate_data_quality_score(prices)
+    st.caption(
+        f"📅 {alignment['rows_kept'][alignment['policy']]} of {alignment['total_rows']} trading days kept "
+        f"({alignment['policy']} alignment, {alignment['filled_cells']} prices carried forward) · "
+        f"Data quality {quality_score * 100:.0f}%"
+    )
+
 # Store in session state for other pages
 st.session_state.analysis = {
     'prices': prices,
@@ -110,8 +139,10 @@ st.session_state.analysis = {
     'weights': weights,
     'var_amount': var_amount,
     'cvar_amount': cvar_amount,
+    'risk_surface': risk_surface_table(risk_surface),
     'simulated_values': simulated_values,
     'sim_stats': sim_stats,
+    'sim_paths': simulation['n_paths'],
     'risk_level': risk_level,
     'portfolio_returns': portfolio_returns
 }
@@ -139,6 +170,16 @@ st.markdown("---")
 explanation = explain_var(var_amount, portfolio_value, confidence_level=0.95, horizon_days=30)
 st.info(f"**Interpretation:** {explanation}")
 
+with st.expander("📐 Downside Risk by Confidence Level and Horizon"):
+    st.dataframe(
+        st.session_state.analysis['risk_surface'].style.format('₹{:,.0f}'),
+        use_container_width=True
+    )
+    st.caption(
+        "Historical losses over overlapping windows of each length. "
+        "Horizons marked * had too little history and are scaled from one-day risk by √days."
+    )
+
 st.markdown("---")
 
 # Visualization: Histogram of outcomes
@@ -185,6 +226,14 @@ fig.update_layout(
 
 st.plotly_chart(fig, use_container_width=True)
 
+precision_note = "" if simulation['converged'] else " (time or path limit reached first)"
+st.caption(
+    f"🎲 {simulation['n_paths']:,} simulated paths · simulated 95% VaR "
+    f"{format_currency(simulation['var'])} ± {format_currency(simulation['var_error'])}, "
+    f"CVaR {format_currency(simulation['cvar'])} ± {format_currency(simulation['cvar_error'])}"
+    f"{precision_note}"
+)
+
 # Simulation summary
 st.markdown("### 📊 Simulation Summary")
 
@@ -218,6 +267,38 @@ with col_sim4:
 sim_explanation = explain_simulation_outcomes(sim_stats, portfolio_value)
 st.info(f"**Analysis:** {sim_explanation}")
 
+# Visualization: Risk over time
+st.markdown("### 📉 How Daily Risk Has Changed")
+
+risk_history = calculate_risk_timeseries(portfolio_returns, window=63, confidence_level=0.95)
+
+fig_history = go.Figure()
+
+for column, label, color, dash in [
+    ('rolling_var', 'Historical VaR (63-day window)', 'steelblue', 'solid'),
+    ('rolling_cvar', 'Historical CVaR (63-day window)', 'firebrick', 'solid'),
+    ('ewma_var', 'EWMA VaR (λ = 0.94)', 'darkorange', 'dot')
+]:
+    fig_history.add_trace(go.Scatter(
+        x=risk_history.index,
+        y=-risk_history[column] * 100,
+        mode='lines',
+        name=label,
+        line=dict(color=color, width=2, dash=dash)
+    ))
+
+fig_history.update_layout(
+    title="95% One-Day Loss Thresholds Over Time",
+    xaxis_title="Date",
+    yaxis_title="Potential Daily Loss (%)",
+    height=400,
+    hovermode='x unified',
+    legend=dict(x=0.01, y=0.99)
+)
+
+st.plotly_chart(fig_history, use_container_width=True)
+st.caption("Rising lines mean recent daily swings have become larger. EWMA weights recent days more heavily.")
+
 # Bottom navigation
 st.markdown("---")
 col_nav1, col_nav2 = st.columns(2)
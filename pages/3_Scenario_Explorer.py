@@ -8,7 +8,8 @@ import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
-from utils.simulation import simulate_single_asset_paths
+from utils.simulation import summarize_asset_paths_batch
+from utils.returns_cache import get_return_moments
 from utils.explain import explain_scenario_paths
 from assets.styles import COLORS
 
@@ -85,23 +86,31 @@ with col_control2:
 
 st.markdown("---")
 
-# Run simulation
-with st.spinner(f"Simulating scenarios for {selected_symbol}..."):
-    # Get price series for selected symbol
-    price_series = prices[selected_symbol]
-    current_price = current_prices[selected_symbol]
-    
-    # Simulate paths
-    simulated_paths = simulate_single_asset_paths(
-        price_series,
-        current_price,
-        horizon_days=horizon,
-        n_simulations=500,
-        random_seed=42
-    )
+# Summarize scenarios for every holding once per horizon; switching assets is a lookup
+scenario_key = (get_return_moments(prices).fingerprint, horizon, tuple(sorted(current_prices.items())))
+if st.session_state.get('scenario_paths', {}).get('key') != scenario_key:
+    with st.spinner("Simulating scenarios for all holdings..."):
+        st.session_state.scenario_paths = {
+            'key': scenario_key,
+            'summaries': summarize_asset_paths_batch(
+                prices,
+                current_prices,
+                horizon_days=horizon,
+                n_simulations=500,
+                random_seed=42
+            )
+        }
+
+if selected_symbol not in st.session_state.scenario_paths['summaries']:
+    st.warning(f"⚠️ No price is available for {selected_symbol}, so it cannot be simulated.")
+    st.stop()
+
+with st.spinner(f"Preparing scenarios for {selected_symbol}..."):
+    scenario = st.session_state.scenario_paths['summaries'][selected_symbol]
+    current_price = scenario['start_price']
     
     # Calculate statistics
-    final_prices = simulated_paths[:, -1]
+    final_prices = scenario['final_prices']
     pct_changes = (final_prices - current_price) / current_price * 100
     
     median_change = np.median(pct_changes)
@@ -146,13 +155,10 @@ st.markdown("### 📈 Simulated Price Scenarios")
 fig_paths = go.Figure()
 
 # Plot sample of paths (50 paths for clarity)
-n_display = 50
-sample_indices = np.random.choice(simulated_paths.shape[0], n_display, replace=False)
-
-for idx in sample_indices:
+for sample_path in scenario['sample_paths']:
     fig_paths.add_trace(go.Scatter(
         x=list(range(horizon + 1)),
-        y=simulated_paths[idx, :],
+        y=sample_path,
         mode='lines',
         line=dict(color=COLORS['secondary'], width=0.5),
         opacity=0.3,
@@ -161,7 +167,7 @@ for idx in sample_indices:
     ))
 
 # Add median path
-median_path = np.percentile(simulated_paths, 50, axis=0)
+median_path = scenario['bands'][50]
 fig_paths.add_trace(go.Scatter(
     x=list(range(horizon + 1)),
     y=median_path,
@@ -180,8 +186,8 @@ fig_paths.add_hline(
 )
 
 # Add uncertainty bands (5th and 95th percentiles)
-upper_band = np.percentile(simulated_paths, 95, axis=0)
-lower_band = np.percentile(simulated_paths, 5, axis=0)
+upper_band = scenario['bands'][95]
+lower_band = scenario['bands'][5]
 
 fig_paths.add_trace(go.Scatter(
     x=list(range(horizon + 1)),
@@ -211,7 +217,7 @@ fig_paths.update_layout(
 st.plotly_chart(fig_paths, use_container_width=True)
 
 # Explanation
-scenario_explanation = explain_scenario_paths(current_price, simulated_paths, horizon)
+scenario_explanation = explain_scenario_paths(current_price, final_prices, horizon)
 st.info(f"**Interpretation:** {scenario_explanation}")
 
 st.markdown("---")
@@ -153,7 +153,8 @@ with col_gen2:
                     risk_level=risk_level,
                     risk_contrib=risk_contrib,
                     simulated_values=simulated_values,
-                    summary_text=summary_text
+                    summary_text=summary_text,
+                    risk_surface=analysis.get('risk_surface')
                 )
                 
                 st.success(f"✅ Report generated successfully!")
@@ -0,0 +1,30 @@
+# portfolio_risk_app/tests/conftest.py
+"""
+Shared test fixtures.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def prices() -> pd.DataFrame:
+    """Two years of synthetic daily closes for four correlated assets."""
+    rng = np.random.default_rng(7)
+    n_days, n_assets = 500, 4
+    
+    factor = np.linalg.cholesky(0.0001 * (0.3 + 0.7 * np.eye(n_assets)))
+    returns = 0.0003 + rng.standard_normal((n_days, n_assets)) @ factor.T
+    
+    return pd.DataFrame(
+        100 * np.cumprod(1 + returns, axis=0),
+        index=pd.bdate_range('2023-01-02', periods=n_days),
+        columns=['AAA', 'BBB', 'CCC', 'DDD']
+    )
+
+
+@pytest.fixture
+def weights() -> np.ndarray:
+    """Unequal weights for the four fixture assets."""
+    return np.array([0.4, 0.3, 0.2, 0.1])
@@ -0,0 +1,160 @@
+# portfolio_risk_app/tests/test_incremental_risk.py
+"""
+Tests for incremental risk statistics.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.incremental_risk import IncrementalRiskModel, cholesky_update
+from utils.price_matrix import asset_returns
+
+
+def assert_matches_rebuild(model: IncrementalRiskModel, prices: pd.DataFrame,
+                           window=None):
+    """Check an incrementally edited model against one built from scratch."""
+    rebuilt = IncrementalRiskModel.from_prices(prices, window=window)
+    
+    assert model.symbols == rebuilt.symbols
+    assert model.dates.equals(rebuilt.dates)
+    np.testing.assert_allclose(model.mean.values, rebuilt.mean.values, rtol=1e-10, atol=1e-16)
+    np.testing.assert_allclose(model.cov.values, rebuilt.cov.values, rtol=1e-9, atol=1e-16)
+    np.testing.assert_allclose(model.factor @ model.factor.T, rebuilt.cov.values,
+                               rtol=1e-9, atol=1e-16)
+
+
+def random_spd(n: int, seed: int) -> np.ndarray:
+    """Random well-conditioned symmetric positive definite matrix."""
+    a = np.random.default_rng(seed).standard_normal((n, n))
+    return a @ a.T + n * np.eye(n)
+
+
+def test_cholesky_update_matches_refactorization():
+    matrix = random_spd(6, 0)
+    vector = np.random.default_rng(1).standard_normal(6)
+    factor = np.linalg.cholesky(matrix)
+    
+    cholesky_update(factor, vector)
+    
+    np.testing.assert_allclose(factor, np.linalg.cholesky(matrix + np.outer(vector, vector)))
+
+
+def test_cholesky_downdate_undoes_update():
+    matrix = random_spd(6, 2)
+    vector = np.random.default_rng(3).standard_normal(6)
+    factor = np.linalg.cholesky(matrix)
+    
+    cholesky_update(factor, vector)
+    cholesky_update(factor, vector, downdate=True)
+    
+    np.testing.assert_allclose(factor, np.linalg.cholesky(matrix))
+
+
+def test_downdate_past_positive_definiteness_raises():
+    factor = np.eye(2)
+    
+    with pytest.raises(np.linalg.LinAlgError):
+        cholesky_update(factor, np.array([2.0, 0.0]), downdate=True)
+
+
+def test_add_asset_matches_rebuild(prices):
+    model = IncrementalRiskModel.from_prices(prices[['AAA', 'BBB', 'CCC']])
+    
+    assert model.add_asset('DDD', asset_returns(prices)['DDD'])
+    
+    assert_matches_rebuild(model, prices)
+
+
+def test_add_asset_with_short_history_rebuilds_over_shared_days(prices):
+    prices = prices.copy()
+    prices.iloc[:300, 3] = np.nan
+    model = IncrementalRiskModel.from_prices(prices[['AAA', 'BBB', 'CCC']])
+    
+    assert model.add_asset('DDD', asset_returns(prices)['DDD'])
+    
+    assert model.n_obs == len(prices) - 301
+    assert_matches_rebuild(model, prices)
+
+
+def test_add_asset_with_too_little_overlap_is_skipped(prices):
+    prices = prices.copy()
+    prices.iloc[:-5, 3] = np.nan
+    model = IncrementalRiskModel.from_prices(prices[['AAA', 'BBB', 'CCC']])
+    
+    assert not model.add_asset('DDD', asset_returns(prices)['DDD'])
+    
+    assert_matches_rebuild(model, prices[['AAA', 'BBB', 'CCC']])
+
+
+def test_removing_the_short_asset_restores_the_window(prices):
+    prices = prices.iloc[:250].copy()
+    prices.iloc[:210, 3] = np.nan
+    model = IncrementalRiskModel.from_prices(prices[['AAA', 'BBB', 'CCC']])
+    
+    assert model.add_asset('DDD', asset_returns(prices)['DDD'])
+    assert model.n_obs == 39
+    
+    model.remove_asset('DDD')
+    
+    assert model.n_obs == 249
+    assert_matches_rebuild(model, prices[['AAA', 'BBB', 'CCC']])
+
+
+def test_sync_extends_a_window_built_from_a_recent_listing(prices):
+    prices = prices.copy()
+    prices.iloc[:-40, 3] = np.nan
+    model = IncrementalRiskModel.from_prices(prices[['DDD']])
+    
+    current = prices[['AAA', 'BBB']]
+    model.sync(current)
+    
+    assert model.n_obs == len(prices) - 1
+    assert_matches_rebuild(model, current)
+
+
+@pytest.mark.parametrize('symbol', ['AAA', 'CCC', 'DDD'])
+def test_remove_asset_matches_rebuild(prices, symbol):
+    model = IncrementalRiskModel.from_prices(prices)
+    
+    model.remove_asset(symbol)
+    
+    assert_matches_rebuild(model, prices.drop(columns=symbol))
+
+
+def test_add_bar_rolls_the_window(prices):
+    window = 250
+    model = IncrementalRiskModel.from_prices(prices.iloc[:400], window=window)
+    new_returns = asset_returns(prices).iloc[399:]
+    
+    for date, row in zip(new_returns.index, new_returns.to_numpy()):
+        model.add_bar(date, row)
+    
+    assert model.n_obs == window
+    assert_matches_rebuild(model, prices, window=window)
+
+
+def test_window_is_applied_on_construction(prices):
+    model = IncrementalRiskModel.from_prices(prices, window=60)
+    
+    assert model.n_obs == 60
+    assert model.dates[-1] == prices.index[-1]
+
+
+def test_sync_matches_rebuild_after_holding_and_bar_edits(prices):
+    model = IncrementalRiskModel.from_prices(prices[['AAA', 'BBB', 'CCC']].iloc[:450], window=300)
+    
+    current = prices[['AAA', 'CCC', 'DDD']]
+    model.sync(current)
+    
+    assert_matches_rebuild(model, current, window=300)
+
+
+def test_score_matches_covariance(prices, weights):
+    model = IncrementalRiskModel.from_prices(prices)
+    
+    risk = model.score(pd.Series(weights, index=prices.columns))
+    
+    expected_volatility = np.sqrt(weights @ model.cov.values @ weights)
+    assert risk['volatility'] == pytest.approx(expected_volatility, rel=1e-10)
+    assert risk['cvar'] < risk['var']
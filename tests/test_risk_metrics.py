@@ -0,0 +1,143 @@
+# portfolio_risk_app/tests/test_risk_metrics.py
+"""
+Tests for historical, batch and parametric risk metrics.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import norm
+
+from utils.risk_metrics import (
+    CORNISH_FISHER, GAUSSIAN, ParametricRisk,
+    calculate_batch_risk_metrics, calculate_cvar, calculate_ewma_volatility,
+    calculate_max_drawdown, calculate_portfolio_returns, calculate_rolling_cvar,
+    calculate_var, calculate_volatility, cornish_fisher_quantile
+)
+from utils.simulation_engine import ewma_volatility
+
+
+def loop_metrics(prices: pd.DataFrame, weight_matrix: np.ndarray) -> pd.DataFrame:
+    """Per-portfolio metrics from the single-portfolio functions."""
+    rows = []
+    for weights in weight_matrix:
+        returns = calculate_portfolio_returns(prices, weights)
+        rows.append({
+            'var': calculate_var(returns),
+            'cvar': calculate_cvar(returns),
+            'volatility': calculate_volatility(returns),
+            'max_drawdown': calculate_max_drawdown(returns)
+        })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def weight_matrix(prices) -> np.ndarray:
+    """Random long-only portfolios over the fixture assets."""
+    weight_matrix = np.random.default_rng(3).random((25, prices.shape[1]))
+    return weight_matrix / weight_matrix.sum(axis=1, keepdims=True)
+
+
+def test_batch_metrics_match_single_portfolio_loop(prices, weight_matrix):
+    batch = calculate_batch_risk_metrics(prices, weight_matrix)
+    expected = loop_metrics(prices, weight_matrix)
+    
+    for column in expected.columns:
+        np.testing.assert_allclose(batch[column].values, expected[column].values, rtol=1e-10)
+
+
+def test_batch_metrics_match_loop_with_missing_history(prices, weight_matrix):
+    prices = prices.copy()
+    prices.iloc[:200, 0] = np.nan
+    weight_matrix = np.vstack([weight_matrix, [1.0, 0.0, 0.0, 0.0]])
+    
+    batch = calculate_batch_risk_metrics(prices, weight_matrix)
+    expected = loop_metrics(prices, weight_matrix)
+    
+    for column in expected.columns:
+        np.testing.assert_allclose(batch[column].values, expected[column].values, rtol=1e-10)
+
+
+def test_batch_metrics_add_monetary_amounts(prices, weight_matrix):
+    batch = calculate_batch_risk_metrics(prices, weight_matrix, current_value=1e6,
+                                         names=[f'p{i}' for i in range(len(weight_matrix))])
+    
+    assert list(batch.index[:2]) == ['p0', 'p1']
+    np.testing.assert_allclose(batch['var_amount'], np.abs(batch['var']) * 1e6)
+
+
+@pytest.mark.parametrize('z', [-2.326, -1.645, 0.0, 1.0])
+def test_cornish_fisher_is_gaussian_without_skew_or_kurtosis(z):
+    assert cornish_fisher_quantile(z, 0.0, 0.0) == z
+
+
+def test_cornish_fisher_matches_hand_expansion():
+    z, skewness, excess_kurtosis = -1.645, -0.5, 3.0
+    expected = (z + (z ** 2 - 1) * skewness / 6 + (z ** 3 - 3 * z) * excess_kurtosis / 24
+                - (2 * z ** 3 - 5 * z) * skewness ** 2 / 36)
+    
+    assert cornish_fisher_quantile(z, skewness, excess_kurtosis) == pytest.approx(expected)
+    # Negative skew and fat tails push the 5% quantile further out
+    assert cornish_fisher_quantile(z, skewness, excess_kurtosis) < z
+
+
+def test_gaussian_score_matches_closed_form(prices, weights):
+    risk = ParametricRisk(prices, confidence_level=0.99).score(weights, GAUSSIAN)
+    returns = calculate_portfolio_returns(prices, weights)
+    z = norm.ppf(0.01)
+    
+    assert risk['volatility'] == pytest.approx(returns.std(), rel=1e-10)
+    assert risk['var'] == pytest.approx(returns.mean() + z * returns.std(), rel=1e-10)
+    assert risk['cvar'] == pytest.approx(returns.mean() - norm.pdf(z) / 0.01 * returns.std(),
+                                         rel=1e-10)
+
+
+def test_cornish_fisher_cvar_lies_beyond_var(prices, weights):
+    risk = ParametricRisk(prices).score(weights, CORNISH_FISHER)
+    
+    assert risk['cvar'] < risk['var'] < 0
+
+
+def test_component_var_sums_to_portfolio_var(prices, weights):
+    scorer = ParametricRisk(prices)
+    
+    marginal, components = scorer.marginal_var(weights)
+    
+    assert components.sum() == pytest.approx(-scorer.score(weights)['var'], rel=1e-10)
+    np.testing.assert_allclose(components, weights * marginal)
+
+
+def test_unknown_parametric_method_raises(prices, weights):
+    with pytest.raises(ValueError):
+        ParametricRisk(prices).score(weights, 'lognormal')
+
+
+def test_ewma_volatility_matches_recursion_and_simulation_engine(prices):
+    returns = prices.pct_change().dropna()
+    values = returns.to_numpy()
+    
+    variance = values.var(axis=0)
+    expected = []
+    for row in values:
+        variance = 0.94 * variance + 0.06 * row ** 2
+        expected.append(np.sqrt(variance))
+    
+    volatility = calculate_ewma_volatility(returns)
+    forecasts, current = ewma_volatility(values)
+    
+    np.testing.assert_allclose(volatility.to_numpy(), expected, rtol=1e-12)
+    np.testing.assert_allclose(forecasts[1:], volatility.to_numpy()[:-1], rtol=1e-12)
+    np.testing.assert_allclose(current, volatility.iloc[-1], rtol=1e-12)
+
+
+@pytest.mark.parametrize('window', [20, 63])
+def test_rolling_cvar_matches_cvar_of_each_window(prices, window):
+    returns = prices.pct_change().dropna().round(3)  # rounding creates ties at VaR
+    
+    rolling = calculate_rolling_cvar(returns, window)
+    
+    assert rolling.iloc[:window - 1].isna().all().all()
+    for end in range(window - 1, len(returns), 37):
+        expected = [calculate_cvar(returns[column].iloc[end - window + 1:end + 1])
+                    for column in returns.columns]
+        np.testing.assert_allclose(rolling.iloc[end], expected, rtol=1e-10)
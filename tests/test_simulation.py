@@ -0,0 +1,81 @@
+# portfolio_risk_app/tests/test_simulation.py
+"""
+Tests for simulation statistics and summaries.
+"""
+
+import numpy as np
+import pytest
+
+from utils.simulation import (
+    calculate_simulation_statistics, simulate_single_asset_paths, summarize_asset_paths_batch
+)
+
+
+def baseline_statistics(values: np.ndarray, current_value: float, level: float) -> dict:
+    """Reference statistics from full sorts (np.percentile and a tail mask)."""
+    var_value = np.percentile(values, (1 - level) * 100)
+    
+    return {
+        'percentiles': {f'{p}th': np.percentile(values, p) for p in (5, 25, 50, 75, 95)},
+        'mean_value': values.mean(),
+        'std_value': values.std(),
+        'prob_gain': np.mean(values > current_value),
+        'prob_significant_loss': np.mean(values < current_value * 0.95),
+        'var': var_value,
+        'cvar': values[values <= var_value].mean()
+    }
+
+
+@pytest.mark.parametrize('n', [1, 2, 19, 1000, 10001])
+def test_statistics_match_sorted_baseline(n):
+    values = 1e5 * (1 + np.random.default_rng(n).normal(0, 0.05, n))
+    
+    stats = calculate_simulation_statistics(values, 1e5, confidence_levels=(0.95, 0.99))
+    
+    for level, label in [(0.95, '95'), (0.99, '99')]:
+        expected = baseline_statistics(values, 1e5, level)
+        assert stats[f'var_{label}'] == pytest.approx(expected['var'], rel=1e-12)
+        assert stats[f'cvar_{label}'] == pytest.approx(expected['cvar'], rel=1e-12)
+    
+    for name, value in expected['percentiles'].items():
+        assert stats['percentiles'][name] == pytest.approx(value, rel=1e-12)
+    for name in ['mean_value', 'std_value', 'prob_gain', 'prob_significant_loss']:
+        assert stats[name] == pytest.approx(expected[name], rel=1e-12)
+
+
+def test_statistics_count_ties_with_var():
+    values = np.array([90.0, 95.0, 95.0, 95.0, 95.0, 100.0, 105.0, 110.0, 115.0, 120.0])
+    
+    stats = calculate_simulation_statistics(values, 100.0, confidence_levels=(0.75,))
+    expected = baseline_statistics(values, 100.0, 0.75)
+    
+    assert stats['var_75'] == expected['var']
+    assert stats['cvar_75'] == pytest.approx(expected['cvar'])
+
+
+def test_statistics_leave_input_unchanged():
+    values = np.random.default_rng(0).normal(100, 5, 500)
+    original = values.copy()
+    
+    calculate_simulation_statistics(values, 100.0)
+    
+    np.testing.assert_array_equal(values, original)
+
+
+def test_scenario_summaries_match_single_asset_paths(prices):
+    current_prices = {'AAA': 101.0, 'CCC': 55.0}
+    
+    summaries = summarize_asset_paths_batch(prices, current_prices, horizon_days=14,
+                                            n_simulations=500, n_sample_paths=20)
+    
+    for symbol in prices.columns:
+        start_price = current_prices.get(symbol, prices[symbol].iloc[-1])
+        paths = simulate_single_asset_paths(prices[symbol], start_price, horizon_days=14,
+                                            n_simulations=500)
+        summary = summaries[symbol]
+        
+        assert summary['start_price'] == start_price
+        np.testing.assert_allclose(summary['final_prices'], paths[:, -1], rtol=1e-12)
+        np.testing.assert_allclose(summary['sample_paths'], paths[:20], rtol=1e-12)
+        np.testing.assert_allclose(summary['bands'][5], np.percentile(paths, 5, axis=0),
+                                   rtol=1e-12)
@@ -0,0 +1,89 @@
+# portfolio_risk_app/tests/test_simulation_engine.py
+"""
+Tests for the chunked Monte Carlo engine.
+"""
+
+import numpy as np
+import pytest
+
+from utils.simulation import build_return_model, simulate_portfolio_outcomes
+from utils.simulation_engine import (
+    NormalModel, chunk_size_for_budget, iter_chunks, simulate_final_values
+)
+from utils.variance_reduction import estimate_tail_risk
+
+
+def test_iter_chunks_covers_every_path_once():
+    chunks = list(iter_chunks(10, 4))
+    
+    assert chunks == [(0, 4), (4, 8), (8, 10)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 333, 2000])
+def test_final_values_do_not_depend_on_chunk_size(prices, weights, chunk_size):
+    model = build_return_model(prices, NormalModel.name)
+    
+    whole = simulate_final_values(model, weights, 1e5, horizon_days=20,
+                                  n_simulations=2000, chunk_size=2000)
+    chunked = simulate_final_values(model, weights, 1e5, horizon_days=20,
+                                    n_simulations=2000, chunk_size=chunk_size)
+    
+    np.testing.assert_array_equal(chunked, whole)
+
+
+def test_memory_budget_bounds_chunk_size(prices):
+    model = build_return_model(prices, NormalModel.name)
+    
+    chunk_size = chunk_size_for_budget(model, horizon_days=30, n_simulations=10 ** 6,
+                                       memory_budget_mb=1)
+    
+    assert 1 <= chunk_size < 10 ** 6
+    assert chunk_size * model.path_bytes(30) <= 1024 * 1024
+
+
+def test_memory_budget_does_not_change_outcomes(prices, weights):
+    unbounded = simulate_portfolio_outcomes(prices, weights, 1e5, n_simulations=3000,
+                                            use_cache=False)
+    bounded = simulate_portfolio_outcomes(prices, weights, 1e5, n_simulations=3000,
+                                          memory_budget_mb=0.05, use_cache=False)
+    
+    np.testing.assert_array_equal(bounded, unbounded)
+
+
+@pytest.mark.parametrize('model_name', ['student_t', 't_copula'])
+def test_fat_tailed_models_do_not_depend_on_chunk_size(prices, weights, model_name):
+    model = build_return_model(prices, model_name)
+    
+    whole = simulate_final_values(model, weights, 1e5, horizon_days=10,
+                                  n_simulations=1500, chunk_size=1500)
+    chunked = simulate_final_values(model, weights, 1e5, horizon_days=10,
+                                    n_simulations=1500, chunk_size=128)
+    
+    np.testing.assert_allclose(chunked, whole, rtol=1e-12)
+
+
+def test_student_t_keeps_the_historical_covariance(prices, weights):
+    model = build_return_model(prices, 'student_t', {'dof': 5.0})
+    rng = np.random.default_rng(0)
+    
+    portfolio_returns = model.sample_portfolio_returns(rng, 200000, 1, weights)
+    
+    expected_volatility = np.sqrt(weights @ model.cov_matrix @ weights)
+    assert portfolio_returns.std() == pytest.approx(expected_volatility, rel=0.02)
+
+
+def test_tail_risk_needs_two_replicates(prices, weights):
+    model = build_return_model(prices, NormalModel.name)
+    
+    with pytest.raises(ValueError):
+        estimate_tail_risk(model, weights, 1e5, n_simulations=1000, n_replicates=1)
+
+
+def test_sobol_reports_requested_and_simulated_paths(prices, weights):
+    model = build_return_model(prices, NormalModel.name)
+    
+    result = estimate_tail_risk(model, weights, 1e5, horizon_days=10, n_simulations=3000,
+                                method='sobol', n_replicates=4)
+    
+    assert result['n_requested'] == 3000
+    assert result['n_paths'] == 4 * 1024
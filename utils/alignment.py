@@ -0,0 +1,147 @@
+# portfolio_risk_app/utils/alignment.py
+"""
+Alignment Module
+Aligns price histories from different exchanges and listing dates.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Tuple
+
+
+ALIGNMENT_POLICIES = ('inner', 'ffill', 'pairwise')
+
+
+def _last_valid_positions(valid: np.ndarray) -> np.ndarray:
+    """Row index of the most recent valid observation per cell (-1 if none)."""
+    rows = np.arange(valid.shape[0])[:, None]
+    positions = np.where(valid, rows, -1)
+    return np.maximum.accumulate(positions, axis=0)
+
+
+def align_values(values: np.ndarray, dates: pd.DatetimeIndex,
+                 policy: str = 'ffill',
+                 max_fill_days: int = 5) -> Tuple[np.ndarray, np.ndarray, Dict]:
+    """
+    Align a union-calendar price block under a missing-data policy.
+    
+    Array counterpart of align_prices, for callers that hold prices as a
+    NumPy block (e.g. PriceMatrix) and should not build a DataFrame.
+    
+    Parameters
+    ----------
+    values : np.ndarray
+        Prices of shape (n_dates, n_symbols) on the union of all symbols'
+        dates (NaN where missing)
+    dates : pd.DatetimeIndex
+        Date of each row
+    policy : str
+        One of 'inner', 'ffill' or 'pairwise' (default 'ffill')
+    max_fill_days : int
+        Longest gap, in calendar days, bridged by forward-filling
+    
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, Dict]
+        Aligned block, boolean mask of the rows kept, and the report
+        described in align_prices
+    """
+    if policy not in ALIGNMENT_POLICIES:
+        raise ValueError(f"Unknown alignment policy: {policy}")
+    
+    valid = ~np.isnan(values)
+    n_rows, n_cols = values.shape
+    
+    # Forward-fill limited by calendar-day distance to the last observation
+    last_valid = _last_valid_positions(valid)
+    days = pd.DatetimeIndex(dates).values.astype('datetime64[D]').astype(np.int64)
+    gap_days = days[:, None] - days[np.maximum(last_valid, 0)]
+    fillable = (last_valid >= 0) & (gap_days <= max_fill_days)
+    
+    # Cells before a symbol's first price are not gaps: a newly listed
+    # ticker must not truncate the other symbols' history
+    unlisted = last_valid < 0
+    
+    inner_rows = valid.all(axis=1)
+    ffill_rows = (fillable | unlisted).all(axis=1) & (fillable.sum(axis=1) >= min(2, n_cols))
+    pairwise_rows = valid.sum(axis=1) >= min(2, n_cols)
+    
+    overlap = valid.T.astype(np.int64) @ valid.astype(np.int64)
+    
+    report = {
+        'policy': policy,
+        'total_rows': n_rows,
+        'rows_kept': {
+            'inner': int(inner_rows.sum()),
+            'ffill': int(ffill_rows.sum()),
+            'pairwise': int(pairwise_rows.sum())
+        },
+        'filled_cells': int((fillable & ~valid)[ffill_rows].sum()),
+        'unlisted_cells': int(unlisted[ffill_rows].sum()),
+        'min_symbol_rows': int(fillable[ffill_rows].sum(axis=0).min()) if n_cols else 0,
+        'min_pair_overlap': int(overlap.min()) if n_cols else 0,
+        'max_fill_days': max_fill_days
+    }
+    
+    if policy == 'inner':
+        kept = inner_rows
+        aligned = values[kept]
+    elif policy == 'ffill':
+        kept = ffill_rows
+        cols = np.arange(n_cols)[None, :]
+        rows = np.maximum(last_valid[kept], 0)
+        aligned = np.where(fillable[kept], values[rows, cols], np.nan).astype(values.dtype, copy=False)
+    else:
+        kept = pairwise_rows
+        aligned = values[kept]
+    
+    return aligned, kept, report
+
+
+def align_prices(prices: pd.DataFrame,
+                 policy: str = 'ffill',
+                 max_fill_days: int = 5) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Align a union-calendar price frame under a missing-data policy.
+    
+    Policies:
+    
+    - ``inner``: keep only dates on which every symbol traded.
+    - ``ffill``: carry each price forward across gaps of at most
+      ``max_fill_days`` calendar days (exchange holidays, suspensions),
+      then keep dates on which every listed symbol has a price. Dates
+      before a symbol's first price are kept with NaN for that symbol, so
+      a newly listed ticker does not truncate the others' history.
+    - ``pairwise``: keep every date with at least two prices and leave the
+      gaps as NaN, so covariances use all overlapping dates of each pair.
+    
+    Where NaN remains, moments are pairwise-complete and portfolio returns
+    (calculate_portfolio_returns, calculate_batch_risk_metrics) renormalize
+    the weights over the assets that have a return on each date.
+    
+    The calendar work is done on a dates x symbols presence mask, so the
+    report covers all three policies at the cost of one pass.
+    
+    Parameters
+    ----------
+    prices : pd.DataFrame
+        Prices on the union of all symbols' dates (NaN where missing)
+    policy : str
+        One of 'inner', 'ffill' or 'pairwise' (default 'ffill')
+    max_fill_days : int
+        Longest gap, in calendar days, bridged by forward-filling
+    
+    Returns
+    -------
+    Tuple[pd.DataFrame, Dict]
+        Aligned prices, and a report with the total row count, the rows each
+        policy keeps, the number of forward-filled and not-yet-listed cells,
+        the fewest priced rows of any symbol under 'ffill' and the smallest
+        pairwise overlap
+    """
+    aligned, kept, report = align_values(prices.to_numpy(dtype=float), prices.index,
+                                         policy=policy, max_fill_days=max_fill_days)
+    
+    aligned = pd.DataFrame(aligned, index=prices.index[kept], columns=prices.columns, copy=False)
+    aligned.attrs['alignment'] = report
+    return aligned, report
@@ -4,11 +4,275 @@ Data Loader Module
 Fetches and caches historical stock prices.
 """
 
+import os
+import threading
+import time
+import numpy as np
 import yfinance as yf
 import pandas as pd
-from typing import List, Optional
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from datetime import datetime, timedelta
 import streamlit as st
+from utils.price_cache import SharedPriceCache
+from utils.price_matrix import PriceMatrix
+from utils.price_store import PriceStore, normalize_index, period_offset
+
+
+class FetchResult(NamedTuple):
+    """Outcome of a batched price download."""
+    prices: pd.DataFrame
+    failures: Dict[str, str]
+
+
+class YFinanceSource:
+    """
+    Default price source backed by Yahoo Finance.
+    
+    All symbols are requested in a single bulk ``yf.download`` call instead
+    of one ``Ticker.history`` round trip per symbol.
+    """
+    
+    def history(self, symbols: List[str],
+                period: Optional[str] = "1y",
+                start: Optional[str] = None,
+                end: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Download OHLCV history for several symbols at once.
+        
+        Parameters
+        ----------
+        symbols : List[str]
+            Stock ticker symbols
+        period : Optional[str]
+            Period to fetch (ignored when start is given)
+        start : Optional[str]
+            Start date in YYYY-MM-DD format
+        end : Optional[str]
+            End date in YYYY-MM-DD format
+        
+        Returns
+        -------
+        Dict[str, pd.DataFrame]
+            Per-symbol OHLCV frames; symbols without data are omitted
+        """
+        if start:
+            data = yf.download(symbols, start=start, end=end, group_by='ticker',
+                               auto_adjust=True, threads=True, progress=False)
+        else:
+            data = yf.download(symbols, period=period, group_by='ticker',
+                               auto_adjust=True, threads=True, progress=False)
+        
+        frames = {}
+        for symbol in symbols:
+            if isinstance(data.columns, pd.MultiIndex):
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                frame = data[symbol]
+            else:
+                frame = data
+            frame = frame.dropna(how='all')
+            if not frame.empty:
+                frames[symbol] = frame
+        
+        return frames
+
+
+class LocalPriceSource:
+    """
+    In-memory price source, used as a stand-in for tests and benchmarks.
+    """
+    
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        """
+        Initialize from per-symbol OHLCV frames.
+        
+        Parameters
+        ----------
+        frames : Dict[str, pd.DataFrame]
+            Mapping of symbol to a frame with at least a Close column
+        """
+        self.frames = {symbol: normalize_index(frame) for symbol, frame in frames.items()}
+    
+    @classmethod
+    def from_csv_dir(cls, path: str) -> 'LocalPriceSource':
+        """
+        Load one ``<SYMBOL>.csv`` file per symbol from a directory.
+        
+        Parameters
+        ----------
+        path : str
+            Directory containing CSV files indexed by date
+        
+        Returns
+        -------
+        LocalPriceSource
+            Source serving the loaded frames
+        """
+        frames = {}
+        for filename in os.listdir(path):
+            if filename.endswith('.csv'):
+                symbol = filename[:-4]
+                frames[symbol] = pd.read_csv(os.path.join(path, filename),
+                                             index_col=0, parse_dates=True)
+        return cls(frames)
+    
+    def history(self, symbols: List[str],
+                period: Optional[str] = "1y",
+                start: Optional[str] = None,
+                end: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        """Return stored frames for the requested symbols and date range."""
+        frames = {}
+        for symbol in symbols:
+            if symbol not in self.frames:
+                continue
+            frame = self.frames[symbol]
+            if start:
+                frame = frame[frame.index >= pd.Timestamp(start)]
+            elif period and len(frame) > 0:
+                frame = frame[frame.index >= frame.index[-1] - period_offset(period)]
+            if end:
+                frame = frame[frame.index < pd.Timestamp(end)]
+            if not frame.empty:
+                frames[symbol] = frame
+        return frames
+
+
+_price_source = YFinanceSource()
+
+_price_store = PriceStore()
+
+_price_cache = SharedPriceCache()
+
+SYMBOL_UNIVERSE_PATH = os.path.join(os.path.dirname(__file__), '..', 'assets', 'symbol_universe.csv')
+
+# Seconds a quote stays current, both in the quote cache and when a stored
+# intraday bar stands in for a quote
+QUOTE_TTL = 60
+
+# Process-wide last prices, shared by all sessions and warmed by the prefetcher
+_quote_cache = SharedPriceCache(ttl=QUOTE_TTL)
+
+# Validation answers expire after a day (valid) or five minutes (invalid)
+VALID_SYMBOL_TTL = 24 * 3600
+INVALID_SYMBOL_TTL = 5 * 60
+
+# Missing-data handling: bridge exchange holidays of up to a week
+ALIGNMENT_POLICY = 'ffill'
+MAX_FILL_DAYS = 5
+
+_symbol_universe: Optional[Dict[str, str]] = None
+_validation_cache: Dict[str, Tuple[bool, float]] = {}
+_validation_lock = threading.Lock()
+
+
+def set_price_source(source) -> None:
+    """
+    Replace the source used for all price downloads.
+    
+    Parameters
+    ----------
+    source : object
+        Any object exposing ``history(symbols, period, start, end)``
+    """
+    global _price_source
+    _price_source = source
+    _price_cache.clear()
+    _quote_cache.clear()
+
+
+def get_price_source():
+    """Return the active price source."""
+    return _price_source
+
+
+def get_price_cache_stats() -> Dict[str, int]:
+    """Return hit/miss/eviction counters of the shared price cache."""
+    return _price_cache.stats()
+
+
+def _fetch_price_block(symbols: List[str], period: str, source, use_store: bool,
+                       dtype) -> Tuple[Optional[PriceMatrix], Dict[str, str]]:
+    """Fetch closes through the shared cache into one unaligned PriceMatrix."""
+    shared = source is None or source is _price_source
+    source = source or _price_source
+    symbols = list(dict.fromkeys(symbols))
+    keys = [(symbol, period) for symbol in symbols]
+    
+    def load(missing):
+        batch = [symbol for symbol, _ in missing]
+        if use_store:
+            frames, errors = _price_store.history(batch, period, source)
+        else:
+            frames, errors = source.history(batch, period=period), {}
+        
+        loaded = {}
+        for key in missing:
+            frame = frames.get(key[0])
+            if frame is not None and not frame.empty and 'Close' in frame:
+                loaded[key] = normalize_index(frame)['Close']
+        return loaded, {(symbol, period): error for symbol, error in errors.items()}
+    
+    if shared:
+        # Concurrent sessions asking for the same symbols share one download
+        loaded, errors = _price_cache.get_many(keys, load)
+    else:
+        try:
+            loaded, errors = load(keys)
+        except Exception as e:
+            loaded, errors = {}, {key: str(e) for key in keys}
+    
+    closes = {}
+    failures = {}
+    for key in keys:
+        if key in loaded:
+            closes[key[0]] = loaded[key]
+        else:
+            failures[key[0]] = errors.get(key, "No data found")
+    
+    if not closes:
+        return None, failures
+    
+    # Align every symbol onto one date index in a single step
+    return PriceMatrix.from_series(closes, dtype=dtype), failures
+
+
+def fetch_price_history(symbols: List[str],
+                        period: str = "1y",
+                        source=None,
+                        use_store: bool = True,
+                        dtype=np.float64) -> FetchResult:
+    """
+    Fetch closing prices for many symbols in one batched request.
+    
+    History is served from the process-wide price cache, backed by the
+    on-disk price store, which only downloads bars newer than the last
+    stored one. Sessions requesting the same symbols concurrently share a
+    single download.
+    
+    Parameters
+    ----------
+    symbols : List[str]
+        List of stock ticker symbols
+    period : str
+        Period to fetch (default "1y")
+    source : optional
+        Price source to use instead of the active one (bypasses the
+        shared cache)
+    use_store : bool
+        If False, bypass the on-disk store and download the full period
+    dtype : numpy dtype
+        Float type of the price frame (default np.float64)
+    
+    Returns
+    -------
+    FetchResult
+        Wide Close frame (dates x symbols) and a mapping of failed
+        symbols to the reason they failed
+    """
+    block, failures = _fetch_price_block(symbols, period, source, use_store, dtype)
+    prices = block.to_frame() if block is not None else pd.DataFrame()
+    
+    return FetchResult(prices, failures)
 
 
 @st.cache_data(ttl=3600)
@@ -38,14 +302,13 @@ def fetch_stock_data(symbol: str,
         Historical price data with columns: Open, High, Low, Close, Volume
     """
     try:
-        ticker = yf.Ticker(symbol)
-        
         if start_date and end_date:
-            data = ticker.history(start=start_date, end=end_date)
+            frames = _price_source.history([symbol], start=start_date, end=end_date)
         else:
-            data = ticker.history(period=period)
+            frames = _price_source.history([symbol], period=period)
         
-        if data.empty:
+        data = frames.get(symbol)
+        if data is None or data.empty:
             raise ValueError(f"No data found for {symbol}")
         
         return data
@@ -54,9 +317,55 @@ def fetch_stock_data(symbol: str,
         raise ValueError(f"Error fetching data for {symbol}: {str(e)}")
 
 
-@st.cache_data(ttl=3600)
+def fetch_price_matrix(symbols: List[str],
+                       period: str = "1y",
+                       dtype=np.float64,
+                       policy: str = ALIGNMENT_POLICY,
+                       max_fill_days: int = MAX_FILL_DAYS) -> PriceMatrix:
+    """
+    Fetch historical closing prices for multiple stocks as a PriceMatrix.
+    
+    All symbols are downloaded in one batched request through the shared
+    price cache; symbols that fail are reported together in a single warning.
+    
+    Parameters
+    ----------
+    symbols : List[str]
+        List of stock ticker symbols
+    period : str
+        Period to fetch (default "1y")
+    dtype : numpy dtype
+        np.float32 halves memory for large universes (default np.float64)
+    policy : str
+        Missing-data alignment policy: 'inner', 'ffill' or 'pairwise'
+    max_fill_days : int
+        Longest gap in calendar days bridged by the 'ffill' policy
+    
+    Returns
+    -------
+    PriceMatrix
+        Contiguous dates x symbols price block; its ``alignment`` attribute
+        reports how many rows each policy kept
+    """
+    block, failures = _fetch_price_block(symbols, period, None, True, dtype)
+    
+    if failures:
+        failed = ", ".join(f"{symbol} ({reason})" for symbol, reason in failures.items())
+        st.warning(f"Could not fetch data for: {failed}")
+    
+    # Align on the NumPy block; a DataFrame is only built by callers that need one
+    prices = block.align(policy=policy, max_fill_days=max_fill_days) if block is not None else None
+    
+    if prices is None or len(prices) == 0:
+        raise ValueError("No valid price data found for any symbols")
+    
+    return prices
+
+
 def fetch_multiple_stocks(symbols: List[str], 
-                         period: str = "1y") -> pd.DataFrame:
+                         period: str = "1y",
+                         policy: str = ALIGNMENT_POLICY,
+                         max_fill_days: int = MAX_FILL_DAYS) -> pd.DataFrame:
     """
     Fetch historical closing prices for multiple stocks.
     
@@ -66,28 +375,118 @@ def fetch_multiple_stocks(symbols: List[str],
         List of stock ticker symbols
     period : str
         Period to fetch (default "1y")
+    policy : str
+        Missing-data alignment policy: 'inner', 'ffill' or 'pairwise'
+    max_fill_days : int
+        Longest gap in calendar days bridged by the 'ffill' policy
     
     Returns
     -------
     pd.DataFrame
-        DataFrame with symbols as columns and dates as index
+        DataFrame with symbols as columns and dates as index; the alignment
+        report is kept in ``attrs['alignment']``
+    """
+    return fetch_price_matrix(symbols, period=period, policy=policy,
+                              max_fill_days=max_fill_days).to_frame()
+
+
+def fetch_quotes(symbols: List[str]) -> Tuple[Dict[str, float], Dict[str, str]]:
     """
-    prices = pd.DataFrame()
+    Fetch last prices for symbols, downloading only the uncached ones.
     
-    for symbol in symbols:
-        try:
-            data = fetch_stock_data(symbol, period=period)
-            prices[symbol] = data['Close']
-        except Exception as e:
-            st.warning(f"Could not fetch data for {symbol}: {str(e)}")
+    Quotes live in a process-wide cache for QUOTE_TTL seconds, so the
+    prefetcher can warm them for every session; symbols missing from it
+    are fetched in one batched request, shared with any concurrent caller
+    asking for the same symbols.
     
-    # Drop rows with any missing data
-    prices = prices.dropna()
+    Parameters
+    ----------
+    symbols : List[str]
+        Stock ticker symbols
     
-    if prices.empty:
-        raise ValueError("No valid price data found for any symbols")
+    Returns
+    -------
+    Tuple[Dict[str, float], Dict[str, str]]
+        Last price per symbol, and the reason for each symbol without one
+    """
+    def load(missing):
+        frames = _price_source.history(list(missing), period="5d")
+        
+        quotes = {}
+        for symbol in missing:
+            frame = frames.get(symbol)
+            if frame is None or 'Close' not in frame:
+                continue
+            closes = frame['Close'].dropna()
+            if not closes.empty:
+                quotes[symbol] = float(closes.iloc[-1])
+        return quotes, {}
     
-    return prices
+    return _quote_cache.get_many(list(dict.fromkeys(symbols)), load)
+
+
+def _is_current_bar(symbol: str, bar_date: pd.Timestamp, now: pd.Timestamp) -> bool:
+    """Whether a stored last bar can stand in for a live quote."""
+    checked = _price_store.checked_at(symbol)
+    if checked is None:
+        # Not from the store: only a bar from an earlier day is known complete
+        return bar_date < now.normalize()
+    
+    final = checked.normalize() > bar_date
+    return final or (now - checked).total_seconds() <= QUOTE_TTL
+
+
+def get_quote_snapshot(symbols: List[str],
+                       prices: Optional[pd.DataFrame] = None) -> Dict[str, float]:
+    """
+    Get last prices for all symbols with at most one batched request.
+    
+    Symbols whose already-loaded price history reaches the latest trading
+    session are quoted from its last row, provided that bar is final (the
+    price store fetched it after its session's day) or was fetched within
+    QUOTE_TTL seconds; a bar fetched earlier the same day may be a stale
+    partial session. The remaining symbols come from fetch_quotes, whose
+    process-wide cache the prefetcher keeps warm for holdings.
+    
+    Parameters
+    ----------
+    symbols : List[str]
+        List of stock ticker symbols
+    prices : Optional[pd.DataFrame]
+        Price history already loaded (symbols as columns)
+    
+    Returns
+    -------
+    Dict[str, float]
+        Dictionary mapping symbols to current prices
+    """
+    now = pd.Timestamp.now()
+    today = now.normalize()
+    last_session = today if today.dayofweek < 5 else today - pd.offsets.BDay(1)
+    
+    quotes = {}
+    missing = []
+    
+    for symbol in dict.fromkeys(symbols):
+        if prices is not None and symbol in prices.columns:
+            closes = prices[symbol].dropna()
+            if not closes.empty and closes.index[-1] >= last_session \
+                    and _is_current_bar(symbol, closes.index[-1], now):
+                quotes[symbol] = float(closes.iloc[-1])
+                continue
+        missing.append(symbol)
+    
+    if missing:
+        fetched, errors = fetch_quotes(missing)
+        download_errors = sorted(set(errors.values()) - {"No data found"})
+        if download_errors:
+            st.warning(f"Could not fetch current prices: {'; '.join(download_errors)}")
+        
+        for symbol in missing:
+            if symbol in fetched:
+                quotes[symbol] = fetched[symbol]
+    
+    return quotes
 
 
 def get_current_prices(symbols: List[str]) -> dict:
@@ -104,24 +503,99 @@ def get_current_prices(symbols: List[str]) -> dict:
     dict
         Dictionary mapping symbols to current prices
     """
-    current_prices = {}
+    return get_quote_snapshot(symbols)
+
+
+def load_symbol_universe(path: Optional[str] = None) -> Dict[str, str]:
+    """
+    Load the local index of known ticker symbols.
     
-    for symbol in symbols:
-        try:
-            ticker = yf.Ticker(symbol)
-            # Get most recent price
-            hist = ticker.history(period="1d")
-            if not hist.empty:
-                current_prices[symbol] = hist['Close'].iloc[-1]
+    The index is a CSV file with ``symbol`` and ``exchange`` columns
+    (default ``assets/symbol_universe.csv``). Symbols listed there validate
+    instantly without a network request. A missing file yields an empty
+    index, in which case every symbol is checked against the price source.
+    Only the bundled index is kept in memory; an explicit path is read
+    fresh and does not replace it.
+    
+    Parameters
+    ----------
+    path : Optional[str]
+        CSV file to load (default is the bundled universe path)
+    
+    Returns
+    -------
+    Dict[str, str]
+        Dictionary mapping upper-case symbols to their exchange
+    """
+    global _symbol_universe
+    
+    if path is None and _symbol_universe is not None:
+        return _symbol_universe
+    
+    try:
+        table = pd.read_csv(path or SYMBOL_UNIVERSE_PATH, dtype=str).fillna('')
+        if 'exchange' not in table:
+            table['exchange'] = ''
+        universe = dict(zip(table['symbol'].str.upper().str.strip(), table['exchange']))
+    except (OSError, KeyError, ValueError):
+        universe = {}
+    
+    if path is None:
+        _symbol_universe = universe
+    return universe
+
+
+def validate_symbols(symbols: List[str]) -> Dict[str, bool]:
+    """
+    Validate many stock symbols in one pass.
+    
+    Each symbol is answered, in order of preference, from the result cache
+    (valid answers kept for a day, invalid ones for five minutes), from the
+    local symbol universe, or from a single batched price request covering
+    every remaining symbol.
+    
+    Parameters
+    ----------
+    symbols : List[str]
+        Stock ticker symbols
+    
+    Returns
+    -------
+    Dict[str, bool]
+        Dictionary mapping each (upper-cased) symbol to its validity
+    """
+    now = time.time()
+    universe = load_symbol_universe()
+    
+    results = {}
+    unknown = []
+    
+    with _validation_lock:
+        for symbol in dict.fromkeys(s.upper().strip() for s in symbols):
+            cached = _validation_cache.get(symbol)
+            if cached is not None and cached[1] > now:
+                results[symbol] = cached[0]
+            elif symbol in universe:
+                results[symbol] = True
             else:
-                # Fallback: get from longer period
-                hist = ticker.history(period="5d")
-                if not hist.empty:
-                    current_prices[symbol] = hist['Close'].iloc[-1]
-        except Exception as e:
-            st.warning(f"Could not fetch current price for {symbol}: {str(e)}")
+                unknown.append(symbol)
     
-    return current_prices
+    if unknown:
+        try:
+            frames = _price_source.history(unknown, period="5d")
+        except Exception:
+            # Do not cache answers for a failed request
+            results.update({symbol: False for symbol in unknown})
+            return results
+        
+        with _validation_lock:
+            for symbol in unknown:
+                valid = symbol in frames and not frames[symbol].empty
+                ttl = VALID_SYMBOL_TTL if valid else INVALID_SYMBOL_TTL
+                _validation_cache[symbol] = (valid, now + ttl)
+                results[symbol] = valid
+    
+    return results
 
 
 def validate_symbol(symbol: str) -> bool:
@@ -138,12 +612,7 @@ def validate_symbol(symbol: str) -> bool:
     bool
         True if symbol is valid, False otherwise
     """
-    try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="5d")
-        return not hist.empty
-    except:
-        return False
+    return validate_symbols([symbol]).get(symbol.upper().strip(), False)
 
 
 def get_stock_info(symbol: str) -> dict:
@@ -181,25 +650,47 @@ def get_stock_info(symbol: str) -> dict:
         }
 
 
-def calculate_data_quality_score(prices: pd.DataFrame) -> float:
+def calculate_data_quality_score(prices: pd.DataFrame,
+                                 alignment: Optional[Dict] = None) -> float:
     """
     Calculate data quality score based on completeness and length.
     
+    When an alignment report is available (passed in, or attached to the
+    frame by ``fetch_multiple_stocks``), completeness is the share of the
+    union calendar the chosen policy kept, counting for 'ffill' only the
+    rows of the symbol with the shortest priced history; for the pairwise
+    policy it is the smallest pairwise overlap.
+    
     Parameters
     ----------
     prices : pd.DataFrame
         Price data
+    alignment : Optional[Dict]
+        Report returned by ``align_prices``
     
     Returns
     -------
     float
         Quality score between 0 and 1
     """
-    # Check for sufficient history (prefer 252 trading days = 1 year)
-    length_score = min(len(prices) / 252, 1.0)
+    alignment = alignment or prices.attrs.get('alignment')
     
-    # Check for completeness (no NaN values)
-    completeness_score = 1.0 - (prices.isna().sum().sum() / prices.size)
+    if alignment and alignment['total_rows'] > 0:
+        policy = alignment['policy']
+        if policy == 'pairwise':
+            usable_rows = alignment['min_pair_overlap']
+        elif policy == 'ffill':
+            usable_rows = alignment.get('min_symbol_rows', alignment['rows_kept'][policy])
+        else:
+            usable_rows = alignment['rows_kept'][policy]
+        completeness_score = usable_rows / alignment['total_rows']
+    else:
+        usable_rows = len(prices)
+        # Check for completeness (no NaN values)
+        completeness_score = 1.0 - (prices.isna().sum().sum() / prices.size)
+    
+    # Check for sufficient history (prefer 252 trading days = 1 year)
+    length_score = min(usable_rows / 252, 1.0)
     
     # Combined score
     quality_score = (length_score * 0.7) + (completeness_score * 0.3)
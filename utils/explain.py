@@ -245,7 +245,7 @@ def explain_scenario_paths(current_price: float,
     current_price : float
         Current asset price
     simulated_paths : np.ndarray
-        Array of simulated price paths
+        Array of simulated price paths, or of final prices only
     horizon_days : int
         Simulation horizon
     
@@ -255,7 +255,7 @@ def explain_scenario_paths(current_price: float,
         Natural language explanation
     """
     # Get final prices from all paths
-    final_prices = simulated_paths[:, -1]
+    final_prices = simulated_paths[:, -1] if simulated_paths.ndim == 2 else simulated_paths
     
     # Calculate percentage changes
     pct_changes = (final_prices - current_price) / current_price * 100
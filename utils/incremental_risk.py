@@ -0,0 +1,431 @@
+# portfolio_risk_app/utils/incremental_risk.py
+"""
+Incremental Risk Module
+Keeps return statistics up to date as holdings and price bars change.
+"""
+
+from functools import lru_cache
+from typing import Dict, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy.linalg import solve_triangular
+from scipy.stats import norm
+
+from utils.price_matrix import PriceMatrix, asset_returns
+
+
+# Relative diagonal floor for constant or collinear assets, so the factor
+# stays triangular and updatable instead of failing
+JITTER = 1e-10
+
+# Fewest shared return days needed to add an asset whose history does not
+# cover the whole window
+MIN_OVERLAP = 20
+
+Weights = Union[Mapping[str, float], pd.Series, np.ndarray]
+
+
+def cholesky_update(factor: np.ndarray, vector: np.ndarray, downdate: bool = False):
+    """
+    Rank-one update of a lower Cholesky factor in place.
+    
+    Turns L with L @ L.T = A into the factor of A + x x^T (or A - x x^T
+    when downdating) in O(n^2).
+    
+    Parameters
+    ----------
+    factor : np.ndarray
+        Lower triangular factor L, modified in place
+    vector : np.ndarray
+        Update vector x
+    downdate : bool
+        Subtract x x^T instead of adding it
+    
+    Raises
+    ------
+    np.linalg.LinAlgError
+        If a downdate would make the matrix lose positive definiteness
+    """
+    x = np.array(vector, dtype=float)
+    sign = -1.0 if downdate else 1.0
+    
+    for k in range(len(x)):
+        diagonal = factor[k, k]
+        r_squared = diagonal ** 2 + sign * x[k] ** 2
+        if r_squared <= 0 or diagonal == 0:
+            raise np.linalg.LinAlgError("Cholesky downdate lost positive definiteness")
+        
+        r = np.sqrt(r_squared)
+        c, s = r / diagonal, x[k] / diagonal
+        factor[k, k] = r
+        factor[k + 1:, k] = (factor[k + 1:, k] + sign * s * x[k + 1:]) / c
+        x[k + 1:] = c * x[k + 1:] - s * factor[k + 1:, k]
+
+
+@lru_cache(maxsize=32)
+def _normal_tail(confidence_level: float) -> Tuple[float, float]:
+    """Standard normal VaR quantile and CVaR multiplier for a confidence level."""
+    tail = 1 - confidence_level
+    z = float(norm.ppf(tail))
+    return z, float(-norm.pdf(z) / tail)
+
+
+def _jittered_cholesky(matrix: np.ndarray) -> np.ndarray:
+    """Lower Cholesky factor, adding a growing diagonal floor until it succeeds."""
+    n = len(matrix)
+    if n == 0:
+        return np.zeros((0, 0))
+    
+    scale = max(np.trace(matrix) / n, 1e-300)
+    jitter = 0.0
+    while True:
+        try:
+            return np.linalg.cholesky(matrix + jitter * np.eye(n))
+        except np.linalg.LinAlgError:
+            jitter = max(jitter * 10, JITTER * scale)
+
+
+class IncrementalRiskModel:
+    """
+    Daily return statistics over a rolling window, updated incrementally.
+    
+    The sufficient statistics are the return sums, the cross-product
+    matrix R^T R and a lower Cholesky factor K of the scatter matrix
+    (K @ K.T = (T - 1) * covariance). Adding an asset borders them with
+    one triangular solve, removing an asset deletes a row/column and
+    applies one rank-one update, and a new price bar applies a rank-one
+    update (and a downdate for the bar leaving the window). Every edit is
+    O(n^2) or O(T n), instead of the O(T n^2) covariance rebuild plus
+    O(n^3) factorization.
+    
+    Statistics cover only days on which every asset has a return, so a
+    recently listed asset is never padded with zero returns: building the
+    model drops incomplete days, and adding an asset that lacks some of the
+    window's days rebuilds the statistics over the days it shares with the
+    others (or leaves it out if fewer than MIN_OVERLAP are shared). The
+    model keeps the return history it was given, so once the asset that
+    shortened the window is removed (or a sync brings more complete days)
+    the window is extended again. Missing values in bars added later count
+    as zero.
+    """
+    
+    def __init__(self, returns: pd.DataFrame, window: Optional[int] = None):
+        """
+        Initialize from daily returns.
+        
+        Parameters
+        ----------
+        returns : pd.DataFrame
+            Daily asset returns (dates x symbols); the latest window of its
+            complete days defines the window
+        window : Optional[int]
+            Bars kept before the oldest is dropped (default: every complete day)
+        """
+        self.symbols = list(returns.columns)
+        self._max_window = window
+        self._history = returns
+        self._load_history()
+    
+    def _load_history(self):
+        """Rebuild the statistics over the latest complete days of the history."""
+        returns = self._history[self.symbols].dropna()
+        if self._max_window:
+            returns = returns.iloc[-self._max_window:]
+        
+        self.dates = pd.DatetimeIndex(returns.index)
+        self.window = self._max_window or len(returns)
+        self._returns = returns.to_numpy(dtype=float)
+        self._refactor()
+    
+    def _extend_window(self):
+        """Rebuild if the history now has more complete days than the window holds."""
+        complete = len(self._history[self.symbols].dropna())
+        if min(complete, self._max_window or complete) > self.n_obs:
+            self._load_history()
+    
+    @classmethod
+    def from_prices(cls, prices: Union[pd.DataFrame, PriceMatrix],
+                    window: Optional[int] = None) -> 'IncrementalRiskModel':
+        """
+        Build a model from historical prices.
+        
+        Parameters
+        ----------
+        prices : Union[pd.DataFrame, PriceMatrix]
+            Historical prices with assets as columns
+        window : Optional[int]
+            Bars kept before the oldest is dropped
+        
+        Returns
+        -------
+        IncrementalRiskModel
+            Model over the returns of prices
+        """
+        return cls(asset_returns(prices), window=window)
+    
+    def _refactor(self):
+        """Recompute every statistic from the stored returns."""
+        self._sums = self._returns.sum(axis=0)
+        self._cross = self._returns.T @ self._returns
+        self._factor = _jittered_cholesky(self._scatter())
+    
+    def _scatter(self) -> np.ndarray:
+        """Scatter matrix (sum of outer products of deviations from the mean)."""
+        return self._cross - np.outer(self._sums, self._sums) / max(self.n_obs, 1)
+    
+    @property
+    def n_obs(self) -> int:
+        """Number of return observations in the window."""
+        return len(self._returns)
+    
+    @property
+    def mean(self) -> pd.Series:
+        """Mean daily return per asset."""
+        return pd.Series(self._sums / max(self.n_obs, 1), index=self.symbols)
+    
+    @property
+    def cov(self) -> pd.DataFrame:
+        """Covariance matrix of daily returns."""
+        return pd.DataFrame(self._scatter() / max(self.n_obs - 1, 1),
+                            index=self.symbols, columns=self.symbols)
+    
+    @property
+    def factor(self) -> np.ndarray:
+        """Lower Cholesky factor of the covariance matrix."""
+        return self._factor / np.sqrt(max(self.n_obs - 1, 1))
+    
+    def add_asset(self, symbol: str, returns: pd.Series) -> bool:
+        """
+        Add an asset by bordering the statistics.
+        
+        If the asset has no return on some of the model's dates (e.g. it
+        listed within the window), the statistics are instead rebuilt over
+        the dates it shares with the model; with fewer than MIN_OVERLAP
+        shared dates the asset is not added.
+        
+        Parameters
+        ----------
+        symbol : str
+            Stock ticker symbol
+        returns : pd.Series
+            Daily returns of the asset; reindexed onto the model's dates
+        
+        Returns
+        -------
+        bool
+            Whether the asset is in the model afterwards
+        """
+        if symbol in self.symbols:
+            return True
+        
+        column = returns.reindex(self.dates).to_numpy(dtype=float)
+        available = np.isfinite(column)
+        if not available.all():
+            if available.sum() < min(MIN_OVERLAP, self.n_obs):
+                return False
+            self._returns = np.column_stack([self._returns, column])[available]
+            self.dates = self.dates[available]
+            self.symbols.append(symbol)
+            self._add_history(symbol, returns)
+            self._refactor()
+            return True
+        
+        total = column.sum()
+        cross = self._returns.T @ column
+        own_cross = column @ column
+        
+        n_obs = max(self.n_obs, 1)
+        scatter = cross - self._sums * total / n_obs
+        own_scatter = own_cross - total ** 2 / n_obs
+        
+        border = solve_triangular(self._factor, scatter, lower=True) if self.symbols else scatter
+        diagonal_squared = own_scatter - border @ border
+        n = len(self.symbols)
+        scale = max(own_scatter, np.trace(self._scatter()) / max(n, 1), 1e-300)
+        diagonal = np.sqrt(max(diagonal_squared, JITTER * scale))
+        
+        factor = np.zeros((n + 1, n + 1))
+        factor[:n, :n] = self._factor
+        factor[n, :n] = border
+        factor[n, n] = diagonal
+        
+        cross_products = np.empty((n + 1, n + 1))
+        cross_products[:n, :n] = self._cross
+        cross_products[n, :n] = cross_products[:n, n] = cross
+        cross_products[n, n] = own_cross
+        
+        self._factor = factor
+        self._cross = cross_products
+        self._sums = np.append(self._sums, total)
+        self._returns = np.column_stack([self._returns, column])
+        self.symbols.append(symbol)
+        self._add_history(symbol, returns)
+        return True
+    
+    def _add_history(self, symbol: str, returns: pd.Series):
+        """Add an asset's returns to the kept history, on the union of dates."""
+        self._history = pd.concat([self._history, returns.rename(symbol)], axis=1, sort=True)
+    
+    def remove_asset(self, symbol: str):
+        """
+        Remove an asset, repairing the factor with one rank-one update.
+        
+        If the asset had shortened the window (it lacked some of the other
+        assets' days), the statistics are rebuilt over the longer window the
+        remaining assets share.
+        
+        Parameters
+        ----------
+        symbol : str
+            Stock ticker symbol
+        """
+        if symbol not in self.symbols:
+            return
+        
+        k = self.symbols.index(symbol)
+        factor = np.delete(np.delete(self._factor, k, axis=0), k, axis=1)
+        if k < len(factor):
+            # Rows below k lose their column-k entries; fold them into the
+            # trailing block so it still reproduces the scatter matrix
+            cholesky_update(factor[k:, k:], self._factor[k + 1:, k])
+        
+        self._factor = factor
+        self._cross = np.delete(np.delete(self._cross, k, axis=0), k, axis=1)
+        self._sums = np.delete(self._sums, k)
+        self._returns = np.delete(self._returns, k, axis=1)
+        self.symbols.pop(k)
+        self._history = self._history.drop(columns=symbol)
+        self._extend_window()
+    
+    def add_bar(self, date, returns: Union[Mapping[str, float], np.ndarray]):
+        """
+        Append one day of returns, dropping the oldest once the window is full.
+        
+        Parameters
+        ----------
+        date : datetime-like
+            Date of the bar
+        returns : Union[Mapping[str, float], np.ndarray]
+            Returns by symbol (missing symbols count as zero) or an array in
+            the order of ``symbols``
+        """
+        if isinstance(returns, Mapping):
+            row = np.array([returns.get(symbol, 0.0) for symbol in self.symbols], dtype=float)
+        else:
+            row = np.asarray(returns, dtype=float)
+        row = np.nan_to_num(row)
+        
+        # Adding x to n observations with mean m adds n/(n+1) (x-m)(x-m)^T
+        # to the scatter matrix
+        n_obs = self.n_obs
+        if n_obs:
+            deviation = row - self._sums / n_obs
+            cholesky_update(self._factor, deviation * np.sqrt(n_obs / (n_obs + 1)))
+        self._sums += row
+        self._cross += np.outer(row, row)
+        self._returns = np.vstack([self._returns, row])
+        self.dates = self.dates.append(pd.DatetimeIndex([date]))
+        self._history = pd.concat([self._history,
+                                   pd.DataFrame([row], index=pd.DatetimeIndex([date]),
+                                                columns=self.symbols)])
+        
+        if self.n_obs > self.window:
+            self._drop_oldest()
+    
+    def _drop_oldest(self):
+        """Remove the oldest bar with a rank-one downdate."""
+        oldest = self._returns[0]
+        n_obs = self.n_obs
+        
+        # Removing x from n observations with mean m subtracts
+        # n/(n-1) (x-m)(x-m)^T from the scatter matrix
+        deviation = oldest - self._sums / n_obs
+        self._sums -= oldest
+        self._cross -= np.outer(oldest, oldest)
+        self._returns = self._returns[1:]
+        self.dates = self.dates[1:]
+        # The window is full of complete days, so older days can never return
+        self._history = self._history.loc[self._history.index >= self.dates[0]]
+        
+        try:
+            cholesky_update(self._factor, deviation * np.sqrt(n_obs / (n_obs - 1)),
+                            downdate=True)
+        except np.linalg.LinAlgError:
+            self._factor = _jittered_cholesky(self._scatter())
+    
+    def sync(self, prices: Union[pd.DataFrame, PriceMatrix]):
+        """
+        Bring the model in line with the latest price history of the holdings.
+        
+        Assets no longer in prices are removed, bars newer than the last
+        model date are appended, and new assets are added, all through the
+        incremental updates (see add_asset for assets with short history).
+        If prices then hold more complete days than the window (e.g. the
+        model was built from a recent listing), the statistics are rebuilt
+        over them.
+        
+        Parameters
+        ----------
+        prices : Union[pd.DataFrame, PriceMatrix]
+            Historical prices of the current holdings
+        """
+        returns = asset_returns(prices)
+        
+        for symbol in [s for s in self.symbols if s not in returns.columns]:
+            self.remove_asset(symbol)
+        
+        if len(self.dates):
+            new_bars = returns.loc[returns.index > self.dates[-1], self.symbols]
+            for date, row in zip(new_bars.index, new_bars.to_numpy(dtype=float)):
+                self.add_bar(date, row)
+        
+        for symbol in returns.columns:
+            if symbol not in self.symbols:
+                self.add_asset(symbol, returns[symbol])
+        
+        self._history = returns[self.symbols]
+        self._extend_window()
+    
+    def _weight_vector(self, weights: Weights) -> np.ndarray:
+        """Weights in model order, summing by symbol and renormalized to 1."""
+        if isinstance(weights, np.ndarray):
+            vector = np.asarray(weights, dtype=float)
+        else:
+            if isinstance(weights, pd.Series):
+                weights = weights.groupby(level=0).sum()
+            vector = np.array([weights.get(symbol, 0.0) for symbol in self.symbols], dtype=float)
+        
+        total = vector.sum()
+        return vector / total if total else vector
+    
+    def score(self, weights: Weights, confidence_level: float = 0.95) -> Dict[str, float]:
+        """
+        Calculate Gaussian daily VaR and CVaR from the current statistics.
+        
+        Parameters
+        ----------
+        weights : Weights
+            Weights by symbol (repeated symbols are summed; symbols outside
+            the model are ignored) or an array in the order of ``symbols``
+        confidence_level : float
+            Confidence level (default 0.95)
+        
+        Returns
+        -------
+        Dict[str, float]
+            'var' and 'cvar' as negative returns (as calculate_var), plus
+            'mean' and 'volatility'
+        """
+        weights = self._weight_vector(weights)
+        mean = float(weights @ self._sums) / max(self.n_obs, 1)
+        volatility = float(np.linalg.norm(self._factor.T @ weights)) / np.sqrt(max(self.n_obs - 1, 1))
+        
+        z, cvar_z = _normal_tail(confidence_level)
+        
+        return {
+            'var': mean + z * volatility,
+            'cvar': mean + cvar_z * volatility,
+            'mean': mean,
+            'volatility': volatility
+        }
@@ -0,0 +1,264 @@
+# portfolio_risk_app/utils/parallel_simulation.py
+"""
+Parallel Simulation Module
+Runs Monte Carlo simulations across a process pool with reproducible seeding.
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack, contextmanager
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.price_matrix import PriceMatrix
+from utils.returns_cache import get_return_moments
+from utils.simulation_engine import NormalModel, build_price_paths, iter_chunks
+
+
+# Blocks, not workers, own the random streams, so results depend only on the
+# seed and n_simulations, never on worker count. A run is split into about
+# TARGET_BLOCKS blocks (enough to keep every core busy) of at least
+# MIN_BLOCK_PATHS paths (so per-task overhead stays small).
+TARGET_BLOCKS = 64
+MIN_BLOCK_PATHS = 256
+
+# One worker pool is reused across calls and replaced when a different
+# worker count is asked for. Workers are started with forkserver (or spawn)
+# rather than forked from a threaded Streamlit process.
+_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+SharedSpecs = Dict[str, Tuple[str, Tuple[int, ...]]]
+
+
+class _SharedArray:
+    """A numpy array placed in a named shared memory segment."""
+    
+    def __init__(self, shape: Tuple[int, ...], data: Optional[np.ndarray] = None):
+        size = max(int(np.prod(shape)) * 8, 1)
+        self.shape = shape
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.array = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf)
+        if data is not None:
+            self.array[...] = data
+    
+    @property
+    def spec(self) -> Tuple[str, Tuple[int, ...]]:
+        """Name and shape for attaching from a worker."""
+        return self.shm.name, self.shape
+    
+    def release(self):
+        """Close and unlink the segment."""
+        self.array = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _share(stack: ExitStack, shape: Tuple[int, ...],
+           data: Optional[np.ndarray] = None) -> _SharedArray:
+    """Create a shared array that is released when stack closes."""
+    array = _SharedArray(shape, data)
+    stack.callback(array.release)
+    return array
+
+
+@contextmanager
+def _attached(specs: SharedSpecs):
+    """Map the parent's shared arrays into a worker, closing them on exit."""
+    handles = []
+    try:
+        arrays = {}
+        for key, (name, shape) in specs.items():
+            shm = shared_memory.SharedMemory(name=name)
+            handles.append(shm)
+            arrays[key] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        yield arrays
+    finally:
+        arrays = None
+        for shm in handles:
+            shm.close()
+
+
+def _block_size(n_simulations: int) -> int:
+    """Paths per seeded block for a run of n_simulations paths."""
+    return max(MIN_BLOCK_PATHS, math.ceil(n_simulations / TARGET_BLOCKS))
+
+
+def _get_executor(n_workers: int) -> ProcessPoolExecutor:
+    """Get the shared process pool, (re)starting it with n_workers if needed."""
+    global _executor, _executor_workers
+    
+    with _executor_lock:
+        if _executor is not None and _executor_workers != n_workers:
+            # Work already queued on the old pool still runs to completion
+            _executor.shutdown(wait=False)
+            _executor = None
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=multiprocessing.get_context(_START_METHOD)
+            )
+            _executor_workers = n_workers
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor):
+    """Drop a broken pool so the next call starts a fresh one."""
+    global _executor
+    
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _portfolio_block(specs: SharedSpecs, start: int, stop: int,
+                     seed: np.random.SeedSequence, mean: float, volatility: float,
+                     current_value: float, horizon_days: int):
+    """Worker task: simulate final values for paths [start, stop)."""
+    # Same draws as NormalModel.sample_portfolio_returns, from the portfolio
+    # moments the parent computed once
+    rng = np.random.default_rng(seed)
+    portfolio_returns = mean + volatility * rng.standard_normal((stop - start, horizon_days))
+    
+    with _attached(specs) as shared:
+        shared['out'][start:stop] = current_value * np.prod(1 + portfolio_returns, axis=1)
+
+
+def _single_asset_block(specs: SharedSpecs, start: int, stop: int,
+                        seed: np.random.SeedSequence, mean_return: float, volatility: float,
+                        current_price: float, horizon_days: int):
+    """Worker task: simulate price paths [start, stop) for one asset."""
+    rng = np.random.default_rng(seed)
+    simulated_returns = rng.normal(mean_return, volatility, size=(stop - start, horizon_days))
+    
+    with _attached(specs) as shared:
+        build_price_paths(simulated_returns, current_price, out=shared['out'][start:stop])
+
+
+def _run_blocks(task, n_simulations: int, random_seed: int, n_workers: Optional[int],
+                arrays: Dict[str, _SharedArray], args: tuple) -> np.ndarray:
+    """Run task over seeded blocks in the shared pool and return a copy of 'out'."""
+    blocks = list(iter_chunks(n_simulations, _block_size(n_simulations)))
+    seeds = np.random.SeedSequence(random_seed).spawn(len(blocks))
+    n_workers = max(1, n_workers or os.cpu_count() or 1)
+    specs = {key: array.spec for key, array in arrays.items()}
+    
+    executor = _get_executor(n_workers)
+    futures = [executor.submit(task, specs, start, stop, seed, *args)
+               for (start, stop), seed in zip(blocks, seeds)]
+    try:
+        for future in futures:
+            future.result()
+    except BrokenProcessPool:
+        _discard_executor(executor)
+        raise
+    finally:
+        # Shared memory is released by the caller, so no task may still be
+        # writing into it when this returns
+        for future in futures:
+            if not future.cancel():
+                future.exception()
+    
+    return arrays['out'].array.copy()
+
+
+def simulate_portfolio_outcomes_parallel(prices: Union[pd.DataFrame, PriceMatrix],
+                                         weights: np.ndarray,
+                                         current_value: float,
+                                         horizon_days: int = 30,
+                                         n_simulations: int = 10000,
+                                         random_seed: int = 42,
+                                         n_workers: Optional[int] = None) -> np.ndarray:
+    """
+    Simulate future portfolio values across a process pool.
+    
+    Simulations are split into blocks sized from n_simulations alone (see
+    _block_size), each seeded from ``SeedSequence(random_seed).spawn``, so
+    results are the same for any worker count. The covariance is reduced to
+    the portfolio mean and volatility once in the parent (normal portfolio
+    returns only depend on those two numbers), so tasks receive two scalars
+    instead of the factor, and workers write final values straight into a
+    shared output array. The worker pool is reused across calls.
+    
+    Parameters
+    ----------
+    prices : Union[pd.DataFrame, PriceMatrix]
+        Historical prices with assets as columns
+    weights : np.ndarray
+        Portfolio weights (must sum to 1)
+    current_value : float
+        Current portfolio value
+    horizon_days : int
+        Simulation horizon in days (default 30)
+    n_simulations : int
+        Number of Monte Carlo simulations (default 10000)
+    random_seed : int
+        Random seed for reproducibility
+    n_workers : Optional[int]
+        Worker processes (default: CPU count)
+    
+    Returns
+    -------
+    np.ndarray
+        Array of simulated portfolio values at horizon
+    """
+    moments = get_return_moments(prices)
+    model = NormalModel(moments.mean.values, moments.cov.values)
+    mean, volatility = model.portfolio_moments(np.asarray(weights, dtype=float))
+    
+    with ExitStack() as stack:
+        arrays = {'out': _share(stack, (n_simulations,))}
+        
+        return _run_blocks(_portfolio_block, n_simulations, random_seed, n_workers,
+                           arrays, (mean, volatility, current_value, horizon_days))
+
+
+def simulate_single_asset_paths_parallel(prices: pd.Series,
+                                         current_price: float,
+                                         horizon_days: int = 14,
+                                         n_simulations: int = 500,
+                                         random_seed: int = 42,
+                                         n_workers: Optional[int] = None) -> np.ndarray:
+    """
+    Simulate future price paths for a single asset across a process pool.
+    
+    Uses the same block seeding as simulate_portfolio_outcomes_parallel, so
+    paths are the same for any worker count.
+    
+    Parameters
+    ----------
+    prices : pd.Series
+        Historical prices
+    current_price : float
+        Current price
+    horizon_days : int
+        Simulation horizon in days
+    n_simulations : int
+        Number of paths to simulate
+    random_seed : int
+        Random seed for reproducibility
+    n_workers : Optional[int]
+        Worker processes (default: CPU count)
+    
+    Returns
+    -------
+    np.ndarray
+        Array of shape (n_simulations, horizon_days + 1) containing price paths
+    """
+    moments = get_return_moments(prices)
+    
+    with ExitStack() as stack:
+        arrays = {'out': _share(stack, (n_simulations, horizon_days + 1))}
+        
+        return _run_blocks(_single_asset_block, n_simulations, random_seed, n_workers, arrays,
+                           (float(moments.mean), float(moments.std), current_price, horizon_days))
@@ -6,7 +6,10 @@ Manages portfolio composition, valuation, and allocation.
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union
+from utils.price_matrix import PriceMatrix
+from utils.returns_cache import get_return_moments
+from utils.risk_metrics import ParametricRisk
 
 
 class Portfolio:
@@ -223,29 +226,39 @@ class Portfolio:
         return len(self.holdings)
 
 
-def calculate_risk_contribution(prices: pd.DataFrame, 
-                                weights: np.ndarray) -> pd.Series:
+def calculate_risk_contribution(prices: Union[pd.DataFrame, PriceMatrix], 
+                                weights: np.ndarray,
+                                measure: str = 'variance',
+                                confidence_level: float = 0.95) -> pd.Series:
     """
     Calculate risk contribution of each asset to portfolio variance.
     
     Risk contribution shows how much each asset contributes to total portfolio risk,
     accounting for its weight, volatility, and correlation with other assets.
+    With measure='var' the contributions are Gaussian component VaR shares
+    instead (see calculate_component_var), which also account for means.
     
     Parameters
     ----------
-    prices : pd.DataFrame
+    prices : Union[pd.DataFrame, PriceMatrix]
         Historical prices with assets as columns
     weights : np.ndarray
         Portfolio weights
+    measure : str
+        'variance' (default) or 'var'
+    confidence_level : float
+        Confidence level for measure='var' (default 0.95)
     
     Returns
     -------
     pd.Series
         Risk contribution for each asset (percentages summing to 100)
     """
-    # Calculate returns and covariance matrix
-    returns = prices.pct_change().dropna()
-    cov_matrix = returns.cov().values
+    if measure == 'var':
+        return calculate_component_var(prices, weights, confidence_level)['contribution_pct']
+    
+    # Covariance matrix of returns (computed once per price data)
+    cov_matrix = get_return_moments(prices).cov.values
     
     # Portfolio variance
     portfolio_variance = np.dot(weights, np.dot(cov_matrix, weights))
@@ -262,13 +275,47 @@ def calculate_risk_contribution(prices: pd.DataFrame,
     return pd.Series(risk_contrib_pct, index=prices.columns)
 
 
-def calculate_correlation_matrix(prices: pd.DataFrame) -> pd.DataFrame:
+def calculate_component_var(prices: Union[pd.DataFrame, PriceMatrix],
+                            weights: np.ndarray,
+                            confidence_level: float = 0.95) -> pd.DataFrame:
+    """
+    Calculate Gaussian marginal and component VaR per asset.
+    
+    Component VaRs sum exactly to the portfolio's Gaussian VaR. Only the
+    cached mean vector and covariance are used; for repeated what-if
+    weightings keep a ParametricRisk and call its marginal_var directly.
+    
+    Parameters
+    ----------
+    prices : Union[pd.DataFrame, PriceMatrix]
+        Historical prices with assets as columns
+    weights : np.ndarray
+        Portfolio weights
+    confidence_level : float
+        Confidence level (default 0.95)
+    
+    Returns
+    -------
+    pd.DataFrame
+        'marginal_var' and 'component_var' (daily loss fractions) and
+        'contribution_pct' (percentages summing to 100) per asset
+    """
+    marginal_var, component_var = ParametricRisk(prices, confidence_level).marginal_var(weights)
+    
+    return pd.DataFrame({
+        'marginal_var': marginal_var,
+        'component_var': component_var,
+        'contribution_pct': component_var / component_var.sum() * 100
+    }, index=prices.columns)
+
+
+def calculate_correlation_matrix(prices: Union[pd.DataFrame, PriceMatrix]) -> pd.DataFrame:
     """
     Calculate correlation matrix of asset returns.
     
     Parameters
     ----------
-    prices : pd.DataFrame
+    prices : Union[pd.DataFrame, PriceMatrix]
         Historical prices with assets as columns
     
     Returns
@@ -276,18 +323,17 @@ def calculate_correlation_matrix(prices: pd.DataFrame) -> pd.DataFrame:
     pd.DataFrame
         Correlation matrix
     """
-    returns = prices.pct_change().dropna()
-    return returns.corr()
+    return get_return_moments(prices).corr
 
 
-def calculate_individual_volatilities(prices: pd.DataFrame, 
+def calculate_individual_volatilities(prices: Union[pd.DataFrame, PriceMatrix], 
                                      annualize: bool = False) -> pd.Series:
     """
     Calculate volatility for each asset.
     
     Parameters
     ----------
-    prices : pd.DataFrame
+    prices : Union[pd.DataFrame, PriceMatrix]
         Historical prices with assets as columns
     annualize : bool
         If True, annualize volatilities
@@ -297,8 +343,7 @@ def calculate_individual_volatilities(prices: pd.DataFrame,
     pd.Series
         Volatility for each asset
     """
-    returns = prices.pct_change().dropna()
-    volatilities = returns.std()
+    volatilities = get_return_moments(prices).std
     
     if annualize:
         volatilities = volatilities * np.sqrt(252)
@@ -0,0 +1,173 @@
+# portfolio_risk_app/utils/prefetch.py
+"""
+Prefetch Module
+Warms the price store and quote cache in the background as holdings are added.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+from utils.data_loader import QUOTE_TTL, fetch_price_history, fetch_quotes
+
+
+# Prefetch states reported to the UI
+FETCHING = 'fetching'
+READY = 'ready'
+FAILED = 'failed'
+
+# Seconds a READY symbol counts as warm; after that it is fetched again so a
+# long-running process picks up new bars
+READY_TTL = 3600
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='prefetch')
+_lock = threading.Lock()
+_status: Dict[str, Dict] = {}
+_futures: Dict[str, Future] = {}
+# When each symbol's quote was last warmed
+_quoted: Dict[str, float] = {}
+
+
+def _warm_quotes(symbols: List[str]):
+    """Load quotes for symbols into the process-wide quote cache."""
+    if not symbols:
+        return
+    try:
+        fetch_quotes(symbols)
+    except Exception:
+        # A later snapshot fetches any quote that is still missing
+        pass
+
+
+def _run_prefetch(symbols: List[str], period: str):
+    """Download history and quotes for symbols and record the outcome per symbol."""
+    try:
+        result = fetch_price_history(symbols, period=period)
+        failures = result.failures
+    except Exception as e:
+        failures = {symbol: str(e) for symbol in symbols}
+    
+    _warm_quotes([symbol for symbol in symbols if symbol not in failures])
+    
+    now = time.time()
+    with _lock:
+        for symbol in symbols:
+            if symbol in failures:
+                _status[symbol] = {'state': FAILED, 'error': failures[symbol], 'time': now}
+            else:
+                _status[symbol] = {'state': READY, 'error': None, 'time': now}
+            _futures.pop(symbol, None)
+
+
+def _is_expired(info: Dict, now: float) -> bool:
+    """Whether a READY status is older than READY_TTL."""
+    return info['state'] == READY and now - info['time'] > READY_TTL
+
+
+def mark_ready(symbols: List[str]):
+    """
+    Record that history for symbols was just fetched outside the prefetcher.
+    
+    Clears earlier FAILED states once a foreground fetch succeeds, so pages
+    stop reporting a failure that has since been recovered.
+    
+    Parameters
+    ----------
+    symbols : List[str]
+        Stock ticker symbols fetched successfully
+    """
+    now = time.time()
+    with _lock:
+        for symbol in symbols:
+            if _status.get(symbol, {}).get('state') != FETCHING:
+                _status[symbol] = {'state': READY, 'error': None, 'time': now}
+
+
+def prefetch_symbols(symbols: List[str], period: str = "1y"):
+    """
+    Start a background download of price history and quotes for symbols.
+    
+    History lands in the on-disk price store and quotes in the process-wide
+    quote cache, so the later analysis reads warm data. Symbols being
+    fetched, or fetched within READY_TTL seconds, are skipped; failed and
+    expired ones are fetched again. Quotes live only QUOTE_TTL seconds, so
+    those of READY symbols are refreshed in the background on each call
+    once they have expired.
+    
+    Parameters
+    ----------
+    symbols : List[str]
+        Stock ticker symbols
+    period : str
+        Period to fetch (default "1y")
+    """
+    now = time.time()
+    with _lock:
+        pending = [s for s in dict.fromkeys(symbols)
+                   if s not in _status or _status[s]['state'] == FAILED
+                   or _is_expired(_status[s], now)]
+        stale_quotes = [s for s in dict.fromkeys(symbols)
+                        if s not in pending and _status[s]['state'] == READY
+                        and now - _quoted.get(s, 0.0) > QUOTE_TTL]
+        for symbol in pending + stale_quotes:
+            _quoted[symbol] = now
+        
+        if stale_quotes:
+            _executor.submit(_warm_quotes, stale_quotes)
+        if not pending:
+            return
+        
+        future = _executor.submit(_run_prefetch, pending, period)
+        for symbol in pending:
+            _status[symbol] = {'state': FETCHING, 'error': None, 'time': now}
+            _futures[symbol] = future
+
+
+def get_prefetch_status(symbols: List[str]) -> Dict[str, Dict]:
+    """
+    Get the prefetch state of each symbol.
+    
+    Parameters
+    ----------
+    symbols : List[str]
+        Stock ticker symbols
+    
+    Returns
+    -------
+    Dict[str, Dict]
+        Dictionary mapping symbols to ``{'state', 'error'}``, where state is
+        'fetching', 'ready' or 'failed' (plus the 'time' it was set);
+        symbols never prefetched, or READY for longer than READY_TTL, are
+        omitted
+    """
+    now = time.time()
+    with _lock:
+        return {s: dict(_status[s]) for s in symbols
+                if s in _status and not _is_expired(_status[s], now)}
+
+
+def wait_for_prefetch(symbols: List[str], timeout: Optional[float] = None) -> bool:
+    """
+    Block until in-flight prefetches for symbols finish.
+    
+    Parameters
+    ----------
+    symbols : List[str]
+        Stock ticker symbols
+    timeout : Optional[float]
+        Maximum seconds to wait (None waits indefinitely)
+    
+    Returns
+    -------
+    bool
+        True if no prefetch for these symbols is still running
+    """
+    with _lock:
+        futures = {_futures[s] for s in symbols if s in _futures}
+    
+    if not futures:
+        return True
+    
+    _, not_done = wait(futures, timeout=timeout)
+    return not not_done
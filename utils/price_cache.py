@@ -0,0 +1,179 @@
+# portfolio_risk_app/utils/price_cache.py
+"""
+Price Cache Module
+Process-wide, memory-bounded price cache shared by all sessions.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Tuple
+
+
+DEFAULT_MAX_BYTES = int(os.environ.get('PRICE_CACHE_MAX_MB', '256')) * 1024 * 1024
+
+
+class _Flight:
+    """A load in progress that concurrent callers wait on."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+def _sizeof(value) -> int:
+    """Approximate memory footprint of a cached value in bytes."""
+    if hasattr(value, 'memory_usage'):
+        usage = value.memory_usage(index=True)
+        return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+class SharedPriceCache:
+    """
+    Thread-safe LRU cache with request coalescing ("single-flight").
+    
+    Concurrent misses on the same key trigger exactly one load: the first
+    caller loads it, later callers wait for that result. Entries expire after
+    a TTL and the least recently used ones are evicted once the total size
+    exceeds a byte budget.
+    """
+    
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl: float = 3600):
+        """
+        Initialize cache.
+        
+        Parameters
+        ----------
+        max_bytes : int
+            Memory budget for cached values
+        ttl : float
+            Seconds before an entry is considered stale
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: 'OrderedDict[Hashable, Tuple[object, int, float]]' = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+    
+    def get_many(self, keys: List[Hashable],
+                 loader: Callable[[List[Hashable]], Tuple[Dict, Dict]]) -> Tuple[Dict, Dict]:
+        """
+        Get values for keys, loading all misses with one loader call.
+        
+        Parameters
+        ----------
+        keys : List[Hashable]
+            Keys to look up
+        loader : Callable
+            Function taking the list of missing keys and returning
+            ``(values, errors)`` dictionaries keyed like its input
+        
+        Returns
+        -------
+        Tuple[Dict, Dict]
+            Values found or loaded, and error messages for keys that failed
+        """
+        now = time.time()
+        values = {}
+        errors = {}
+        owned: Dict[Hashable, _Flight] = {}
+        waiting: Dict[Hashable, _Flight] = {}
+        
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[2] > now:
+                    self._entries.move_to_end(key)
+                    values[key] = entry[0]
+                    self._hits += 1
+                elif key in self._inflight:
+                    waiting[key] = self._inflight[key]
+                    self._coalesced += 1
+                else:
+                    flight = _Flight()
+                    self._inflight[key] = flight
+                    owned[key] = flight
+                    self._misses += 1
+        
+        if owned:
+            loaded, failed = {}, None
+            try:
+                loaded, failed = loader(list(owned))
+            except Exception as e:
+                failed = {key: str(e) for key in owned}
+            finally:
+                # Always release waiters, even when the loader is interrupted by
+                # a BaseException (e.g. a Streamlit rerun or KeyboardInterrupt)
+                with self._lock:
+                    for key, flight in owned.items():
+                        if key in loaded:
+                            flight.value = loaded[key]
+                            self._store(key, loaded[key], now)
+                        elif failed is None:
+                            flight.error = "Load was interrupted"
+                        else:
+                            flight.error = failed.get(key, "No data found")
+                        self._inflight.pop(key, None)
+                
+                for flight in owned.values():
+                    flight.done.set()
+            waiting.update(owned)
+        
+        for key, flight in waiting.items():
+            flight.done.wait()
+            if flight.error is None:
+                values[key] = flight.value
+            else:
+                errors[key] = flight.error
+        
+        return values, errors
+    
+    def _store(self, key: Hashable, value, now: float):
+        """Insert a value and evict least recently used entries over budget."""
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        
+        size = _sizeof(value)
+        self._entries[key] = (value, size, now + self.ttl)
+        self._bytes += size
+        
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._evictions += 1
+    
+    def clear(self):
+        """Drop every cached entry (in-flight loads are unaffected)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+        
+        Returns
+        -------
+        Dict[str, int]
+            Hits, misses, coalesced waits, evictions, entry count and bytes
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'coalesced': self._coalesced,
+                'evictions': self._evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
@@ -0,0 +1,202 @@
+# portfolio_risk_app/utils/price_matrix.py
+"""
+Price Matrix Module
+Compact dates x symbols price block shared by the risk, portfolio and
+simulation modules.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Union
+from utils.alignment import align_values
+
+
+class PriceMatrix:
+    """
+    Prices held as one contiguous 2-D NumPy block (dates x symbols).
+    
+    The block can be float32 or float64. Returns are computed once into a
+    second block of the same dtype; per-asset returns and DataFrame wrappers
+    are views onto it rather than copies.
+    """
+    
+    def __init__(self, values: np.ndarray, dates: pd.DatetimeIndex,
+                 symbols: List[str], dtype=np.float64):
+        """
+        Initialize from a price block.
+        
+        Parameters
+        ----------
+        values : np.ndarray
+            Prices of shape (n_dates, n_symbols)
+        dates : pd.DatetimeIndex
+            Shared date index
+        symbols : List[str]
+            Symbol for each column
+        dtype : numpy dtype
+            np.float32 or np.float64 (default)
+        """
+        self.values = np.ascontiguousarray(values, dtype=dtype)
+        self.dates = pd.DatetimeIndex(dates)
+        self.symbols = list(symbols)
+        self.alignment: Optional[Dict] = None
+        self._returns: Optional[np.ndarray] = None
+        
+        if self.values.shape != (len(self.dates), len(self.symbols)):
+            raise ValueError("Price block shape does not match dates and symbols")
+    
+    @classmethod
+    def from_frame(cls, prices: pd.DataFrame, dtype=np.float64) -> 'PriceMatrix':
+        """
+        Build from a wide price DataFrame.
+        
+        Parameters
+        ----------
+        prices : pd.DataFrame
+            Historical prices with assets as columns
+        dtype : numpy dtype
+            np.float32 or np.float64 (default)
+        
+        Returns
+        -------
+        PriceMatrix
+            Matrix holding the frame's values
+        """
+        matrix = cls(prices.to_numpy(dtype=dtype), prices.index, list(prices.columns), dtype)
+        matrix.alignment = prices.attrs.get('alignment')
+        return matrix
+    
+    @classmethod
+    def from_series(cls, closes: Dict[str, pd.Series], dtype=np.float64) -> 'PriceMatrix':
+        """
+        Align per-symbol price series into one block in a single step.
+        
+        The union of all dates is computed once and every series is written
+        straight into its column of a preallocated block; dates a symbol
+        lacks are left as NaN.
+        
+        Parameters
+        ----------
+        closes : Dict[str, pd.Series]
+            Mapping of symbol to price series indexed by date
+        dtype : numpy dtype
+            np.float32 or np.float64 (default)
+        
+        Returns
+        -------
+        PriceMatrix
+            Aligned matrix
+        """
+        symbols = list(closes)
+        dates = pd.DatetimeIndex([])
+        for series in closes.values():
+            dates = dates.union(series.index)
+        
+        values = np.full((len(dates), len(symbols)), np.nan, dtype=dtype)
+        for j, symbol in enumerate(symbols):
+            series = closes[symbol]
+            values[dates.get_indexer(series.index), j] = series.to_numpy()
+        
+        return cls(values, dates, symbols, dtype)
+    
+    def align(self, policy: str = 'ffill', max_fill_days: int = 5) -> 'PriceMatrix':
+        """
+        Align the block under a missing-data policy (see align_prices).
+        
+        Parameters
+        ----------
+        policy : str
+            One of 'inner', 'ffill' or 'pairwise' (default 'ffill')
+        max_fill_days : int
+            Longest gap, in calendar days, bridged by forward-filling
+        
+        Returns
+        -------
+        PriceMatrix
+            Aligned matrix of the same dtype; its ``alignment`` attribute
+            holds the report
+        """
+        values, kept, report = align_values(self.values, self.dates,
+                                            policy=policy, max_fill_days=max_fill_days)
+        matrix = PriceMatrix(values, self.dates[kept], self.symbols, self.values.dtype)
+        matrix.alignment = report
+        return matrix
+    
+    @property
+    def shape(self):
+        """Shape of the price block (n_dates, n_symbols)."""
+        return self.values.shape
+    
+    @property
+    def columns(self) -> pd.Index:
+        """Symbols as an index, mirroring ``DataFrame.columns``."""
+        return pd.Index(self.symbols)
+    
+    def __len__(self) -> int:
+        return len(self.dates)
+    
+    def column(self, symbol: str) -> np.ndarray:
+        """Return a (strided) view of one symbol's prices."""
+        return self.values[:, self.symbols.index(symbol)]
+    
+    def returns(self) -> np.ndarray:
+        """
+        Get simple daily returns, computed once per matrix.
+        
+        Returns
+        -------
+        np.ndarray
+            Returns of shape (n_dates - 1, n_symbols) in the matrix dtype
+            (an empty block when there are fewer than two dates)
+        """
+        if self._returns is None:
+            n_returns = max(len(self.dates) - 1, 0)
+            returns = np.empty((n_returns, len(self.symbols)), dtype=self.values.dtype)
+            np.divide(self.values[1:], self.values[:-1], out=returns)
+            returns -= 1
+            self._returns = returns
+        return self._returns
+    
+    def returns_frame(self) -> pd.DataFrame:
+        """Wrap the returns block in a DataFrame without copying it."""
+        return pd.DataFrame(self.returns(), index=self.dates[1:],
+                            columns=self.symbols, copy=False)
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Wrap the price block in a DataFrame without copying it."""
+        frame = pd.DataFrame(self.values, index=self.dates,
+                             columns=self.symbols, copy=False)
+        if self.alignment is not None:
+            frame.attrs['alignment'] = self.alignment
+        return frame
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the price (and cached returns) blocks."""
+        returns_bytes = self._returns.nbytes if self._returns is not None else 0
+        return self.values.nbytes + returns_bytes
+
+
+def asset_returns(prices: Union[pd.DataFrame, PriceMatrix]) -> pd.DataFrame:
+    """
+    Get daily asset returns from a price frame or matrix.
+    
+    Parameters
+    ----------
+    prices : Union[pd.DataFrame, PriceMatrix]
+        Historical prices with assets as columns
+    
+    Returns
+    -------
+    pd.DataFrame
+        Daily returns; a return is NaN where either of its prices is
+        missing (pairwise-aligned data), and rows with no returns at all
+        are dropped
+    """
+    if isinstance(prices, PriceMatrix):
+        returns = prices.returns_frame()
+        if np.isnan(prices.returns()).any():
+            returns = returns.dropna(how='all')
+        return returns
+    
+    return prices.pct_change(fill_method=None).dropna(how='all')
@@ -0,0 +1,259 @@
+# portfolio_risk_app/utils/price_store.py
+"""
+Price Store Module
+Keeps daily price history on disk and refreshes only the missing tail.
+"""
+
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_STORE_DIR = os.environ.get('PRICE_STORE_DIR', '.price_store')
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+BAR_DTYPE = np.dtype([('date', 'M8[ns]')] + [(field, 'f8') for field in FIELDS])
+
+
+def period_offset(period: str) -> pd.DateOffset:
+    """Convert a yfinance-style period string (e.g. "1y", "6mo") to an offset."""
+    units = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+    for suffix, unit in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    if period == 'ytd':
+        return pd.DateOffset(days=pd.Timestamp.today().dayofyear)
+    return pd.DateOffset(years=100)
+
+
+def normalize_index(frame: pd.DataFrame) -> pd.DataFrame:
+    """Drop timezones and intraday times so exchanges share a date index."""
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame = frame.copy()
+    frame.index = index.normalize()
+    return frame[~frame.index.duplicated(keep='last')]
+
+
+class PriceStore:
+    """
+    Columnar on-disk store of daily bars, one memory-mapped array per symbol.
+    
+    Each symbol lives in ``<root>/<SYMBOL>.npy`` as a structured array of
+    (date, Open, High, Low, Close, Volume) rows sorted by date. A small
+    ``_index.json`` records, per symbol, the earliest date the stored history
+    is known to cover and when the tail was last checked, so a refresh
+    only downloads bars newer than the last stored one (plus that bar itself
+    when it was fetched during its own, possibly unfinished, session).
+    """
+    
+    def __init__(self, root: str = DEFAULT_STORE_DIR):
+        """
+        Initialize store rooted at a directory.
+        
+        Parameters
+        ----------
+        root : str
+            Directory holding the per-symbol arrays
+        """
+        self.root = root
+        self._lock = threading.RLock()
+        self._index: Optional[Dict[str, Dict[str, str]]] = None
+    
+    def _path(self, symbol: str) -> str:
+        """Return the array path for a symbol."""
+        safe = symbol.replace('/', '_').replace('\\', '_')
+        return os.path.join(self.root, f"{safe}.npy")
+    
+    def _index_path(self) -> str:
+        """Return the path of the coverage index."""
+        return os.path.join(self.root, '_index.json')
+    
+    def _load_index(self) -> Dict[str, Dict[str, str]]:
+        """Load (once) the coverage index from disk."""
+        if self._index is None:
+            try:
+                with open(self._index_path()) as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+    
+    def _save_index(self):
+        """Persist the coverage index."""
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self._index_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path())
+    
+    def load(self, symbol: str) -> Optional[pd.DataFrame]:
+        """
+        Load stored bars for a symbol.
+        
+        Parameters
+        ----------
+        symbol : str
+            Stock ticker symbol
+        
+        Returns
+        -------
+        Optional[pd.DataFrame]
+            OHLCV frame indexed by date, or None if nothing is stored
+        """
+        try:
+            bars = np.load(self._path(symbol), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        
+        return pd.DataFrame(
+            {field: np.asarray(bars[field]) for field in FIELDS},
+            index=pd.DatetimeIndex(np.asarray(bars['date']))
+        )
+    
+    def checked_at(self, symbol: str) -> Optional[pd.Timestamp]:
+        """
+        Get when a symbol's stored tail was last fetched from the source.
+        
+        Parameters
+        ----------
+        symbol : str
+            Stock ticker symbol
+        
+        Returns
+        -------
+        Optional[pd.Timestamp]
+            Time of the last download, or None if the symbol is not stored
+        """
+        with self._lock:
+            meta = self._load_index().get(symbol)
+        return pd.Timestamp(meta['checked']) if meta else None
+    
+    def save(self, symbol: str, frame: pd.DataFrame):
+        """
+        Write bars for a symbol, replacing what is stored.
+        
+        Parameters
+        ----------
+        symbol : str
+            Stock ticker symbol
+        frame : pd.DataFrame
+            OHLCV frame indexed by tz-naive dates
+        """
+        bars = np.empty(len(frame), dtype=BAR_DTYPE)
+        bars['date'] = frame.index.values.astype('M8[ns]')
+        for field in FIELDS:
+            bars[field] = frame[field].values if field in frame else np.nan
+        
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self._path(symbol) + '.tmp.npy'
+        np.save(tmp_path, bars)
+        os.replace(tmp_path, self._path(symbol))
+    
+    def history(self, symbols: List[str], period: str,
+                source) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """
+        Return history for symbols, downloading only what is missing.
+        
+        Symbols with no stored history (or history that does not reach back
+        far enough) are fetched in full in one batch; the rest are fetched
+        from the day after their last stored bar, batched by start date.
+        
+        Parameters
+        ----------
+        symbols : List[str]
+            Stock ticker symbols
+        period : str
+            Period the caller needs (e.g. "1y")
+        source : object
+            Price source exposing ``history(symbols, period, start, end)``
+        
+        Returns
+        -------
+        Tuple[Dict[str, pd.DataFrame], Dict[str, str]]
+            Per-symbol OHLCV frames covering the period, and errors raised
+            by the source keyed by symbol
+        """
+        now = pd.Timestamp.now()
+        today = now.normalize()
+        needed_from = today - period_offset(period)
+        last_session = today if today.dayofweek < 5 else today - pd.offsets.BDay(1)
+        
+        # Plan under the lock, download without it, then merge under it, so
+        # one slow download never blocks reads of other symbols
+        with self._lock:
+            index = self._load_index()
+            stored = {}
+            full_fetch = []
+            tail_fetch: Dict[pd.Timestamp, List[str]] = {}
+            
+            for symbol in symbols:
+                frame = self.load(symbol)
+                meta = index.get(symbol)
+                if frame is None or frame.empty or meta is None \
+                        or pd.Timestamp(meta['from']) > needed_from:
+                    full_fetch.append(symbol)
+                    continue
+                
+                stored[symbol] = frame
+                last_bar = frame.index[-1]
+                checked = pd.Timestamp(meta['checked'])
+                # A bar is final only if it was fetched on a later day than
+                # its own session; one fetched on its own day may be partial
+                final = checked.normalize() > last_bar
+                up_to_date = checked >= today or (final and last_bar >= last_session)
+                if not up_to_date:
+                    start = last_bar + pd.Timedelta(days=1) if final else last_bar
+                    tail_fetch.setdefault(start, []).append(symbol)
+        
+        errors: Dict[str, str] = {}
+        full_downloaded: Dict[str, pd.DataFrame] = {}
+        tail_downloaded: Dict[pd.Timestamp, Dict[str, pd.DataFrame]] = {}
+        
+        if full_fetch:
+            try:
+                full_downloaded = source.history(full_fetch, period=period)
+            except Exception as e:
+                errors.update({symbol: str(e) for symbol in full_fetch})
+        
+        for start, batch in tail_fetch.items():
+            try:
+                tail_downloaded[start] = source.history(batch, start=str(start.date()))
+            except Exception:
+                # Serve the stale history rather than failing the symbol
+                pass
+        
+        if full_downloaded or tail_downloaded:
+            with self._lock:
+                index = self._load_index()
+                
+                for symbol, frame in full_downloaded.items():
+                    frame = normalize_index(frame).reindex(columns=FIELDS)
+                    self.save(symbol, frame)
+                    index[symbol] = {'from': str(needed_from.date()),
+                                     'checked': now.isoformat()}
+                    stored[symbol] = frame
+                
+                for start, downloaded in tail_downloaded.items():
+                    for symbol in tail_fetch[start]:
+                        frame = stored[symbol]
+                        if symbol in downloaded:
+                            new_bars = normalize_index(downloaded[symbol]).reindex(columns=FIELDS)
+                            new_bars = new_bars[new_bars.index >= start]
+                            if not new_bars.empty:
+                                frame = pd.concat([frame[frame.index < new_bars.index[0]], new_bars])
+                                self.save(symbol, frame)
+                                stored[symbol] = frame
+                        index[symbol]['checked'] = now.isoformat()
+                
+                self._save_index()
+        
+        frames = {symbol: frame[frame.index >= needed_from]
+                  for symbol, frame in stored.items()}
+        
+        return frames, errors
@@ -20,7 +20,7 @@ import matplotlib
 matplotlib.use('Agg')
 import io
 import numpy as np
-from typing import Dict
+from typing import Dict, Optional
 
 
 class RiskReportBuilder:
@@ -214,6 +214,35 @@ class RiskReportBuilder:
         self.story.append(table)
         self.story.append(Spacer(1, 0.3*inch))
     
+    def add_risk_surface(self, surface_df: pd.DataFrame):
+        """Add VaR/CVaR by confidence level and horizon."""
+        self.story.append(Paragraph("Downside Risk by Horizon", self.styles['SectionHeader']))
+        self.story.append(Spacer(1, 0.1*inch))
+        
+        surface_data = [[surface_df.index.name or 'Horizon'] + list(surface_df.columns)]
+        for horizon, row in surface_df.iterrows():
+            surface_data.append([horizon] + [f"₹{value:,.0f}" for value in row.values])
+        
+        table = Table(surface_data)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c5aa0')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+        ]))
+        
+        self.story.append(table)
+        self.story.append(Spacer(1, 0.1*inch))
+        self.story.append(Paragraph(
+            "Historical losses over overlapping windows of each horizon; horizons marked * "
+            "are scaled from one-day risk by the square root of time.",
+            self.styles['BodyJustify']
+        ))
+        self.story.append(Spacer(1, 0.3*inch))
+    
     def add_risk_contributors(self, risk_contrib: pd.Series):
         """Add risk contribution analysis."""
         self.story.append(Paragraph("Risk Contributors", self.styles['SectionHeader']))
@@ -318,7 +347,8 @@ def generate_risk_report(filepath: str,
                         risk_level: str,
                         risk_contrib: pd.Series,
                         simulated_values: np.ndarray,
-                        summary_text: str) -> str:
+                        summary_text: str,
+                        risk_surface: Optional[pd.DataFrame] = None) -> str:
     """
     Generate complete risk report PDF.
     
@@ -342,6 +372,8 @@ def generate_risk_report(filepath: str,
         Simulated portfolio values
     summary_text : str
         Executive summary text
+    risk_surface : Optional[pd.DataFrame]
+        VaR/CVaR by horizon table from risk_surface_table
     
     Returns
     -------
@@ -356,6 +388,8 @@ def generate_risk_report(filepath: str,
     builder.add_executive_summary(summary_text)
     builder.add_portfolio_overview(allocation_df)
     builder.add_risk_metrics(var_amount, cvar_amount, portfolio_value, risk_level)
+    if risk_surface is not None:
+        builder.add_risk_surface(risk_surface)
     builder.add_risk_contributors(risk_contrib)
     
     # Calculate VaR value for histogram
@@ -0,0 +1,142 @@
+# portfolio_risk_app/utils/returns_cache.py
+"""
+Returns Cache Module
+Computes asset returns and their moments once per loaded price data.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from typing import Union
+from utils.price_matrix import PriceMatrix, asset_returns
+
+
+class ReturnMoments:
+    """
+    Daily returns of a price dataset with lazily computed, memoized moments.
+    """
+    
+    def __init__(self, returns: Union[pd.DataFrame, pd.Series]):
+        """
+        Initialize from daily returns.
+        
+        Parameters
+        ----------
+        returns : Union[pd.DataFrame, pd.Series]
+            Daily asset returns
+        """
+        self.returns = returns
+        self._mean = None
+        self._cov = None
+        self._corr = None
+        self._std = None
+        self._fingerprint = None
+    
+    @property
+    def mean(self):
+        """Mean daily return per asset."""
+        if self._mean is None:
+            self._mean = self.returns.mean()
+        return self._mean
+    
+    @property
+    def cov(self) -> pd.DataFrame:
+        """Covariance matrix of daily returns (pairwise-complete)."""
+        if self._cov is None:
+            self._cov = self.returns.cov()
+        return self._cov
+    
+    @property
+    def corr(self) -> pd.DataFrame:
+        """Correlation matrix of daily returns (pairwise-complete)."""
+        if self._corr is None:
+            self._corr = self.returns.corr()
+        return self._corr
+    
+    @property
+    def std(self):
+        """Daily return volatility per asset."""
+        if self._std is None:
+            self._std = self.returns.std()
+        return self._std
+    
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the returns (values, dates and columns)."""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            digest.update(np.ascontiguousarray(self.returns.values, dtype=np.float64).tobytes())
+            digest.update(np.asarray(self.returns.index.asi8).tobytes())
+            columns = self.returns.columns if isinstance(self.returns, pd.DataFrame) else [self.returns.name]
+            digest.update(repr(list(columns)).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+
+# Content key -> moments for the most recently used price datasets
+MAX_ENTRIES = 32
+
+_cache: 'OrderedDict[str, ReturnMoments]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def _content_key(prices: Union[pd.DataFrame, pd.Series, PriceMatrix]) -> str:
+    """Hash of the full price values, dates and columns."""
+    if isinstance(prices, PriceMatrix):
+        values, index, columns = prices.values, prices.dates, prices.symbols
+    elif isinstance(prices, pd.DataFrame):
+        values, index, columns = prices.to_numpy(), prices.index, list(prices.columns)
+    else:
+        values, index, columns = prices.to_numpy(), prices.index, [prices.name]
+    
+    values = np.ascontiguousarray(values)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((values.shape, str(values.dtype), columns)).encode())
+    digest.update(memoryview(values).cast('B'))
+    if index.dtype.kind in 'iufM':
+        digest.update(np.ascontiguousarray(index.values).tobytes())
+    else:
+        digest.update(repr(list(index)).encode())
+    return digest.hexdigest()
+
+
+def get_return_moments(prices: Union[pd.DataFrame, pd.Series, PriceMatrix]) -> ReturnMoments:
+    """
+    Get returns and moments for price data, computing them at most once.
+    
+    Results are keyed by a hash of the full price values, dates and
+    columns, so an edit anywhere in the data yields fresh moments while the
+    same data (e.g. the prices kept in session state across reruns, or an
+    equal frame loaded again) does no recomputation. Hashing is linear in
+    the data, far cheaper than the covariance it saves. The MAX_ENTRIES most
+    recently used datasets are kept.
+    
+    Parameters
+    ----------
+    prices : Union[pd.DataFrame, pd.Series, PriceMatrix]
+        Historical prices with assets as columns (or a single price series)
+    
+    Returns
+    -------
+    ReturnMoments
+        Shared returns/moments object; treat it as read-only
+    """
+    key = _content_key(prices)
+    
+    with _lock:
+        moments = _cache.get(key)
+        if moments is not None:
+            _cache.move_to_end(key)
+            return moments
+    
+    moments = ReturnMoments(asset_returns(prices))
+    
+    with _lock:
+        _cache[key] = moments
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    
+    return moments
@@ -6,15 +6,56 @@ Computes Value at Risk (VaR), Conditional VaR (CVaR), and portfolio returns.
 
 import numpy as np
 import pandas as pd
+from scipy.stats import norm
+from typing import Dict, Optional, Sequence, Tuple, Union
+from utils.price_matrix import PriceMatrix
+from utils.returns_cache import get_return_moments
+from utils.simulation_engine import ewma_variance
 
 
-def calculate_portfolio_returns(prices: pd.DataFrame, weights: np.ndarray) -> pd.Series:
+def _available_weighted_returns(returns: np.ndarray, weight_matrix: np.ndarray) -> np.ndarray:
+    """
+    Portfolio returns with weights renormalized over the assets that have a
+    return on each date.
+    
+    Parameters
+    ----------
+    returns : np.ndarray
+        Asset returns of shape (n_days, n_assets), NaN where missing
+    weight_matrix : np.ndarray
+        Weights of shape (k, n_assets)
+    
+    Returns
+    -------
+    np.ndarray
+        Returns of shape (k, n_days); NaN where none of a portfolio's
+        assets has a return
+    """
+    available = ~np.isnan(returns)
+    weighted = weight_matrix @ np.where(available, returns, 0).T
+    if available.all():
+        return weighted
+    
+    # Dividing by the weight actually available keeps a missing asset (e.g.
+    # before its listing date) from counting as a 0% return
+    available_weight = weight_matrix @ available.T
+    scale = np.divide(weight_matrix.sum(axis=1, keepdims=True), available_weight,
+                      out=np.full_like(available_weight, np.nan),
+                      where=np.abs(available_weight) > 1e-12)
+    return weighted * scale
+
+
+def calculate_portfolio_returns(prices: Union[pd.DataFrame, PriceMatrix], weights: np.ndarray) -> pd.Series:
     """
     Calculate portfolio returns from individual asset prices and weights.
     
+    On dates where some assets have no return (pairwise-aligned data, e.g.
+    before a listing date), the weights are renormalized over the assets
+    that do; dates with none of the portfolio's assets are dropped.
+    
     Parameters
     ----------
-    prices : pd.DataFrame
+    prices : Union[pd.DataFrame, PriceMatrix]
         Historical prices with assets as columns
     weights : np.ndarray
         Portfolio weights (must sum to 1)
@@ -24,13 +65,15 @@ def calculate_portfolio_returns(prices: pd.DataFrame, weights: np.ndarray) -> pd
     pd.Series
         Daily portfolio returns
     """
-    # Calculate individual asset returns
-    returns = prices.pct_change().dropna()
+    # Individual asset returns (computed once per price data)
+    returns = get_return_moments(prices).returns
     
     # Calculate weighted portfolio returns
-    portfolio_returns = (returns * weights).sum(axis=1)
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    portfolio_returns = pd.Series(_available_weighted_returns(returns.values, weights)[0],
+                                  index=returns.index)
     
-    return portfolio_returns
+    return portfolio_returns.dropna()
 
 
 def calculate_var(returns: pd.Series, confidence_level: float = 0.95) -> float:
@@ -176,3 +219,741 @@ def portfolio_cvar(current_value: float, returns: pd.Series,
     cvar_monetary = abs(cvar_return * current_value)
     
     return cvar_monetary
+
+
+def _batch_tail_metrics(portfolio_returns: np.ndarray,
+                        confidence_level: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """VaR, CVaR, volatility and maximum drawdown of each row of (k, n_days) returns."""
+    # VaR by linear interpolation between the two ranks around the
+    # percentile, as np.percentile; one partition places both of them
+    n = portfolio_returns.shape[1]
+    position = (1 - confidence_level) * (n - 1)
+    lower, upper = int(np.floor(position)), int(np.ceil(position))
+    partitioned = np.partition(portfolio_returns, upper, axis=1)
+    upper_value = partitioned[:, upper]
+    lower_value = partitioned[:, :upper].max(axis=1) if upper > lower else upper_value
+    var = lower_value + (upper_value - lower_value) * (position - lower)
+    
+    # Returns at or below VaR sit before rank upper, plus any ties with it
+    head = partitioned[:, :upper + 1]
+    in_tail = head <= var[:, np.newaxis]
+    tail_sum = np.where(in_tail, head, 0).sum(axis=1)
+    tail_count = in_tail.sum(axis=1)
+    tied = upper_value == var
+    if tied.any():
+        ties = np.count_nonzero(partitioned[tied, upper + 1:] == var[tied, np.newaxis], axis=1)
+        tail_sum[tied] += ties * var[tied]
+        tail_count[tied] += ties
+    cvar = tail_sum / tail_count
+    
+    volatility = portfolio_returns.std(axis=1, ddof=1)
+    
+    # Drawdowns on log wealth avoid a cumulative product and a division
+    log_wealth = np.cumsum(np.log1p(portfolio_returns), axis=1)
+    peak = np.maximum.accumulate(log_wealth, axis=1)
+    max_drawdown = np.expm1((log_wealth - peak).min(axis=1))
+    
+    return var, cvar, volatility, max_drawdown
+
+
+def calculate_batch_risk_metrics(prices: Union[pd.DataFrame, PriceMatrix],
+                                 weight_matrix: np.ndarray,
+                                 confidence_level: float = 0.95,
+                                 current_value: Optional[float] = None,
+                                 names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Calculate risk metrics for many candidate portfolios at once.
+    
+    All k portfolio return series come from one matrix multiply, and VaR,
+    CVaR, volatility and maximum drawdown are then computed along the time
+    axis for every portfolio together. Each row matches what the single
+    portfolio functions return for that weight vector.
+    
+    Parameters
+    ----------
+    prices : Union[pd.DataFrame, PriceMatrix]
+        Historical prices with assets as columns
+    weight_matrix : np.ndarray
+        Portfolio weights of shape (k, n_assets), one portfolio per row
+    confidence_level : float
+        Confidence level (default 0.95)
+    current_value : Optional[float]
+        Portfolio value; when given, monetary 'var_amount' and
+        'cvar_amount' columns are added
+    names : Optional[Sequence[str]]
+        Row labels (default 0..k-1)
+    
+    Returns
+    -------
+    pd.DataFrame
+        One row per portfolio with 'var', 'cvar' (returns), 'volatility'
+        (daily) and 'max_drawdown'
+    """
+    weight_matrix = np.atleast_2d(np.asarray(weight_matrix, dtype=float))
+    
+    # Missing asset returns are handled as in calculate_portfolio_returns;
+    # one row per portfolio keeps each series contiguous for the reductions
+    portfolio_returns = _available_weighted_returns(get_return_moments(prices).returns.values,
+                                                    weight_matrix)
+    
+    gaps = np.isnan(portfolio_returns).any(axis=1)
+    if gaps.any():
+        # Portfolios with dates lacking all of their assets have series of
+        # different lengths; reduce those one at a time
+        var, cvar, volatility, max_drawdown = _batch_tail_metrics(
+            np.where(gaps[:, np.newaxis], 0, portfolio_returns), confidence_level)
+        for i in np.flatnonzero(gaps):
+            series = portfolio_returns[i][~np.isnan(portfolio_returns[i])][np.newaxis, :]
+            var[i], cvar[i], volatility[i], max_drawdown[i] = \
+                (metric[0] for metric in _batch_tail_metrics(series, confidence_level))
+    else:
+        var, cvar, volatility, max_drawdown = _batch_tail_metrics(portfolio_returns,
+                                                                  confidence_level)
+    
+    table = pd.DataFrame({
+        'var': var,
+        'cvar': cvar,
+        'volatility': volatility,
+        'max_drawdown': max_drawdown
+    }, index=pd.Index(names if names is not None else range(len(weight_matrix)), name='portfolio'))
+    
+    if current_value is not None:
+        table['var_amount'] = np.abs(var * current_value)
+        table['cvar_amount'] = np.abs(cvar * current_value)
+    
+    return table
+
+
+# Time-series inputs: one return series, or one column per asset/portfolio
+ReturnsLike = Union[pd.Series, pd.DataFrame]
+
+
+def _as_columns(returns: ReturnsLike) -> np.ndarray:
+    """View returns as a float (n_days, n_series) array."""
+    values = np.asarray(returns, dtype=float)
+    return values[:, np.newaxis] if values.ndim == 1 else values
+
+
+def _like(returns: ReturnsLike, values: np.ndarray) -> ReturnsLike:
+    """Wrap a (n_days, n_series) result in the shape and labels of returns."""
+    if isinstance(returns, pd.Series):
+        return pd.Series(values[:, 0], index=returns.index, name=returns.name)
+    return pd.DataFrame(values, index=returns.index, columns=returns.columns)
+
+
+def calculate_rolling_volatility(returns: ReturnsLike, window: int = 63) -> ReturnsLike:
+    """
+    Calculate rolling volatility from cumulative sums in O(n).
+    
+    Parameters
+    ----------
+    returns : ReturnsLike
+        Daily returns (a Series, or a DataFrame with one column per series)
+    window : int
+        Window length in days (default 63, about a quarter)
+    
+    Returns
+    -------
+    ReturnsLike
+        Sample standard deviation over each trailing window; NaN until a
+        full window of valid returns is available
+    """
+    values = _as_columns(returns)
+    valid = np.isfinite(values)
+    clean = np.where(valid, values, 0)
+    
+    def window_sums(x):
+        cumulative = np.vstack([np.zeros((1, x.shape[1])), np.cumsum(x, axis=0)])
+        sums = np.full(x.shape, np.nan)
+        sums[window - 1:] = cumulative[window:] - cumulative[:-window]
+        return sums
+    
+    count = window_sums(valid.astype(float))
+    total = window_sums(clean)
+    total_sq = window_sums(clean ** 2)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (total_sq - total ** 2 / window) / (window - 1)
+    variance = np.where(count == window, np.maximum(variance, 0), np.nan)
+    
+    return _like(returns, np.sqrt(variance))
+
+
+def calculate_rolling_var(returns: ReturnsLike, window: int = 63,
+                          confidence_level: float = 0.95) -> ReturnsLike:
+    """
+    Calculate rolling historical VaR.
+    
+    Uses pandas' rolling quantile, which keeps each window in a sorted
+    skiplist, so the cost is O(n log window) per series.
+    
+    Parameters
+    ----------
+    returns : ReturnsLike
+        Daily returns (a Series, or a DataFrame with one column per series)
+    window : int
+        Window length in days (default 63)
+    confidence_level : float
+        Confidence level (default 0.95)
+    
+    Returns
+    -------
+    ReturnsLike
+        VaR over each trailing window as a negative return, as calculate_var
+    """
+    return returns.rolling(window).quantile(1 - confidence_level, interpolation='linear')
+
+
+def _rolling_tail_mean(values: np.ndarray, thresholds: np.ndarray, window: int) -> np.ndarray:
+    """
+    Mean of each trailing window's values at or below its threshold.
+    
+    Values are ranked once, and the window is held as counts and sums in a
+    Fenwick tree indexed by rank. Adding, dropping and summing the values
+    below a threshold each cost O(log n).
+    """
+    n_days = len(values)
+    result = np.full(n_days, np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    order = valid[np.argsort(values[valid], kind='stable')]
+    sorted_values = values[order]
+    
+    size = len(order)
+    rank = np.full(n_days, -1)
+    rank[order] = np.arange(1, size + 1)
+    # Ranks of values at or below each day's threshold are 1 .. bound
+    bounds = np.searchsorted(sorted_values, thresholds, side='right')
+    
+    counts = [0] * (size + 1)
+    sums = [0.0] * (size + 1)
+    
+    def update(i: int, count: int, value: float):
+        while i <= size:
+            counts[i] += count
+            sums[i] += value
+            i += i & -i
+    
+    ranks = rank.tolist()
+    values_list = values.tolist()
+    bounds_list = bounds.tolist()
+    needs_result = (~np.isnan(thresholds)).tolist()
+    
+    for t in range(n_days):
+        if ranks[t] > 0:
+            update(ranks[t], 1, values_list[t])
+        if t >= window and ranks[t - window] > 0:
+            update(ranks[t - window], -1, -values_list[t - window])
+        if t < window - 1 or not needs_result[t]:
+            continue
+        
+        i, count, total = bounds_list[t], 0, 0.0
+        while i > 0:
+            count += counts[i]
+            total += sums[i]
+            i -= i & -i
+        if count:
+            result[t] = total / count
+    
+    return result
+
+
+def calculate_rolling_cvar(returns: ReturnsLike, window: int = 63,
+                           confidence_level: float = 0.95,
+                           var: Optional[ReturnsLike] = None) -> ReturnsLike:
+    """
+    Calculate rolling historical CVaR.
+    
+    Each series is ranked once and its trailing window kept in a Fenwick
+    tree of counts and sums by rank, so each day's tail mean (returns at or
+    below that day's VaR) costs O(log n) rather than a scan of the window.
+    
+    Parameters
+    ----------
+    returns : ReturnsLike
+        Daily returns (a Series, or a DataFrame with one column per series)
+    window : int
+        Window length in days (default 63)
+    confidence_level : float
+        Confidence level (default 0.95)
+    var : Optional[ReturnsLike]
+        Rolling VaR already computed for the same inputs
+    
+    Returns
+    -------
+    ReturnsLike
+        CVaR over each trailing window as a negative return, as calculate_cvar
+    """
+    if var is None:
+        var = calculate_rolling_var(returns, window, confidence_level)
+    
+    values = _as_columns(returns)
+    thresholds = _as_columns(var)
+    result = np.full(values.shape, np.nan)
+    
+    for j in range(values.shape[1]):
+        result[:, j] = _rolling_tail_mean(values[:, j], thresholds[:, j], window)
+    
+    return _like(returns, result)
+
+
+def calculate_ewma_volatility(returns: ReturnsLike, decay: float = 0.94) -> ReturnsLike:
+    """
+    Calculate RiskMetrics EWMA volatility in O(n).
+    
+    Shares ``ewma_variance`` with the filtered historical simulation, so
+    both start from the sample variance and report the same volatility.
+    
+    Parameters
+    ----------
+    returns : ReturnsLike
+        Daily returns (a Series, or a DataFrame with one column per series)
+    decay : float
+        Smoothing factor lambda (default 0.94)
+    
+    Returns
+    -------
+    ReturnsLike
+        sqrt of the recursion s2_t = lambda * s2_(t-1) + (1 - lambda) * r_t^2,
+        including day t
+    """
+    return _like(returns, np.sqrt(ewma_variance(_as_columns(returns), decay)[1:]))
+
+
+def calculate_ewma_var(returns: ReturnsLike, decay: float = 0.94,
+                       confidence_level: float = 0.95) -> ReturnsLike:
+    """
+    Calculate Gaussian VaR from EWMA volatility.
+    
+    Parameters
+    ----------
+    returns : ReturnsLike
+        Daily returns (a Series, or a DataFrame with one column per series)
+    decay : float
+        Smoothing factor lambda (default 0.94)
+    confidence_level : float
+        Confidence level (default 0.95)
+    
+    Returns
+    -------
+    ReturnsLike
+        VaR as a negative return
+    """
+    return norm.ppf(1 - confidence_level) * calculate_ewma_volatility(returns, decay)
+
+
+def calculate_ewma_cvar(returns: ReturnsLike, decay: float = 0.94,
+                        confidence_level: float = 0.95) -> ReturnsLike:
+    """
+    Calculate Gaussian CVaR from EWMA volatility.
+    
+    Parameters
+    ----------
+    returns : ReturnsLike
+        Daily returns (a Series, or a DataFrame with one column per series)
+    decay : float
+        Smoothing factor lambda (default 0.94)
+    confidence_level : float
+        Confidence level (default 0.95)
+    
+    Returns
+    -------
+    ReturnsLike
+        CVaR as a negative return
+    """
+    tail = 1 - confidence_level
+    return -norm.pdf(norm.ppf(tail)) / tail * calculate_ewma_volatility(returns, decay)
+
+
+def calculate_drawdown_series(returns: ReturnsLike) -> ReturnsLike:
+    """
+    Calculate the drawdown from the running peak on every day.
+    
+    Parameters
+    ----------
+    returns : ReturnsLike
+        Daily returns (a Series, or a DataFrame with one column per series)
+    
+    Returns
+    -------
+    ReturnsLike
+        Drawdown (zero or negative); its minimum equals calculate_max_drawdown
+    """
+    log_wealth = np.cumsum(np.log1p(np.nan_to_num(_as_columns(returns))), axis=0)
+    peak = np.maximum.accumulate(log_wealth, axis=0)
+    return _like(returns, np.expm1(log_wealth - peak))
+
+
+def calculate_risk_timeseries(returns: pd.Series, window: int = 63,
+                              confidence_level: float = 0.95,
+                              decay: float = 0.94) -> pd.DataFrame:
+    """
+    Calculate rolling and EWMA risk measures for one return series.
+    
+    Parameters
+    ----------
+    returns : pd.Series
+        Daily portfolio returns
+    window : int
+        Rolling window length in days (default 63)
+    confidence_level : float
+        Confidence level (default 0.95)
+    decay : float
+        EWMA smoothing factor lambda (default 0.94)
+    
+    Returns
+    -------
+    pd.DataFrame
+        Columns 'rolling_var', 'rolling_cvar', 'rolling_volatility',
+        'ewma_var', 'ewma_cvar', 'ewma_volatility' and 'drawdown'
+    """
+    rolling_var = calculate_rolling_var(returns, window, confidence_level)
+    
+    return pd.DataFrame({
+        'rolling_var': rolling_var,
+        'rolling_cvar': calculate_rolling_cvar(returns, window, confidence_level, var=rolling_var),
+        'rolling_volatility': calculate_rolling_volatility(returns, window),
+        'ewma_var': calculate_ewma_var(returns, decay, confidence_level),
+        'ewma_cvar': calculate_ewma_cvar(returns, decay, confidence_level),
+        'ewma_volatility': calculate_ewma_volatility(returns, decay),
+        'drawdown': calculate_drawdown_series(returns)
+    })
+
+
+# Risk surface aggregation methods
+OVERLAPPING = 'overlapping'
+SQRT_TIME = 'sqrt_time'
+
+
+def _sorted_tail_risk(sorted_returns: np.ndarray, prefix_sums: np.ndarray,
+                      confidence_levels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """VaR and CVaR returns at several confidence levels from one sorted sample."""
+    n = len(sorted_returns)
+    position = (1 - confidence_levels) * (n - 1)
+    lower = np.floor(position).astype(int)
+    upper = np.ceil(position).astype(int)
+    var = sorted_returns[lower] + (sorted_returns[upper] - sorted_returns[lower]) * (position - lower)
+    
+    # Every return at or below VaR, ties included, is a prefix of the sorted sample
+    count = np.searchsorted(sorted_returns, var, side='right')
+    cvar = prefix_sums[count - 1] / count
+    
+    return var, cvar
+
+
+def calculate_risk_surface(returns: pd.Series, current_value: float,
+                           confidence_levels: Sequence[float] = (0.90, 0.95, 0.99),
+                           horizons: Sequence[int] = (1, 5, 10, 30),
+                           method: str = OVERLAPPING,
+                           min_windows: int = 20) -> Dict:
+    """
+    Calculate historical VaR and CVaR on a grid of confidence levels and horizons.
+    
+    With 'overlapping', the h-day returns of every overlapping h-day window
+    are compounded from cumulative log returns, sorted once per horizon,
+    and all confidence levels are read off that sort. With 'sqrt_time',
+    the one-day figures are scaled by sqrt(h). Overlapping horizons with
+    fewer than min_windows windows fall back to sqrt-time scaling.
+    
+    Parameters
+    ----------
+    returns : pd.Series
+        Daily portfolio returns
+    current_value : float
+        Current portfolio value
+    confidence_levels : Sequence[float]
+        Confidence levels (default 90%, 95%, 99%)
+    horizons : Sequence[int]
+        Horizons in trading days (default 1, 5, 10, 30)
+    method : str
+        'overlapping' (default) or 'sqrt_time'
+    min_windows : int
+        Fewest overlapping windows accepted for a horizon (default 20)
+    
+    Returns
+    -------
+    Dict
+        'confidence_levels' and 'horizons' (the grid axes), 'var' and
+        'cvar' (monetary losses of shape (n_horizons, n_confidence_levels),
+        positive numbers like portfolio_value_at_risk), 'scaled' (per
+        horizon, whether sqrt-time scaling was used) and 'method'
+    """
+    if method not in (OVERLAPPING, SQRT_TIME):
+        raise ValueError(f"Unknown risk surface method '{method}'; expected '{OVERLAPPING}' or '{SQRT_TIME}'")
+    
+    confidence_levels = np.asarray(confidence_levels, dtype=float)
+    horizons = np.asarray(horizons, dtype=int)
+    daily = np.asarray(returns.dropna(), dtype=float)
+    
+    log_wealth = np.concatenate([[0.0], np.cumsum(np.log1p(daily))])
+    
+    var = np.empty((len(horizons), len(confidence_levels)))
+    cvar = np.empty_like(var)
+    scaled = np.zeros(len(horizons), dtype=bool)
+    daily_risk = None
+    
+    for i, horizon in enumerate(horizons):
+        n_windows = len(daily) - horizon + 1
+        
+        if horizon == 1 or (method == OVERLAPPING and n_windows >= min_windows):
+            horizon_returns = np.sort(np.expm1(log_wealth[horizon:] - log_wealth[:-horizon]))
+            var[i], cvar[i] = _sorted_tail_risk(horizon_returns, np.cumsum(horizon_returns),
+                                                confidence_levels)
+            continue
+        
+        if daily_risk is None:
+            sorted_daily = np.sort(daily)
+            daily_risk = _sorted_tail_risk(sorted_daily, np.cumsum(sorted_daily), confidence_levels)
+        var[i] = daily_risk[0] * np.sqrt(horizon)
+        cvar[i] = daily_risk[1] * np.sqrt(horizon)
+        scaled[i] = True
+    
+    return {
+        'confidence_levels': confidence_levels,
+        'horizons': horizons,
+        'var': np.abs(var * current_value),
+        'cvar': np.abs(cvar * current_value),
+        'scaled': scaled,
+        'method': method
+    }
+
+
+def get_surface_value(surface: Dict, measure: str, confidence_level: float,
+                      horizon: int) -> float:
+    """
+    Read one VaR or CVaR amount from a risk surface.
+    
+    Parameters
+    ----------
+    surface : Dict
+        Result of calculate_risk_surface
+    measure : str
+        'var' or 'cvar'
+    confidence_level : float
+        Confidence level on the surface grid
+    horizon : int
+        Horizon on the surface grid
+    
+    Returns
+    -------
+    float
+        Monetary loss
+    """
+    row = int(np.flatnonzero(surface['horizons'] == horizon)[0])
+    column = int(np.flatnonzero(np.isclose(surface['confidence_levels'], confidence_level))[0])
+    return float(surface[measure][row, column])
+
+
+def risk_surface_table(surface: Dict) -> pd.DataFrame:
+    """
+    Lay out a risk surface as a display table.
+    
+    Parameters
+    ----------
+    surface : Dict
+        Result of calculate_risk_surface
+    
+    Returns
+    -------
+    pd.DataFrame
+        One row per horizon (e.g. '30 days', marked '*' when sqrt-time
+        scaled) and 'VaR 95%' / 'CVaR 95%' style columns in monetary units
+    """
+    columns = {}
+    for j, level in enumerate(surface['confidence_levels']):
+        columns[f"VaR {level * 100:g}%"] = surface['var'][:, j]
+        columns[f"CVaR {level * 100:g}%"] = surface['cvar'][:, j]
+    
+    index = [f"{h} day{'s' if h != 1 else ''}{' *' if scaled else ''}"
+             for h, scaled in zip(surface['horizons'], surface['scaled'])]
+    
+    return pd.DataFrame(columns, index=pd.Index(index, name='Horizon'))
+
+
+# Parametric VaR methods
+GAUSSIAN = 'gaussian'
+CORNISH_FISHER = 'cornish_fisher'
+
+# Gauss-Legendre nodes/weights on (0, 1) for averaging quantiles over the tail
+_TAIL_NODES, _TAIL_WEIGHTS = np.polynomial.legendre.leggauss(16)
+_TAIL_NODES = (_TAIL_NODES + 1) / 2
+_TAIL_WEIGHTS = _TAIL_WEIGHTS / 2
+
+
+def cornish_fisher_quantile(z: Union[float, np.ndarray], skewness: float,
+                            excess_kurtosis: float) -> Union[float, np.ndarray]:
+    """
+    Adjust standard normal quantiles for skewness and excess kurtosis.
+    
+    Parameters
+    ----------
+    z : Union[float, np.ndarray]
+        Standard normal quantile(s)
+    skewness : float
+        Skewness of the distribution
+    excess_kurtosis : float
+        Excess kurtosis of the distribution
+    
+    Returns
+    -------
+    Union[float, np.ndarray]
+        Cornish-Fisher quantile(s) in standard deviation units
+    """
+    return (z
+            + (z ** 2 - 1) * skewness / 6
+            + (z ** 3 - 3 * z) * excess_kurtosis / 24
+            - (2 * z ** 3 - 5 * z) * skewness ** 2 / 36)
+
+
+class ParametricRisk:
+    """
+    Closed-form VaR/CVaR scorer for one price history and confidence level.
+    
+    The mean vector, covariance matrix, centered returns and normal
+    quantiles are captured once, so scoring a new weight vector costs a
+    few matrix-vector products. Use it to re-score what-if weightings
+    instead of re-aggregating the return history each time.
+    """
+    
+    def __init__(self, prices: Union[pd.DataFrame, PriceMatrix],
+                 confidence_level: float = 0.95):
+        """
+        Initialize scorer.
+        
+        Parameters
+        ----------
+        prices : Union[pd.DataFrame, PriceMatrix]
+            Historical prices with assets as columns
+        confidence_level : float
+            Confidence level (default 0.95)
+        """
+        moments = get_return_moments(prices)
+        self.symbols = list(moments.mean.index)
+        self.mean_returns = moments.mean.values
+        self.cov_matrix = moments.cov.values
+        self._centered = np.nan_to_num(moments.returns.values - self.mean_returns)
+        
+        self.confidence_level = confidence_level
+        tail = 1 - confidence_level
+        self._z = float(norm.ppf(tail))
+        self._cvar_z = float(-norm.pdf(self._z) / tail)
+        self._tail_z = norm.ppf(tail * _TAIL_NODES)
+    
+    def higher_moments(self, weights: np.ndarray) -> Tuple[float, float]:
+        """
+        Get skewness and excess kurtosis of portfolio returns.
+        
+        Parameters
+        ----------
+        weights : np.ndarray
+            Portfolio weights
+        
+        Returns
+        -------
+        Tuple[float, float]
+            Skewness and excess kurtosis
+        """
+        centered = self._centered @ weights
+        variance = np.mean(centered ** 2)
+        if variance == 0:
+            return 0.0, 0.0
+        
+        skewness = np.mean(centered ** 3) / variance ** 1.5
+        excess_kurtosis = np.mean(centered ** 4) / variance ** 2 - 3
+        return float(skewness), float(excess_kurtosis)
+    
+    def score(self, weights: np.ndarray, method: str = GAUSSIAN) -> Dict[str, float]:
+        """
+        Calculate daily VaR and CVaR for a weight vector.
+        
+        'gaussian' uses the portfolio mean and volatility only.
+        'cornish_fisher' adjusts the quantile for the portfolio's skewness
+        and excess kurtosis; its CVaR averages the adjusted quantile over
+        the tail by Gauss-Legendre quadrature.
+        
+        Parameters
+        ----------
+        weights : np.ndarray
+            Portfolio weights
+        method : str
+            'gaussian' (default) or 'cornish_fisher'
+        
+        Returns
+        -------
+        Dict[str, float]
+            'var' and 'cvar' as negative returns (as calculate_var), plus the
+            'mean', 'volatility', 'skewness' and 'excess_kurtosis' used
+        """
+        weights = np.asarray(weights, dtype=float)
+        mean = float(weights @ self.mean_returns)
+        volatility = float(np.sqrt(weights @ self.cov_matrix @ weights))
+        
+        if method == GAUSSIAN:
+            skewness, excess_kurtosis = 0.0, 0.0
+            var_z, cvar_z = self._z, self._cvar_z
+        elif method == CORNISH_FISHER:
+            skewness, excess_kurtosis = self.higher_moments(weights)
+            var_z = cornish_fisher_quantile(self._z, skewness, excess_kurtosis)
+            cvar_z = float(_TAIL_WEIGHTS @ cornish_fisher_quantile(self._tail_z, skewness,
+                                                                   excess_kurtosis))
+        else:
+            raise ValueError(f"Unknown parametric method '{method}'; expected '{GAUSSIAN}' or '{CORNISH_FISHER}'")
+        
+        return {
+            'var': mean + var_z * volatility,
+            'cvar': mean + cvar_z * volatility,
+            'mean': mean,
+            'volatility': volatility,
+            'skewness': skewness,
+            'excess_kurtosis': excess_kurtosis
+        }
+    
+    def marginal_var(self, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate Gaussian marginal and component VaR per asset.
+        
+        Daily VaR as a positive loss fraction is -w.mu - z * sigma_p. Its
+        gradient, the marginal VaR, is -mu - z * (Sigma w) / sigma_p, and
+        the components w_i * marginal_i sum exactly to the portfolio VaR.
+        
+        Parameters
+        ----------
+        weights : np.ndarray
+            Portfolio weights
+        
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Marginal VaR and component VaR per asset (loss fractions)
+        """
+        weights = np.asarray(weights, dtype=float)
+        cov_weights = self.cov_matrix @ weights
+        volatility = np.sqrt(weights @ cov_weights)
+        
+        marginal = -self.mean_returns - self._z * cov_weights / volatility
+        return marginal, weights * marginal
+
+
+def calculate_parametric_risk(prices: Union[pd.DataFrame, PriceMatrix],
+                              weights: np.ndarray,
+                              confidence_level: float = 0.95,
+                              method: str = GAUSSIAN) -> Dict[str, float]:
+    """
+    Calculate closed-form daily VaR and CVaR from the cached moments.
+    
+    Parameters
+    ----------
+    prices : Union[pd.DataFrame, PriceMatrix]
+        Historical prices with assets as columns
+    weights : np.ndarray
+        Portfolio weights
+    confidence_level : float
+        Confidence level (default 0.95)
+    method : str
+        'gaussian' (default) or 'cornish_fisher'
+    
+    Returns
+    -------
+    Dict[str, float]
+        See ParametricRisk.score
+    """
+    return ParametricRisk(prices, confidence_level).score(weights, method)
@@ -4,17 +4,87 @@ Monte Carlo Simulation Module
 Simulates future portfolio value distributions based on historical returns.
 """
 
+import time
 import numpy as np
 import pandas as pd
-from typing import Tuple
+from typing import Dict, Optional, Tuple, Union
+from utils.price_matrix import PriceMatrix
+from utils.returns_cache import get_return_moments
+from utils.simulation_cache import get_simulation_cache, simulation_key
+from utils.simulation_engine import (
+    NormalModel, StudentTModel, TCopulaModel, BlockBootstrapModel, FilteredHistoricalModel,
+    build_price_paths, fit_t_dof, simulate_final_values
+)
+from utils.variance_reduction import PLAIN, estimate_tail_risk
 
 
-def simulate_portfolio_outcomes(prices: pd.DataFrame, 
+# Return models selectable by name in simulate_portfolio_outcomes
+RETURN_MODELS = {
+    NormalModel.name: NormalModel,
+    StudentTModel.name: StudentTModel,
+    TCopulaModel.name: TCopulaModel,
+    BlockBootstrapModel.name: BlockBootstrapModel,
+    FilteredHistoricalModel.name: FilteredHistoricalModel
+}
+
+
+def build_return_model(prices: Union[pd.DataFrame, PriceMatrix],
+                       model: str = NormalModel.name,
+                       model_options: Optional[dict] = None):
+    """
+    Fit a named return model to historical prices.
+    
+    Parameters
+    ----------
+    prices : Union[pd.DataFrame, PriceMatrix]
+        Historical prices with assets as columns
+    model : str
+        One of RETURN_MODELS (default 'normal')
+    model_options : Optional[dict]
+        Extra keyword arguments for the model (e.g. block_size, decay, dof);
+        Student-t degrees of freedom are fitted to the history when omitted
+    
+    Returns
+    -------
+    NormalModel or another return model from utils.simulation_engine
+        Fitted model
+    """
+    if model not in RETURN_MODELS:
+        raise ValueError(f"Unknown return model '{model}'; expected one of {list(RETURN_MODELS)}")
+    
+    moments = get_return_moments(prices)
+    options = model_options or {}
+    
+    if model == NormalModel.name:
+        return NormalModel(moments.mean.values, moments.cov.values, **options)
+    
+    if model == StudentTModel.name:
+        if 'dof' not in options:
+            options = {**options, 'dof': fit_t_dof(moments.returns.dropna().values)}
+        return StudentTModel(moments.mean.values, moments.cov.values, **options)
+    
+    if model == TCopulaModel.name:
+        complete = moments.returns.dropna().values
+        if 'copula_dof' not in options:
+            options = {**options, 'copula_dof': fit_t_dof(complete)}
+        if 'marginal_dofs' not in options:
+            options = {**options, 'marginal_dofs': [fit_t_dof(column) for column in complete.T]}
+        return TCopulaModel(moments.mean.values, moments.cov.values, **options)
+    
+    # Historical models resample whole days, so keep only days every asset traded
+    return RETURN_MODELS[model](moments.returns.dropna().values, **options)
+
+
+def simulate_portfolio_outcomes(prices: Union[pd.DataFrame, PriceMatrix], 
                                 weights: np.ndarray,
                                 current_value: float,
                                 horizon_days: int = 30,
                                 n_simulations: int = 10000,
-                                random_seed: int = 42) -> np.ndarray:
+                                random_seed: int = 42,
+                                memory_budget_mb: Optional[float] = None,
+                                use_cache: bool = True,
+                                model: str = NormalModel.name,
+                                model_options: Optional[dict] = None) -> np.ndarray:
     """
     Simulate future portfolio values using Monte Carlo simulation.
     
@@ -23,9 +93,22 @@ def simulate_portfolio_outcomes(prices: pd.DataFrame,
     2. Simulating correlated daily returns
     3. Compounding returns over the horizon
     
+    The covariance is factored once (Cholesky, with an eigenvalue fallback)
+    and, since weighted normal returns are normal, daily portfolio returns
+    are drawn directly rather than through per-asset paths. Paths are
+    generated in chunks that fit memory_budget_mb, so long horizons and
+    large universes run in bounded memory with seed-stable results.
+    Results are memoized by their inputs in the shared simulation cache.
+    
+    model selects 'block_bootstrap' or 'filtered_historical' instead of the
+    normal model to resample historical days (the latter rescaled to the
+    current EWMA volatility), which keeps the empirical fat tails, or
+    'student_t' / 't_copula' for fat-tailed draws with fitted degrees of
+    freedom.
+    
     Parameters
     ----------
-    prices : pd.DataFrame
+    prices : Union[pd.DataFrame, PriceMatrix]
         Historical prices with assets as columns
     weights : np.ndarray
         Portfolio weights (must sum to 1)
@@ -37,42 +120,273 @@ def simulate_portfolio_outcomes(prices: pd.DataFrame,
         Number of Monte Carlo simulations (default 10000)
     random_seed : int
         Random seed for reproducibility
+    memory_budget_mb : Optional[float]
+        Cap on simulation working memory in megabytes (default 256)
+    use_cache : bool
+        Reuse an identical earlier result (default True); cached arrays
+        are read-only
+    model : str
+        Return model name, one of RETURN_MODELS (default 'normal')
+    model_options : Optional[dict]
+        Extra keyword arguments for the return model
     
     Returns
     -------
     np.ndarray
         Array of simulated portfolio values at horizon
     """
-    np.random.seed(random_seed)
+    # Get mean returns and covariance matrix of historical returns
+    moments = get_return_moments(prices)
     
-    # Calculate historical returns
-    returns = prices.pct_change().dropna()
+    def run():
+        return simulate_final_values(
+            build_return_model(prices, model, model_options), weights, current_value,
+            horizon_days=horizon_days,
+            n_simulations=n_simulations,
+            random_seed=random_seed,
+            memory_budget_mb=memory_budget_mb
+        )
     
-    # Get mean returns and covariance matrix
-    mean_returns = returns.mean().values
-    cov_matrix = returns.cov().values
+    if not use_cache:
+        return run()
     
-    # Simulate correlated returns
-    simulated_returns = np.random.multivariate_normal(
-        mean_returns, 
-        cov_matrix, 
-        size=(n_simulations, horizon_days)
-    )
+    key = simulation_key(model, moments.fingerprint, weights,
+                         current_value=float(current_value), horizon_days=horizon_days,
+                         n_simulations=n_simulations, random_seed=random_seed,
+                         model_options=sorted((model_options or {}).items()))
+    return get_simulation_cache().get_or_compute(key, run)
+
+
+def tail_risk_with_errors(simulated_values: np.ndarray, current_value: float,
+                          confidence_level: float = 0.95,
+                          z_score: float = 1.96) -> dict:
+    """
+    Estimate VaR/CVaR from simulated values with confidence interval half-widths.
+    
+    The VaR interval uses order-statistic bounds: the quantile lies between
+    the sorted values at ranks n*p -/+ z*sqrt(n*p*(1-p)). The CVaR interval
+    uses the asymptotic standard error of the tail mean. The three order
+    statistics are found with one O(n) partition instead of a full sort.
+    
+    Parameters
+    ----------
+    simulated_values : np.ndarray
+        Simulated portfolio values
+    current_value : float
+        Current portfolio value
+    confidence_level : float
+        Confidence level (default 0.95)
+    z_score : float
+        Normal quantile for the interval (default 1.96 for 95%)
+    
+    Returns
+    -------
+    dict
+        'var', 'cvar' (monetary losses) and 'var_error', 'cvar_error'
+        (interval half-widths in monetary units)
+    """
+    n = len(simulated_values)
+    tail = 1 - confidence_level
+    
+    k = min(int(np.floor(n * tail)), n - 1)
+    spread = z_score * np.sqrt(n * tail * confidence_level)
+    lower_rank = max(int(np.floor(n * tail - spread)), 0)
+    upper_rank = min(int(np.ceil(n * tail + spread)), n - 1)
+    
+    # After partitioning, the ranks asked for hold their sorted values and
+    # the first k + 1 entries are the k + 1 smallest (in some order)
+    partitioned = np.partition(simulated_values, sorted({lower_rank, k, upper_rank}))
+    lower = partitioned[lower_rank]
+    upper = partitioned[upper_rank]
+    
+    var_value = partitioned[k]
+    tail_values = partitioned[:k + 1]
+    cvar_value = tail_values.mean()
+    
+    tail_variance = tail_values.var() + confidence_level * (cvar_value - var_value) ** 2
+    cvar_se = np.sqrt(tail_variance / max(n * tail, 1))
     
-    # Calculate portfolio returns for each simulation
-    portfolio_returns = np.dot(simulated_returns, weights)
+    return {
+        'var': current_value - var_value,
+        'cvar': current_value - cvar_value,
+        'var_error': (upper - lower) / 2,
+        'cvar_error': z_score * cvar_se
+    }
+
+
+def simulate_portfolio_adaptive(prices: Union[pd.DataFrame, PriceMatrix],
+                                weights: np.ndarray,
+                                current_value: float,
+                                horizon_days: int = 30,
+                                confidence_level: float = 0.95,
+                                tolerance: float = 0.02,
+                                batch_size: int = 5000,
+                                max_simulations: int = 200000,
+                                time_budget: Optional[float] = 5.0,
+                                random_seed: int = 42,
+                                use_cache: bool = True,
+                                abs_tol: float = 1e-4) -> dict:
+    """
+    Simulate portfolio values in batches until VaR/CVaR are precise enough.
+    
+    Batches are drawn from one generator, so the values equal
+    simulate_portfolio_outcomes for the same seed and path count. After
+    each batch the 95% interval half-widths of VaR and CVaR are compared
+    with max(tolerance * |estimate|, abs_tol * current_value), so estimates
+    near zero still converge; simulation stops when both are within it, or
+    when max_simulations or time_budget is reached. Paths are written into
+    one preallocated buffer.
+    
+    Results are memoized by their inputs in the shared simulation cache.
+    A run cut short by time_budget depends on machine speed rather than on
+    its inputs, so it is returned but not cached.
+    
+    Parameters
+    ----------
+    prices : Union[pd.DataFrame, PriceMatrix]
+        Historical prices with assets as columns
+    weights : np.ndarray
+        Portfolio weights (must sum to 1)
+    current_value : float
+        Current portfolio value
+    horizon_days : int
+        Simulation horizon in days (default 30)
+    confidence_level : float
+        VaR/CVaR confidence level (default 0.95)
+    tolerance : float
+        Target interval half-width as a fraction of the estimate (default 0.02)
+    batch_size : int
+        Paths per batch (default 5000)
+    max_simulations : int
+        Upper bound on paths (default 200000)
+    time_budget : Optional[float]
+        Wall-clock budget in seconds (default 5.0; None for no limit)
+    random_seed : int
+        Random seed for reproducibility
+    use_cache : bool
+        Reuse an identical earlier result (default True); cached arrays
+        are read-only
+    abs_tol : float
+        Floor on the target half-width as a fraction of current_value
+        (default 1e-4)
+    
+    Returns
+    -------
+    dict
+        'values' (simulated portfolio values), 'var', 'cvar', 'var_error',
+        'cvar_error', 'n_paths', 'converged' and 'timed_out'
+    """
+    moments = get_return_moments(prices)
+    
+    if use_cache:
+        key = simulation_key(
+            'adaptive-' + NormalModel.name, moments.fingerprint, weights,
+            current_value=float(current_value), horizon_days=horizon_days,
+            confidence_level=confidence_level, tolerance=tolerance,
+            batch_size=batch_size, max_simulations=max_simulations,
+            random_seed=random_seed, abs_tol=abs_tol
+        )
+        return get_simulation_cache().get_or_compute(
+            key,
+            lambda: simulate_portfolio_adaptive(
+                prices, weights, current_value, horizon_days, confidence_level, tolerance,
+                batch_size, max_simulations, time_budget, random_seed,
+                use_cache=False, abs_tol=abs_tol
+            ),
+            store_if=lambda result: not result['timed_out']
+        )
+    
+    start = time.perf_counter()
+    rng = np.random.default_rng(random_seed)
+    weights = np.asarray(weights, dtype=float)
+    model = NormalModel(moments.mean.values, moments.cov.values)
     
-    # Compound returns over horizon to get final values
-    final_values = current_value * np.prod(1 + portfolio_returns, axis=1)
+    values = np.empty(max_simulations)
+    abs_floor = abs_tol * abs(current_value)
+    n_paths = 0
+    
+    while True:
+        n_batch = min(batch_size, max_simulations - n_paths)
+        portfolio_returns = model.sample_portfolio_returns(rng, n_batch, horizon_days, weights)
+        np.prod(1 + portfolio_returns, axis=1, out=values[n_paths:n_paths + n_batch])
+        values[n_paths:n_paths + n_batch] *= current_value
+        n_paths += n_batch
+        
+        result = tail_risk_with_errors(values[:n_paths], current_value, confidence_level)
+        
+        converged = bool(result['var_error'] <= max(tolerance * abs(result['var']), abs_floor)
+                         and result['cvar_error'] <= max(tolerance * abs(result['cvar']), abs_floor))
+        timed_out = time_budget is not None and time.perf_counter() - start >= time_budget
+        if converged or n_paths >= max_simulations or timed_out:
+            break
     
-    return final_values
+    result.update({
+        'values': values[:n_paths].copy() if n_paths < max_simulations else values,
+        'n_paths': n_paths,
+        'converged': converged,
+        'timed_out': bool(timed_out and not converged and n_paths < max_simulations)
+    })
+    return result
+
+
+def estimate_portfolio_tail_risk(prices: Union[pd.DataFrame, PriceMatrix],
+                                 weights: np.ndarray,
+                                 current_value: float,
+                                 horizon_days: int = 30,
+                                 n_simulations: int = 10000,
+                                 confidence_level: float = 0.95,
+                                 method: str = PLAIN,
+                                 random_seed: int = 42) -> dict:
+    """
+    Estimate simulated VaR/CVaR and their standard errors.
+    
+    method selects a variance-reduction scheme ('plain', 'antithetic',
+    'moment_matching', 'sobol' or 'importance'); see
+    utils.variance_reduction for details.
+    
+    Parameters
+    ----------
+    prices : Union[pd.DataFrame, PriceMatrix]
+        Historical prices with assets as columns
+    weights : np.ndarray
+        Portfolio weights (must sum to 1)
+    current_value : float
+        Current portfolio value
+    horizon_days : int
+        Simulation horizon in days (default 30)
+    n_simulations : int
+        Number of Monte Carlo simulations (default 10000)
+    confidence_level : float
+        Confidence level (default 0.95)
+    method : str
+        Variance-reduction method (default 'plain')
+    random_seed : int
+        Random seed for reproducibility
+    
+    Returns
+    -------
+    dict
+        'var', 'cvar' (monetary losses), 'var_se', 'cvar_se', 'n_paths', 'method'
+    """
+    moments = get_return_moments(prices)
+    model = NormalModel(moments.mean.values, moments.cov.values)
+    
+    return estimate_tail_risk(
+        model, weights, current_value,
+        horizon_days=horizon_days,
+        n_simulations=n_simulations,
+        confidence_level=confidence_level,
+        method=method,
+        random_seed=random_seed
+    )
 
 
 def simulate_single_asset_paths(prices: pd.Series,
                                 current_price: float,
                                 horizon_days: int = 14,
                                 n_simulations: int = 500,
-                                random_seed: int = 42) -> np.ndarray:
+                                random_seed: int = 42,
+                                dtype=np.float64) -> np.ndarray:
     """
     Simulate future price paths for a single asset.
     
@@ -90,85 +404,279 @@ def simulate_single_asset_paths(prices: pd.Series,
         Number of paths to simulate
     random_seed : int
         Random seed for reproducibility
+    dtype : np.dtype
+        Dtype of the returned paths (np.float32 halves memory)
     
     Returns
     -------
     np.ndarray
-        Array of shape (n_simulations, horizon_days) containing price paths
+        Array of shape (n_simulations, horizon_days + 1) containing price paths
     """
-    np.random.seed(random_seed)
+    rng = np.random.default_rng(random_seed)
     
-    # Calculate historical returns statistics
-    returns = prices.pct_change().dropna()
-    mean_return = returns.mean()
-    volatility = returns.std()
+    # Historical returns statistics
+    moments = get_return_moments(prices)
+    mean_return = moments.mean
+    volatility = moments.std
     
-    # Simulate daily returns
-    simulated_returns = np.random.normal(
-        mean_return,
-        volatility,
-        size=(n_simulations, horizon_days)
-    )
+    # Simulate daily returns, drawn one day at a time across all paths so
+    # the streaming summarize_asset_paths_batch consumes the same stream
+    simulated_returns = mean_return + volatility * rng.standard_normal((horizon_days, n_simulations)).T
     
     # Generate price paths by compounding returns
-    price_paths = np.zeros((n_simulations, horizon_days + 1))
-    price_paths[:, 0] = current_price
+    return build_price_paths(simulated_returns, current_price, dtype=dtype)
+
+
+def _start_prices(prices: Union[pd.DataFrame, PriceMatrix],
+                  current_prices: Dict[str, float]) -> Tuple[list, np.ndarray]:
+    """
+    Starting price per asset, falling back to the last close without a quote.
     
-    for t in range(horizon_days):
-        price_paths[:, t + 1] = price_paths[:, t] * (1 + simulated_returns[:, t])
+    Assets with neither a quote nor any finite close are left out.
     
-    return price_paths
+    Returns
+    -------
+    Tuple[list, np.ndarray]
+        Symbols that can be simulated and their starting prices
+    """
+    symbols, start_prices = [], []
+    for symbol in prices.columns:
+        price = current_prices.get(symbol)
+        if price is None or not np.isfinite(price) or price <= 0:
+            closes = (prices.column(symbol) if isinstance(prices, PriceMatrix)
+                      else prices[symbol].to_numpy(dtype=float))
+            closes = closes[np.isfinite(closes)]
+            price = closes[-1] if len(closes) else None
+        if price is not None:
+            symbols.append(symbol)
+            start_prices.append(float(price))
+    
+    return symbols, np.array(start_prices, dtype=float)
+
+
+def simulate_asset_paths_batch(prices: Union[pd.DataFrame, PriceMatrix],
+                               current_prices: Dict[str, float],
+                               horizon_days: int = 14,
+                               n_simulations: int = 500,
+                               random_seed: int = 42,
+                               dtype=np.float64) -> Dict[str, np.ndarray]:
+    """
+    Simulate future price paths for every asset in one call.
+    
+    One set of standard normal shocks is scaled by each asset's mean and
+    volatility, so each asset's paths equal simulate_single_asset_paths
+    with the same seed. All paths share one preallocated buffer.
+    
+    Parameters
+    ----------
+    prices : Union[pd.DataFrame, PriceMatrix]
+        Historical prices with assets as columns
+    current_prices : Dict[str, float]
+        Current price per symbol; assets without one start from their last close
+    horizon_days : int
+        Simulation horizon in days
+    n_simulations : int
+        Number of paths per asset
+    random_seed : int
+        Random seed for reproducibility
+    dtype : np.dtype
+        Dtype of the path buffer (np.float32 halves memory)
+    
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        Symbol -> array of shape (n_simulations, horizon_days + 1)
+    """
+    rng = np.random.default_rng(random_seed)
+    
+    moments = get_return_moments(prices)
+    symbols, start_prices = _start_prices(prices, current_prices)
+    mean_returns = moments.mean[symbols].values
+    volatilities = moments.std[symbols].values
+    
+    # Shared shocks scaled per asset: shape (n_assets, n_simulations, horizon_days),
+    # drawn day by day as in simulate_single_asset_paths
+    shocks = rng.standard_normal((horizon_days, n_simulations)).T
+    simulated_returns = (mean_returns[:, np.newaxis, np.newaxis]
+                         + volatilities[:, np.newaxis, np.newaxis] * shocks)
+    
+    paths = build_price_paths(simulated_returns, start_prices, dtype=dtype)
+    
+    return {symbol: paths[i] for i, symbol in enumerate(symbols)}
+
+
+def summarize_asset_paths_batch(prices: Union[pd.DataFrame, PriceMatrix],
+                                current_prices: Dict[str, float],
+                                horizon_days: int = 14,
+                                n_simulations: int = 500,
+                                random_seed: int = 42,
+                                percentiles: Tuple[float, ...] = (5, 50, 95),
+                                n_sample_paths: int = 50) -> Dict[str, dict]:
+    """
+    Simulate price scenarios for every asset, keeping only summary output.
+    
+    Paths are advanced one day at a time, so only the current growth of
+    each path, shape (n_assets, n_simulations), is held in memory; the full
+    path matrix is never built, whatever the horizon. Per-day percentile
+    bands, the first n_sample_paths paths (the draws are i.i.d., so this is
+    a fixed random sample) and the final prices are recorded along the way.
+    Each day draws the same shocks, in the same order, as
+    simulate_single_asset_paths and simulate_asset_paths_batch, so every
+    asset's scenarios equal those for the same seed.
+    
+    Parameters
+    ----------
+    prices : Union[pd.DataFrame, PriceMatrix]
+        Historical prices with assets as columns
+    current_prices : Dict[str, float]
+        Current price per symbol; assets without one start from their last close
+    horizon_days : int
+        Simulation horizon in days
+    n_simulations : int
+        Number of paths per asset
+    random_seed : int
+        Random seed for reproducibility
+    percentiles : Tuple[float, ...]
+        Percentile bands to record at each step
+    n_sample_paths : int
+        Number of full paths to keep for display
+    
+    Returns
+    -------
+    Dict[str, dict]
+        Symbol -> {'bands': {percentile: array of length horizon_days + 1},
+        'sample_paths': array (n_sample_paths, horizon_days + 1),
+        'final_prices': array (n_simulations,), 'start_price': float}
+    """
+    rng = np.random.default_rng(random_seed)
+    
+    moments = get_return_moments(prices)
+    symbols, start_prices = _start_prices(prices, current_prices)
+    mean_returns = moments.mean[symbols].values[:, np.newaxis]
+    volatilities = moments.std[symbols].values[:, np.newaxis]
+    start_column = start_prices[:, np.newaxis]
+    n_sample_paths = min(n_sample_paths, n_simulations)
+    
+    # Compounded growth of every path, shape (n_assets, n_simulations);
+    # prices are growth * start, as in build_price_paths
+    growth = np.ones((len(symbols), n_simulations))
+    state = np.repeat(start_column, n_simulations, axis=1)
+    
+    bands = np.empty((len(percentiles), len(symbols), horizon_days + 1))
+    sample_paths = np.empty((len(symbols), n_sample_paths, horizon_days + 1))
+    bands[:, :, 0] = start_prices
+    sample_paths[:, :, 0] = start_column
+    
+    for t in range(1, horizon_days + 1):
+        # One set of shocks per day, scaled per asset
+        shocks = rng.standard_normal(n_simulations)
+        growth *= 1 + (mean_returns + volatilities * shocks)
+        state = growth * start_column
+        
+        bands[:, :, t] = np.percentile(state, percentiles, axis=1)
+        sample_paths[:, :, t] = state[:, :n_sample_paths]
+    
+    return {
+        symbol: {
+            'bands': {p: bands[k, i] for k, p in enumerate(percentiles)},
+            'sample_paths': sample_paths[i],
+            'final_prices': state[i],
+            'start_price': start_prices[i]
+        }
+        for i, symbol in enumerate(symbols)
+    }
 
 
 def calculate_simulation_statistics(simulated_values: np.ndarray, 
-                                    current_value: float) -> dict:
+                                    current_value: float,
+                                    confidence_levels: Tuple[float, ...] = (0.95,),
+                                    in_place: bool = False) -> dict:
     """
     Calculate summary statistics from simulated portfolio values.
     
+    Every percentile and VaR level is found with a single np.partition on
+    all the ranks they need, and each CVaR is the mean of the partitioned
+    slice below its VaR, so adding confidence levels does not add full
+    sorts. float32 input stays float32 (sums accumulate in float64).
+    
     Parameters
     ----------
     simulated_values : np.ndarray
         Array of simulated portfolio values
     current_value : float
         Current portfolio value
+    confidence_levels : Tuple[float, ...]
+        VaR/CVaR confidence levels; each adds 'var_<level>' and
+        'cvar_<level>' keys, e.g. 'var_95' or 'var_99.9' (default (0.95,))
+    in_place : bool
+        Partition simulated_values itself instead of a copy, reordering it
+        (ignored for read-only arrays)
     
     Returns
     -------
     dict
         Dictionary containing simulation statistics
     """
-    # Calculate percentiles
-    percentiles = {
-        '5th': np.percentile(simulated_values, 5),
-        '25th': np.percentile(simulated_values, 25),
-        '50th': np.percentile(simulated_values, 50),
-        '75th': np.percentile(simulated_values, 75),
-        '95th': np.percentile(simulated_values, 95)
-    }
+    values = np.asarray(simulated_values)
+    if not in_place or not values.flags.writeable:
+        values = values.copy()
+    n = len(values)
+    
+    # Fractional rank of every quantile needed, as np.percentile interpolates
+    display_percentiles = {'5th': 5, '25th': 25, '50th': 50, '75th': 75, '95th': 95}
+    tail_percentiles = {level: (1 - level) * 100 for level in confidence_levels}
+    positions = {p: p / 100 * (n - 1)
+                 for p in list(display_percentiles.values()) + list(tail_percentiles.values())}
+    ranks = sorted({int(np.floor(pos)) for pos in positions.values()}
+                   | {int(np.ceil(pos)) for pos in positions.values()})
+    
+    values.partition(ranks)
     
-    # Calculate probability of gain
-    prob_gain = (simulated_values > current_value).mean()
+    def quantile(p):
+        pos = positions[p]
+        lower, upper = values[int(np.floor(pos))], values[int(np.ceil(pos))]
+        return lower + (upper - lower) * float(pos - np.floor(pos))
     
-    # Calculate probability of significant loss (>5%)
-    prob_significant_loss = (simulated_values < current_value * 0.95).mean()
+    percentiles = {name: quantile(p) for name, p in display_percentiles.items()}
     
-    # Calculate returns
-    simulated_returns = (simulated_values - current_value) / current_value
+    # Probabilities of gain and of significant loss (>5%)
+    prob_gain = np.count_nonzero(values > current_value) / n
+    prob_significant_loss = np.count_nonzero(values < current_value * 0.95) / n
+    
+    mean_value = values.mean(dtype=np.float64)
+    median_value = percentiles['50th']
     
     stats = {
-        'mean_value': simulated_values.mean(),
-        'median_value': percentiles['50th'],
-        'std_value': simulated_values.std(),
+        'mean_value': mean_value,
+        'median_value': median_value,
+        'std_value': values.std(dtype=np.float64),
         'percentiles': percentiles,
         'prob_gain': prob_gain,
         'prob_loss': 1 - prob_gain,
         'prob_significant_loss': prob_significant_loss,
-        'mean_return': simulated_returns.mean(),
-        'median_return': np.median(simulated_returns),
-        'var_95': np.percentile(simulated_values, 5),
-        'cvar_95': simulated_values[simulated_values <= np.percentile(simulated_values, 5)].mean()
+        'mean_return': (mean_value - current_value) / current_value,
+        'median_return': (median_value - current_value) / current_value
     }
     
+    for level, p in tail_percentiles.items():
+        var_value = quantile(p)
+        
+        # Partitioning puts every value below rank ceil(pos) before it; ties
+        # with the VaR can only sit beyond it when that value equals the VaR
+        upper = int(np.ceil(positions[p]))
+        tail = values[:upper + 1]
+        tail = tail[tail <= var_value]
+        tail_sum = tail.sum(dtype=np.float64)
+        tail_count = len(tail)
+        if values[upper] == var_value:
+            ties = np.count_nonzero(values[upper + 1:] == var_value)
+            tail_sum += ties * float(var_value)
+            tail_count += ties
+        
+        label = f"{level * 100:g}"
+        stats[f'var_{label}'] = var_value
+        stats[f'cvar_{label}'] = tail_sum / tail_count
+    
     return stats
 
 
@@ -0,0 +1,228 @@
+# portfolio_risk_app/utils/simulation_cache.py
+"""
+Simulation Cache Module
+Memoizes simulation results by their inputs, in memory and optionally on disk.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+
+DEFAULT_MAX_BYTES = int(os.environ.get('SIM_CACHE_MAX_MB', '128')) * 1024 * 1024
+
+# Directory for compressed result files; unset keeps the cache in memory only
+DEFAULT_PERSIST_DIR = os.environ.get('SIM_CACHE_DIR')
+
+Result = Union[np.ndarray, Dict[str, object]]
+
+
+def simulation_key(model: str, data_fingerprint: str, weights: Optional[np.ndarray] = None,
+                   **params) -> str:
+    """
+    Hash everything that determines a simulation result.
+    
+    Parameters
+    ----------
+    model : str
+        Simulation model / engine name
+    data_fingerprint : str
+        Fingerprint of the historical returns the model was fitted on
+    weights : Optional[np.ndarray]
+        Portfolio weights
+    **params
+        Remaining scalar inputs (value, horizon, path count, seed, ...)
+    
+    Returns
+    -------
+    str
+        Hex digest identifying the result
+    """
+    digest = hashlib.sha256()
+    digest.update(model.encode())
+    digest.update(data_fingerprint.encode())
+    if weights is not None:
+        digest.update(np.ascontiguousarray(weights, dtype=np.float64).tobytes())
+    digest.update(repr(sorted(params.items())).encode())
+    return digest.hexdigest()
+
+
+def _sizeof(result: Result) -> int:
+    """Approximate memory footprint of a result in bytes."""
+    if isinstance(result, np.ndarray):
+        return int(result.nbytes)
+    return sum(int(value.nbytes) if isinstance(value, np.ndarray) else 64
+               for value in result.values())
+
+
+def _freeze(result: Result) -> Result:
+    """Make cached arrays read-only so callers cannot alter shared results."""
+    arrays = [result] if isinstance(result, np.ndarray) else result.values()
+    for value in arrays:
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+    return result
+
+
+class SimulationCache:
+    """
+    Thread-safe LRU cache of simulation results with a byte budget.
+    
+    Results are numpy arrays or dictionaries of arrays and scalars. When a
+    persist directory is set, each result is also written as a compressed
+    ``.npz`` file and reloaded from there after it is evicted or after a
+    restart.
+    """
+    
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES,
+                 persist_dir: Optional[str] = DEFAULT_PERSIST_DIR):
+        """
+        Initialize cache.
+        
+        Parameters
+        ----------
+        max_bytes : int
+            Memory budget for cached results
+        persist_dir : Optional[str]
+            Directory for compressed result files (None disables persistence)
+        """
+        self.max_bytes = max_bytes
+        self.persist_dir = persist_dir
+        self._entries: 'OrderedDict[str, Tuple[Result, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+    
+    def get_or_compute(self, key: str, compute: Callable[[], Result],
+                       store_if: Optional[Callable[[Result], bool]] = None) -> Result:
+        """
+        Get a cached result, computing and storing it on a miss.
+        
+        Parameters
+        ----------
+        key : str
+            Key from simulation_key
+        compute : Callable[[], Result]
+            Function producing the result
+        store_if : Optional[Callable[[Result], bool]]
+            Predicate on a fresh result; results it rejects (e.g. ones that
+            are not reproducible from the key) are returned but not cached
+        
+        Returns
+        -------
+        Result
+            Cached or freshly computed result (arrays are read-only)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+        
+        result = self._load(key)
+        if result is not None:
+            with self._lock:
+                self._disk_hits += 1
+                self._store(key, result)
+            return result
+        
+        result = _freeze(compute())
+        with self._lock:
+            self._misses += 1
+            if store_if is not None and not store_if(result):
+                return result
+            self._store(key, result)
+        self._save(key, result)
+        
+        return result
+    
+    def _store(self, key: str, result: Result):
+        """Insert a result and evict least recently used entries over budget."""
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        
+        size = _sizeof(result)
+        self._entries[key] = (result, size)
+        self._bytes += size
+        
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._evictions += 1
+    
+    def _path(self, key: str) -> str:
+        """File holding a persisted result."""
+        return os.path.join(self.persist_dir, f"{key}.npz")
+    
+    def _save(self, key: str, result: Result):
+        """Write a result to the persist directory, if enabled."""
+        if not self.persist_dir:
+            return
+        
+        arrays = {'__array__': result} if isinstance(result, np.ndarray) else result
+        tmp_path = self._path(key) + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            # Persistence is best effort; the in-memory entry is still valid
+            pass
+    
+    def _load(self, key: str) -> Optional[Result]:
+        """Read a persisted result, or None when absent or unreadable."""
+        if not self.persist_dir or not os.path.exists(self._path(key)):
+            return None
+        
+        try:
+            with np.load(self._path(key)) as data:
+                if '__array__' in data.files:
+                    return _freeze(data['__array__'])
+                return _freeze({name: data[name] if data[name].ndim else data[name].item()
+                                for name in data.files})
+        except (OSError, ValueError):
+            return None
+    
+    def clear(self):
+        """Drop every in-memory entry (persisted files are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+        
+        Returns
+        -------
+        Dict[str, int]
+            Hits, disk hits, misses, evictions, entry count and bytes
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'disk_hits': self._disk_hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
+
+
+_simulation_cache = SimulationCache()
+
+
+def get_simulation_cache() -> SimulationCache:
+    """Get the process-wide simulation cache shared by all sessions."""
+    return _simulation_cache
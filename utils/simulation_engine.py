@@ -0,0 +1,734 @@
+# portfolio_risk_app/utils/simulation_engine.py
+"""
+Simulation Engine Module
+Return models and the Monte Carlo driver behind the simulation module.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from typing import Iterator, Optional, Tuple
+
+
+# Default cap on the working arrays of a single simulation chunk
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+# Degrees-of-freedom range for fitted Student-t models; above 2 keeps the
+# variance finite, and beyond ~100 the t is indistinguishable from normal
+MIN_DOF = 2.5
+MAX_DOF = 100.0
+
+
+def factor_covariance(cov_matrix: np.ndarray) -> np.ndarray:
+    """
+    Factor a covariance matrix as L @ L.T.
+    
+    Uses a Cholesky factorization, falling back to an eigendecomposition
+    with negative eigenvalues clipped to zero when the matrix is not
+    positive definite (e.g. collinear assets or pairwise-complete
+    estimates).
+    
+    Parameters
+    ----------
+    cov_matrix : np.ndarray
+        Covariance matrix of shape (n_assets, n_assets)
+    
+    Returns
+    -------
+    np.ndarray
+        Factor L of shape (n_assets, n_assets)
+    """
+    cov_matrix = np.asarray(cov_matrix, dtype=float)
+    
+    try:
+        return np.linalg.cholesky(cov_matrix)
+    except np.linalg.LinAlgError:
+        eigenvalues, eigenvectors = np.linalg.eigh((cov_matrix + cov_matrix.T) / 2)
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+
+class NormalModel:
+    """
+    Multivariate normal model of daily asset returns.
+    
+    The covariance is factored once. Because a weighted sum of jointly
+    normal returns is itself normal, portfolio paths are drawn directly from
+    the one-dimensional portfolio distribution without building per-asset
+    paths.
+    """
+    
+    name = 'normal'
+    
+    def __init__(self, mean_returns: np.ndarray, cov_matrix: np.ndarray,
+                 factor: Optional[np.ndarray] = None):
+        """
+        Initialize model.
+        
+        Parameters
+        ----------
+        mean_returns : np.ndarray
+            Mean daily return per asset
+        cov_matrix : np.ndarray
+            Covariance matrix of daily returns
+        factor : Optional[np.ndarray]
+            Precomputed covariance factor; computed when omitted
+        """
+        self.mean_returns = np.asarray(mean_returns, dtype=float)
+        self.cov_matrix = np.asarray(cov_matrix, dtype=float)
+        self.factor = factor_covariance(self.cov_matrix) if factor is None else factor
+    
+    @property
+    def n_assets(self) -> int:
+        """Number of assets modelled."""
+        return len(self.mean_returns)
+    
+    def path_bytes(self, horizon_days: int) -> int:
+        """Working memory needed per simulated portfolio path (shocks and returns)."""
+        return 2 * horizon_days * 8
+    
+    def portfolio_moments(self, weights: np.ndarray) -> Tuple[float, float]:
+        """
+        Get the mean and volatility of daily portfolio returns.
+        
+        Parameters
+        ----------
+        weights : np.ndarray
+            Portfolio weights
+        
+        Returns
+        -------
+        Tuple[float, float]
+            Mean and standard deviation of the daily portfolio return
+        """
+        mean = float(weights @ self.mean_returns)
+        volatility = float(np.linalg.norm(self.factor.T @ weights))
+        return mean, volatility
+    
+    def portfolio_returns_from_shocks(self, shocks: np.ndarray,
+                                      weights: np.ndarray) -> np.ndarray:
+        """
+        Map standard normal shocks to daily portfolio returns.
+        
+        Parameters
+        ----------
+        shocks : np.ndarray
+            Standard normal draws of shape (n_paths, horizon_days)
+        weights : np.ndarray
+            Portfolio weights
+        
+        Returns
+        -------
+        np.ndarray
+            Daily portfolio returns of shape (n_paths, horizon_days)
+        """
+        mean, volatility = self.portfolio_moments(weights)
+        return mean + volatility * shocks
+    
+    def sample_portfolio_returns(self, rng: np.random.Generator, n_paths: int,
+                                 horizon_days: int, weights: np.ndarray) -> np.ndarray:
+        """
+        Draw daily portfolio returns.
+        
+        Parameters
+        ----------
+        rng : np.random.Generator
+            Random generator
+        n_paths : int
+            Number of paths
+        horizon_days : int
+            Days per path
+        weights : np.ndarray
+            Portfolio weights
+        
+        Returns
+        -------
+        np.ndarray
+            Daily portfolio returns of shape (n_paths, horizon_days)
+        """
+        shocks = rng.standard_normal((n_paths, horizon_days))
+        return self.portfolio_returns_from_shocks(shocks, weights)
+    
+    def sample_asset_returns(self, rng: np.random.Generator, n_paths: int,
+                             horizon_days: int) -> np.ndarray:
+        """
+        Draw correlated daily returns for every asset.
+        
+        Parameters
+        ----------
+        rng : np.random.Generator
+            Random generator
+        n_paths : int
+            Number of paths
+        horizon_days : int
+            Days per path
+        
+        Returns
+        -------
+        np.ndarray
+            Asset returns of shape (n_paths, horizon_days, n_assets)
+        """
+        shocks = rng.standard_normal((n_paths, horizon_days, self.n_assets))
+        return self.mean_returns + shocks @ self.factor.T
+
+
+def fit_t_dof(returns: np.ndarray) -> float:
+    """
+    Fit Student-t degrees of freedom to returns.
+    
+    Each column is standardized and the standardized values are pooled, so
+    one tail parameter is fitted across all assets.
+    
+    Parameters
+    ----------
+    returns : np.ndarray
+        Daily returns of shape (n_days,) or (n_days, n_assets)
+    
+    Returns
+    -------
+    float
+        Degrees of freedom clipped to [MIN_DOF, MAX_DOF]
+    """
+    returns = np.asarray(returns, dtype=float)
+    if returns.ndim == 1:
+        returns = returns[:, np.newaxis]
+    
+    std = returns.std(axis=0)
+    standardized = ((returns - returns.mean(axis=0)) / np.where(std > 0, std, 1.0)).ravel()
+    
+    if len(standardized) < 10 or not np.any(standardized):
+        return MAX_DOF
+    
+    dof, _, _ = stats.t.fit(standardized, floc=0)
+    return float(np.clip(dof, MIN_DOF, MAX_DOF))
+
+
+class StudentTModel(NormalModel):
+    """
+    Multivariate Student-t model of daily asset returns.
+    
+    Returns are mean + sqrt((dof - 2) / dof) * L z / sqrt(w) with L the
+    covariance factor, z standard normal and w ~ chi2(dof) / dof shared by
+    all assets on a day, so the covariance matches the historical one while
+    joint crashes are fatter-tailed. Because every asset shares w, the
+    portfolio return is itself Student-t and is drawn without per-asset
+    paths. w is obtained from an extra normal draw per day by inversion,
+    so each chunk makes a single generator call and chunked results do
+    not depend on the chunk size.
+    """
+    
+    name = 'student_t'
+    
+    def __init__(self, mean_returns: np.ndarray, cov_matrix: np.ndarray, dof: float,
+                 factor: Optional[np.ndarray] = None):
+        """
+        Initialize model.
+        
+        Parameters
+        ----------
+        mean_returns : np.ndarray
+            Mean daily return per asset
+        cov_matrix : np.ndarray
+            Covariance matrix of daily returns
+        dof : float
+            Degrees of freedom (must exceed 2)
+        factor : Optional[np.ndarray]
+            Precomputed covariance factor; computed when omitted
+        """
+        super().__init__(mean_returns, cov_matrix, factor=factor)
+        self.dof = float(dof)
+        self.scale = np.sqrt((self.dof - 2) / self.dof)
+    
+    def path_bytes(self, horizon_days: int) -> int:
+        """Working memory needed per simulated portfolio path (draws, mixing and returns)."""
+        return 4 * horizon_days * 8
+    
+    def _mixing(self, normals: np.ndarray) -> np.ndarray:
+        """Map standard normals to 1 / sqrt(w) with w ~ chi2(dof) / dof."""
+        return 1 / np.sqrt(stats.chi2.ppf(stats.norm.cdf(normals), self.dof) / self.dof)
+    
+    def sample_portfolio_returns(self, rng: np.random.Generator, n_paths: int,
+                                 horizon_days: int, weights: np.ndarray) -> np.ndarray:
+        """
+        Draw daily portfolio returns.
+        
+        Parameters
+        ----------
+        rng : np.random.Generator
+            Random generator
+        n_paths : int
+            Number of paths
+        horizon_days : int
+            Days per path
+        weights : np.ndarray
+            Portfolio weights
+        
+        Returns
+        -------
+        np.ndarray
+            Daily portfolio returns of shape (n_paths, horizon_days)
+        """
+        mean, volatility = self.portfolio_moments(weights)
+        draws = rng.standard_normal((n_paths, horizon_days, 2))
+        shocks = draws[:, :, 0] * self._mixing(draws[:, :, 1])
+        return mean + self.scale * volatility * shocks
+    
+    def sample_asset_returns(self, rng: np.random.Generator, n_paths: int,
+                             horizon_days: int) -> np.ndarray:
+        """
+        Draw correlated daily returns for every asset.
+        
+        Parameters
+        ----------
+        rng : np.random.Generator
+            Random generator
+        n_paths : int
+            Number of paths
+        horizon_days : int
+            Days per path
+        
+        Returns
+        -------
+        np.ndarray
+            Asset returns of shape (n_paths, horizon_days, n_assets)
+        """
+        draws = rng.standard_normal((n_paths, horizon_days, self.n_assets + 1))
+        shocks = draws[:, :, :-1] @ self.factor.T
+        shocks *= self._mixing(draws[:, :, -1])[:, :, np.newaxis]
+        return self.mean_returns + self.scale * shocks
+
+
+class TCopulaModel(StudentTModel):
+    """
+    Student-t copula with Student-t marginals.
+    
+    Dependence comes from a multivariate t with copula_dof (tail
+    dependence: assets crash together), while each asset keeps its own
+    fitted marginal tail (marginal_dofs), scaled to its historical mean
+    and volatility. Marginals differ per asset, so portfolio returns are
+    built from per-asset draws, chunked by simulate_final_values.
+    """
+    
+    name = 't_copula'
+    
+    def __init__(self, mean_returns: np.ndarray, cov_matrix: np.ndarray,
+                 copula_dof: float, marginal_dofs: np.ndarray,
+                 factor: Optional[np.ndarray] = None):
+        """
+        Initialize model.
+        
+        Parameters
+        ----------
+        mean_returns : np.ndarray
+            Mean daily return per asset
+        cov_matrix : np.ndarray
+            Covariance matrix of daily returns
+        copula_dof : float
+            Degrees of freedom of the t copula
+        marginal_dofs : np.ndarray
+            Degrees of freedom of each asset's t marginal (each above 2)
+        factor : Optional[np.ndarray]
+            Precomputed factor of the correlation matrix; computed when omitted
+        """
+        cov_matrix = np.asarray(cov_matrix, dtype=float)
+        self.volatilities = np.sqrt(np.diag(cov_matrix))
+        safe_vol = np.where(self.volatilities > 0, self.volatilities, 1.0)
+        corr_matrix = cov_matrix / np.outer(safe_vol, safe_vol)
+        
+        super().__init__(mean_returns, cov_matrix, copula_dof,
+                         factor=factor_covariance(corr_matrix) if factor is None else factor)
+        self.marginal_dofs = np.asarray(marginal_dofs, dtype=float)
+        self.marginal_scales = np.sqrt((self.marginal_dofs - 2) / self.marginal_dofs)
+    
+    def path_bytes(self, horizon_days: int) -> int:
+        """Working memory needed per simulated path (per-asset draws, uniforms and returns)."""
+        return 4 * horizon_days * (self.n_assets + 1) * 8
+    
+    def sample_asset_returns(self, rng: np.random.Generator, n_paths: int,
+                             horizon_days: int) -> np.ndarray:
+        """
+        Draw daily returns for every asset.
+        
+        Parameters
+        ----------
+        rng : np.random.Generator
+            Random generator
+        n_paths : int
+            Number of paths
+        horizon_days : int
+            Days per path
+        
+        Returns
+        -------
+        np.ndarray
+            Asset returns of shape (n_paths, horizon_days, n_assets)
+        """
+        draws = rng.standard_normal((n_paths, horizon_days, self.n_assets + 1))
+        copula = draws[:, :, :-1] @ self.factor.T
+        copula *= self._mixing(draws[:, :, -1])[:, :, np.newaxis]
+        
+        # Map to uniforms via the copula t, then to each asset's own t marginal
+        uniforms = stats.t.cdf(copula, self.dof)
+        marginals = stats.t.ppf(uniforms, self.marginal_dofs)
+        return self.mean_returns + self.volatilities * self.marginal_scales * marginals
+    
+    def sample_portfolio_returns(self, rng: np.random.Generator, n_paths: int,
+                                 horizon_days: int, weights: np.ndarray) -> np.ndarray:
+        """
+        Draw daily portfolio returns.
+        
+        Parameters
+        ----------
+        rng : np.random.Generator
+            Random generator
+        n_paths : int
+            Number of paths
+        horizon_days : int
+            Days per path
+        weights : np.ndarray
+            Portfolio weights
+        
+        Returns
+        -------
+        np.ndarray
+            Daily portfolio returns of shape (n_paths, horizon_days)
+        """
+        return self.sample_asset_returns(rng, n_paths, horizon_days) @ weights
+
+
+class BlockBootstrapModel:
+    """
+    Historical simulation by resampling blocks of past daily return vectors.
+    
+    Each path is built from randomly chosen runs of block_size consecutive
+    historical days, which keeps short-range autocorrelation and the
+    empirical tails and cross-asset dependence. Sampling draws a matrix of
+    row indices at once; for portfolio paths the history is projected onto
+    the weights first, so only a 1-D series is indexed.
+    """
+    
+    name = 'block_bootstrap'
+    
+    def __init__(self, returns: np.ndarray, block_size: int = 5):
+        """
+        Initialize model.
+        
+        Parameters
+        ----------
+        returns : np.ndarray
+            Historical daily returns of shape (n_days, n_assets) without gaps
+        block_size : int
+            Consecutive days per resampled block (1 gives an i.i.d. bootstrap)
+        """
+        self.returns = np.asarray(returns, dtype=float)
+        if len(self.returns) == 0:
+            raise ValueError("Historical simulation needs at least one complete day of returns")
+        self.block_size = max(1, min(int(block_size), len(self.returns)))
+    
+    @property
+    def n_assets(self) -> int:
+        """Number of assets modelled."""
+        return self.returns.shape[1]
+    
+    @property
+    def scenarios(self) -> np.ndarray:
+        """Daily return vectors that paths are resampled from."""
+        return self.returns
+    
+    def path_bytes(self, horizon_days: int) -> int:
+        """Working memory needed per simulated portfolio path (indices and returns)."""
+        return 2 * horizon_days * 8
+    
+    def sample_indices(self, rng: np.random.Generator, n_paths: int,
+                       horizon_days: int) -> np.ndarray:
+        """
+        Draw historical row indices for each simulated day.
+        
+        Parameters
+        ----------
+        rng : np.random.Generator
+            Random generator
+        n_paths : int
+            Number of paths
+        horizon_days : int
+            Days per path
+        
+        Returns
+        -------
+        np.ndarray
+            Row indices of shape (n_paths, horizon_days)
+        """
+        n_blocks = -(-horizon_days // self.block_size)
+        starts = rng.integers(0, len(self.returns) - self.block_size + 1, size=(n_paths, n_blocks))
+        indices = starts[:, :, np.newaxis] + np.arange(self.block_size)
+        return indices.reshape(n_paths, -1)[:, :horizon_days]
+    
+    def sample_portfolio_returns(self, rng: np.random.Generator, n_paths: int,
+                                 horizon_days: int, weights: np.ndarray) -> np.ndarray:
+        """
+        Draw daily portfolio returns.
+        
+        Parameters
+        ----------
+        rng : np.random.Generator
+            Random generator
+        n_paths : int
+            Number of paths
+        horizon_days : int
+            Days per path
+        weights : np.ndarray
+            Portfolio weights
+        
+        Returns
+        -------
+        np.ndarray
+            Daily portfolio returns of shape (n_paths, horizon_days)
+        """
+        portfolio_history = self.scenarios @ weights
+        return portfolio_history[self.sample_indices(rng, n_paths, horizon_days)]
+    
+    def sample_asset_returns(self, rng: np.random.Generator, n_paths: int,
+                             horizon_days: int) -> np.ndarray:
+        """
+        Draw daily returns for every asset.
+        
+        Parameters
+        ----------
+        rng : np.random.Generator
+            Random generator
+        n_paths : int
+            Number of paths
+        horizon_days : int
+            Days per path
+        
+        Returns
+        -------
+        np.ndarray
+            Asset returns of shape (n_paths, horizon_days, n_assets)
+        """
+        return self.scenarios[self.sample_indices(rng, n_paths, horizon_days)]
+
+
+def ewma_variance(returns: np.ndarray, decay: float = 0.94) -> np.ndarray:
+    """
+    RiskMetrics EWMA variance per series, seeded with the sample variance.
+    
+    Runs s2_t = lambda * s2_(t-1) + (1 - lambda) * r_t^2 as one vectorized
+    pandas ``ewm(adjust=False)`` pass over the squared returns with the seed
+    prepended. Missing returns leave the variance unchanged.
+    
+    Parameters
+    ----------
+    returns : np.ndarray
+        Daily returns of shape (n_days, n_series)
+    decay : float
+        Smoothing factor lambda (default 0.94)
+    
+    Returns
+    -------
+    np.ndarray
+        Variances of shape (n_days + 1, n_series): the seed in row 0 and the
+        variance after day t in row t + 1
+    """
+    returns = np.asarray(returns, dtype=float)
+    squared = np.vstack([np.nanvar(returns, axis=0), returns ** 2])
+    return (pd.DataFrame(squared)
+            .ewm(alpha=1 - decay, adjust=False, ignore_na=True)
+            .mean()
+            .to_numpy())
+
+
+def ewma_volatility(returns: np.ndarray, decay: float = 0.94) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    RiskMetrics-style EWMA volatility per asset.
+    
+    Parameters
+    ----------
+    returns : np.ndarray
+        Daily returns of shape (n_days, n_assets)
+    decay : float
+        Smoothing factor lambda (default 0.94)
+    
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        Volatility forecast for each historical day from the days before it,
+        of shape (n_days, n_assets), and the forecast for the next day
+    """
+    volatility = np.sqrt(ewma_variance(returns, decay))
+    return volatility[:-1], volatility[-1]
+
+
+class FilteredHistoricalModel(BlockBootstrapModel):
+    """
+    Filtered historical simulation.
+    
+    Historical returns are standardized by their EWMA volatility at the
+    time and rescaled by today's EWMA volatility before resampling, so the
+    scenarios keep the empirical shape of past shocks while reflecting the
+    current volatility regime.
+    """
+    
+    name = 'filtered_historical'
+    
+    def __init__(self, returns: np.ndarray, decay: float = 0.94, block_size: int = 1):
+        """
+        Initialize model.
+        
+        Parameters
+        ----------
+        returns : np.ndarray
+            Historical daily returns of shape (n_days, n_assets) without gaps
+        decay : float
+            EWMA smoothing factor lambda (default 0.94)
+        block_size : int
+            Consecutive days per resampled block (default 1)
+        """
+        super().__init__(returns, block_size=block_size)
+        self.decay = decay
+        
+        volatility, current_volatility = ewma_volatility(self.returns, decay)
+        # Flat series have zero volatility; leave their (zero) returns unscaled
+        volatility = np.where(volatility > 0, volatility, 1.0)
+        self.current_volatility = current_volatility
+        self._scenarios = self.returns / volatility * current_volatility
+    
+    @property
+    def scenarios(self) -> np.ndarray:
+        """Historical returns rescaled to today's volatility."""
+        return self._scenarios
+
+
+def build_price_paths(returns: np.ndarray, start_prices,
+                      out: Optional[np.ndarray] = None,
+                      dtype=np.float64) -> np.ndarray:
+    """
+    Compound simple returns into price paths with a vectorized cumulative product.
+    
+    Parameters
+    ----------
+    returns : np.ndarray
+        Daily returns of shape (..., n_paths, horizon_days)
+    start_prices : float or np.ndarray
+        Starting price, or one per leading batch entry of shape (...)
+    out : Optional[np.ndarray]
+        Preallocated buffer of shape (..., n_paths, horizon_days + 1)
+    dtype : np.dtype
+        Buffer dtype when out is not given (float32 halves memory)
+    
+    Returns
+    -------
+    np.ndarray
+        Price paths with the start price in column 0
+    """
+    if out is None:
+        out = np.empty(returns.shape[:-1] + (returns.shape[-1] + 1,), dtype=dtype)
+    
+    out[..., 0] = 1
+    np.add(returns, 1, out=out[..., 1:])
+    np.cumprod(out[..., 1:], axis=-1, out=out[..., 1:])
+    out *= np.asarray(start_prices, dtype=out.dtype)[..., np.newaxis, np.newaxis]
+    
+    return out
+
+
+def iter_chunks(n_simulations: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yield (start, stop) path ranges covering n_simulations in order.
+    
+    Parameters
+    ----------
+    n_simulations : int
+        Total number of paths
+    chunk_size : int
+        Maximum paths per chunk
+    
+    Yields
+    ------
+    Tuple[int, int]
+        Half-open path range of each chunk
+    """
+    for start in range(0, n_simulations, chunk_size):
+        yield start, min(start + chunk_size, n_simulations)
+
+
+def chunk_size_for_budget(model, horizon_days: int, n_simulations: int,
+                          memory_budget_mb: Optional[float] = None) -> int:
+    """
+    Get the number of paths whose working arrays fit in a memory budget.
+    
+    Parameters
+    ----------
+    model : NormalModel or another return model in this module
+        Return model exposing ``path_bytes``
+    horizon_days : int
+        Days per path
+    n_simulations : int
+        Total number of paths
+    memory_budget_mb : Optional[float]
+        Budget in megabytes (default DEFAULT_MEMORY_BUDGET_MB)
+    
+    Returns
+    -------
+    int
+        Paths per chunk, at least 1 and at most n_simulations
+    """
+    if memory_budget_mb is None:
+        memory_budget_mb = DEFAULT_MEMORY_BUDGET_MB
+    
+    budget_bytes = memory_budget_mb * 1024 * 1024
+    chunk_size = int(budget_bytes // max(model.path_bytes(horizon_days), 1))
+    return max(1, min(chunk_size, n_simulations))
+
+
+def simulate_final_values(model, weights: np.ndarray, current_value: float,
+                          horizon_days: int, n_simulations: int,
+                          random_seed: int = 42,
+                          memory_budget_mb: Optional[float] = None,
+                          chunk_size: Optional[int] = None) -> np.ndarray:
+    """
+    Simulate portfolio values at the horizon under a return model.
+    
+    Paths are generated in chunks so peak working memory stays within the
+    budget; only the final value of each path is kept. Chunks draw from a
+    single generator in path order, so for a given seed the result is
+    identical for any chunk size.
+    
+    Parameters
+    ----------
+    model : NormalModel or another return model in this module
+        Return model exposing ``sample_portfolio_returns`` and ``path_bytes``
+    weights : np.ndarray
+        Portfolio weights (must sum to 1)
+    current_value : float
+        Current portfolio value
+    horizon_days : int
+        Simulation horizon in days
+    n_simulations : int
+        Number of Monte Carlo paths
+    random_seed : int
+        Seed for ``np.random.default_rng``
+    memory_budget_mb : Optional[float]
+        Cap on per-chunk working memory (default DEFAULT_MEMORY_BUDGET_MB)
+    chunk_size : Optional[int]
+        Explicit paths per chunk; overrides memory_budget_mb
+    
+    Returns
+    -------
+    np.ndarray
+        Simulated portfolio values at the horizon
+    """
+    rng = np.random.default_rng(random_seed)
+    weights = np.asarray(weights, dtype=float)
+    
+    if chunk_size is None:
+        chunk_size = chunk_size_for_budget(model, horizon_days, n_simulations, memory_budget_mb)
+    
+    final_values = np.empty(n_simulations)
+    
+    for start, stop in iter_chunks(n_simulations, chunk_size):
+        portfolio_returns = model.sample_portfolio_returns(rng, stop - start, horizon_days, weights)
+        
+        # Compound returns over horizon to get final values
+        final_values[start:stop] = current_value * np.prod(1 + portfolio_returns, axis=1)
+    
+    return final_values
@@ -0,0 +1,250 @@
+# portfolio_risk_app/utils/variance_reduction.py
+"""
+Variance Reduction Module
+Shock generators that tighten Monte Carlo VaR/CVaR estimates for a given path count.
+"""
+
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy.stats import norm, qmc
+
+
+# Supported shock generators
+PLAIN = 'plain'
+ANTITHETIC = 'antithetic'
+MOMENT_MATCHING = 'moment_matching'
+SOBOL = 'sobol'
+IMPORTANCE = 'importance'
+
+METHODS = (PLAIN, ANTITHETIC, MOMENT_MATCHING, SOBOL, IMPORTANCE)
+
+
+def brownian_bridge_increments(normals: np.ndarray) -> np.ndarray:
+    """
+    Turn standard normals into daily increments by Brownian bridge construction.
+    
+    The first column sets the terminal value and later columns fill in
+    midpoints, so the leading (best distributed) quasi-random dimensions
+    drive the horizon outcome.
+    
+    Parameters
+    ----------
+    normals : np.ndarray
+        Standard normals of shape (n_paths, horizon_days)
+    
+    Returns
+    -------
+    np.ndarray
+        Standard normal daily increments of shape (n_paths, horizon_days)
+    """
+    n_paths, horizon_days = normals.shape
+    path = np.zeros((n_paths, horizon_days + 1))
+    path[:, horizon_days] = np.sqrt(horizon_days) * normals[:, 0]
+    
+    column = 1
+    queue = deque([(0, horizon_days)])
+    while queue:
+        left, right = queue.popleft()
+        if right - left < 2:
+            continue
+        
+        mid = (left + right) // 2
+        span = right - left
+        path[:, mid] = (((right - mid) * path[:, left] + (mid - left) * path[:, right]) / span
+                        + np.sqrt((mid - left) * (right - mid) / span) * normals[:, column])
+        column += 1
+        queue.append((left, mid))
+        queue.append((mid, right))
+    
+    return np.diff(path, axis=1)
+
+
+def importance_shift(horizon_days: int, confidence_level: float) -> float:
+    """
+    Daily mean shift that centres the summed shocks on the VaR quantile.
+    
+    Parameters
+    ----------
+    horizon_days : int
+        Days per path
+    confidence_level : float
+        VaR confidence level
+    
+    Returns
+    -------
+    float
+        Shift theta; shocks are drawn from N(-theta, 1)
+    """
+    return float(-norm.ppf(1 - confidence_level) / np.sqrt(horizon_days))
+
+
+def generate_shocks(method: str, rng: np.random.Generator, n_paths: int,
+                    horizon_days: int,
+                    confidence_level: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Draw daily standard normal shocks with a variance-reduction method.
+    
+    Parameters
+    ----------
+    method : str
+        One of METHODS
+    rng : np.random.Generator
+        Random generator (also scrambles Sobol points)
+    n_paths : int
+        Number of paths; Sobol rounds up to a power of two
+    horizon_days : int
+        Days per path
+    confidence_level : float
+        Tail targeted by importance sampling
+    
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        Shocks of shape (n_paths, horizon_days) and per-path likelihood
+        ratio weights (all ones except for importance sampling)
+    """
+    if method == PLAIN:
+        shocks = rng.standard_normal((n_paths, horizon_days))
+    elif method == ANTITHETIC:
+        half = rng.standard_normal(((n_paths + 1) // 2, horizon_days))
+        shocks = np.concatenate([half, -half])[:n_paths]
+    elif method == MOMENT_MATCHING:
+        shocks = rng.standard_normal((n_paths, horizon_days))
+        shocks = (shocks - shocks.mean(axis=0)) / shocks.std(axis=0)
+    elif method == SOBOL:
+        sampler = qmc.Sobol(d=horizon_days, scramble=True, seed=rng)
+        uniforms = sampler.random_base2(int(np.ceil(np.log2(max(n_paths, 2)))))
+        eps = np.finfo(float).eps
+        shocks = brownian_bridge_increments(norm.ppf(np.clip(uniforms, eps, 1 - eps)))
+    elif method == IMPORTANCE:
+        theta = importance_shift(horizon_days, confidence_level)
+        shocks = rng.standard_normal((n_paths, horizon_days)) - theta
+        likelihood = np.exp(theta * shocks.sum(axis=1) + horizon_days * theta ** 2 / 2)
+        return shocks, likelihood
+    else:
+        raise ValueError(f"Unknown variance reduction method '{method}'; expected one of {METHODS}")
+    
+    return shocks, np.ones(len(shocks))
+
+
+def weighted_tail_risk(values: np.ndarray, likelihood: np.ndarray,
+                       current_value: float,
+                       confidence_level: float = 0.95) -> Tuple[float, float]:
+    """
+    Estimate VaR and CVaR from (possibly importance-weighted) simulated values.
+    
+    Parameters
+    ----------
+    values : np.ndarray
+        Simulated portfolio values
+    likelihood : np.ndarray
+        Likelihood ratio weight of each path
+    current_value : float
+        Current portfolio value
+    confidence_level : float
+        Confidence level
+    
+    Returns
+    -------
+    Tuple[float, float]
+        VaR and CVaR in monetary units (positive numbers are losses)
+    """
+    order = np.argsort(values)
+    sorted_values = values[order]
+    sorted_weights = likelihood[order]
+    
+    tail_probability = np.cumsum(sorted_weights) / len(values)
+    k = min(int(np.searchsorted(tail_probability, 1 - confidence_level)), len(values) - 1)
+    
+    var_value = sorted_values[k]
+    cvar_value = np.average(sorted_values[:k + 1], weights=sorted_weights[:k + 1])
+    
+    return current_value - var_value, current_value - cvar_value
+
+
+def estimate_tail_risk(model, weights: np.ndarray, current_value: float,
+                       horizon_days: int = 30,
+                       n_simulations: int = 10000,
+                       confidence_level: float = 0.95,
+                       method: str = PLAIN,
+                       n_replicates: int = 32,
+                       random_seed: Optional[int] = 42) -> Dict:
+    """
+    Estimate portfolio VaR/CVaR with a variance-reduction method and its standard error.
+    
+    Paths are split into independent replicates, each drawn (and, for
+    Sobol, scrambled) separately. The estimate pools all paths; the
+    standard error is the spread of the replicate estimates divided by
+    sqrt(n_replicates), which stays valid for correlated schemes such as
+    antithetic pairs and quasi-random points. The standard error is itself
+    estimated with a relative error of about 1 / sqrt(2 (n_replicates - 1)),
+    so the default of 32 replicates keeps it within roughly +/-13%.
+    
+    Sobol rounds each replicate up to a power of two, so 'n_paths' (paths
+    actually simulated) can exceed 'n_requested'.
+    
+    Parameters
+    ----------
+    model : NormalModel
+        Return model exposing ``portfolio_returns_from_shocks``
+    weights : np.ndarray
+        Portfolio weights (must sum to 1)
+    current_value : float
+        Current portfolio value
+    horizon_days : int
+        Simulation horizon in days
+    n_simulations : int
+        Total paths requested across replicates
+    confidence_level : float
+        Confidence level
+    method : str
+        One of METHODS
+    n_replicates : int
+        Independent replicates used for the standard error (at least 2)
+    random_seed : Optional[int]
+        Seed for ``np.random.default_rng``
+    
+    Returns
+    -------
+    Dict
+        'var', 'cvar', 'var_se', 'cvar_se', 'n_paths', 'n_requested' and 'method'
+    
+    Raises
+    ------
+    ValueError
+        If n_replicates is below 2 (no spread to estimate an error from)
+    """
+    if n_replicates < 2:
+        raise ValueError(f"n_replicates must be at least 2 to estimate a standard error, got {n_replicates}")
+    
+    rng = np.random.default_rng(random_seed)
+    weights = np.asarray(weights, dtype=float)
+    paths_per_replicate = max(n_simulations // n_replicates, 2)
+    
+    all_values, all_likelihood, estimates = [], [], []
+    for _ in range(n_replicates):
+        shocks, likelihood = generate_shocks(method, rng, paths_per_replicate,
+                                             horizon_days, confidence_level)
+        portfolio_returns = model.portfolio_returns_from_shocks(shocks, weights)
+        values = current_value * np.prod(1 + portfolio_returns, axis=1)
+        
+        estimates.append(weighted_tail_risk(values, likelihood, current_value, confidence_level))
+        all_values.append(values)
+        all_likelihood.append(likelihood)
+    
+    values = np.concatenate(all_values)
+    var, cvar = weighted_tail_risk(values, np.concatenate(all_likelihood),
+                                   current_value, confidence_level)
+    standard_errors = np.std(estimates, axis=0, ddof=1) / np.sqrt(n_replicates)
+    
+    return {
+        'var': var,
+        'cvar': cvar,
+        'var_se': float(standard_errors[0]),
+        'cvar_se': float(standard_errors[1]),
+        'n_paths': len(values),
+        'n_requested': n_simulations,
+        'method': method
+    }